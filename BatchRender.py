@@ -0,0 +1,305 @@
+"""
+Headless batch rendering of schematics to SVG, PNG or PDF.
+
+Runs the same load, layout and scene build as the GUI on Qt's offscreen
+platform, so no window (or display) is needed. Models are rendered in parallel
+across worker processes and each one's stage timings are reported.
+
+Usage (from the repository root):
+    python BatchRender.py --nodes Nodes.csv --monitors Monitors.csv --links Links.csv -o out
+    python BatchRender.py --manifest models.json --format svg png --workers 4 -o out
+
+A manifest is a JSON list with one object per model. Keys are the AppManager
+path attributes; relative paths are resolved against the manifest's folder:
+    [
+        {"name": "muston", "nodePath": "Muston_Nodes.csv", "pipePath": "Muston_Links.csv", ...},
+        ...
+    ]
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# must be set before the QApplication is created
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QPainter, QPageSize, QPdfWriter, QColor
+from PyQt6.QtCore import QMarginsF, QRectF, QSize, QSizeF, Qt
+from PyQt6.QtSvg import QSvgGenerator
+
+from NetworkGenerator import NetworkGenerator
+from NetworkDrawer import NetworkDrawer
+from ChainCollapse import ChainCollapse
+
+
+# one QApplication per process (see _initWorker)
+_app = None
+
+
+def _initWorker():
+    global _app
+    if _app is None:
+        _app = QApplication.instance() or QApplication([sys.argv[0]])
+
+
+def _renderJob(job):
+    """Process pool entry point; must be module-level to be picklable."""
+    _initWorker()
+    if job["quiet"]:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return BatchRender.renderModel(job)
+    return BatchRender.renderModel(job)
+
+
+class BatchRender:
+    FORMATS = ("svg", "png", "pdf")
+
+    # blank border around the schematic, in scene units
+    MARGIN = 50.0
+
+    # PNGs larger than this (pixels on the longest side) are scaled down
+    MAX_IMAGE_SIZE = 8192
+
+    # command line flag -> AppManager path attribute
+    PATH_FLAGS = {
+        "nodes": "nodePath",
+        "monitors": "monitorsPath",
+        "links": "pipePath",
+        "user_control": "userControlPath",
+        "flumes": "flumePath",
+        "flap_valves": "flapValvePath",
+        "orifices": "orficePath",
+        "pumps": "pumpPath",
+        "sluices": "sluicePath",
+        "weirs": "weirPath",
+    }
+
+    # --------------------------
+    # Rendering
+    # --------------------------
+
+    @staticmethod
+    def sceneRect(scene):
+        rect = scene.itemsBoundingRect()
+        margin = BatchRender.MARGIN
+        return rect.adjusted(-margin, -margin, margin, margin)
+
+    @staticmethod
+    def renderSvg(scene, path):
+        source = BatchRender.sceneRect(scene)
+        generator = QSvgGenerator()
+        generator.setFileName(path)
+        generator.setSize(QSize(int(source.width()), int(source.height())))
+        generator.setViewBox(QRectF(0, 0, source.width(), source.height()))
+        generator.setTitle(os.path.splitext(os.path.basename(path))[0])
+
+        painter = QPainter(generator)
+        scene.render(painter, QRectF(0, 0, source.width(), source.height()), source)
+        painter.end()
+
+    @staticmethod
+    def renderPng(scene, path, scale=1.0):
+        source = BatchRender.sceneRect(scene)
+        scale = min(scale, BatchRender.MAX_IMAGE_SIZE / max(source.width(), source.height(), 1.0))
+        width = max(1, int(source.width() * scale))
+        height = max(1, int(source.height() * scale))
+
+        image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(QColor(Qt.GlobalColor.white))
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        scene.render(painter, QRectF(0, 0, width, height), source)
+        painter.end()
+
+        if not image.save(path):
+            raise OSError(f"could not write {path}")
+
+    @staticmethod
+    def renderPdf(scene, path):
+        source = BatchRender.sceneRect(scene)
+        writer = QPdfWriter(path)
+        # one page sized to the schematic (scene units as points)
+        writer.setPageSize(QPageSize(QSizeF(source.width(), source.height()), QPageSize.Unit.Point))
+        writer.setPageMargins(QMarginsF(0, 0, 0, 0))
+        writer.setTitle(os.path.splitext(os.path.basename(path))[0])
+
+        painter = QPainter(writer)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        scene.render(painter, QRectF(0, 0, painter.device().width(), painter.device().height()), source)
+        painter.end()
+
+    @staticmethod
+    def renderModel(job):
+        """
+        Build and render one model. Runs in a worker process.
+        job: {"name", "paths", "outDir", "formats", "engine", "useCache", "scale", "collapseChains", "quiet"}
+        Returns:
+            {"name", "outputs", "nodes", "conduits", "timings": {stage: seconds}, "error"}
+        """
+        result = {"name": job["name"], "outputs": [], "nodes": 0, "conduits": 0, "timings": {}, "error": None}
+        timings = result["timings"]
+        start = time.perf_counter()
+
+        def lap(stage, since):
+            now = time.perf_counter()
+            timings[stage] = now - since
+            return now
+
+        try:
+            # the GUI skips missing files; in a batch run that's a mistake to report
+            missing = [path for path in job["paths"].values() if path and not os.path.isfile(path)]
+            if missing:
+                raise FileNotFoundError(", ".join(missing))
+
+            # conduit tables are streamed into the model, so loading and merging are one stage
+            t = start
+            model = NetworkGenerator.streamModel(job["paths"], columnar=True,
+                                                 coordinates=job["engine"] in NetworkDrawer.SOURCE_ENGINES)
+            result["nodes"] = model.nodeCount
+            result["conduits"] = model.edgeCount
+            t = lap("load", t)
+
+            if job["collapseChains"]:
+                # draw manhole runs as single conduits (see ChainCollapse)
+                model = ChainCollapse(model).collapsed
+                t = lap("collapse", t)
+
+            # already inside a pool worker: lay out in-process
+            NetworkDrawer.layoutNetwork(model, job["engine"], job["useCache"], workers=1)
+            t = lap("layout", t)
+
+            view = NetworkDrawer.buildScene(model)
+            scene = view.scene()
+            t = lap("scene", t)
+
+            os.makedirs(job["outDir"], exist_ok=True)
+            for fmt in job["formats"]:
+                path = os.path.join(job["outDir"], f"{job['name']}.{fmt}")
+                if fmt == "svg":
+                    BatchRender.renderSvg(scene, path)
+                elif fmt == "png":
+                    BatchRender.renderPng(scene, path, job["scale"])
+                else:
+                    BatchRender.renderPdf(scene, path)
+                result["outputs"].append(path)
+            lap("render", t)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        timings["total"] = time.perf_counter() - start
+        return result
+
+    # --------------------------
+    # Jobs
+    # --------------------------
+
+    @staticmethod
+    def readManifest(path):
+        """
+        Returns:
+            [ (name, {path key: absolute path or None}), ... ]
+        """
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+
+        base_dir = os.path.dirname(os.path.abspath(path))
+        models = []
+        for i, entry in enumerate(entries):
+            paths = {}
+            for key in BatchRender.PATH_FLAGS.values():
+                value = entry.get(key)
+                paths[key] = os.path.join(base_dir, value) if value else None
+            name = entry.get("name") or os.path.splitext(os.path.basename(paths["nodePath"] or f"model{i + 1}"))[0]
+            models.append((name, paths))
+        return models
+
+    @staticmethod
+    def renderAll(models, outDir, formats=("svg",), engine="layered", useCache=True, scale=1.0,
+                  workers=None, quiet=True, onRendered=None, collapseChains=False):
+        """
+        models: [ (name, paths), ... ] as returned by readManifest
+        collapseChains: contract runs of plain manholes before laying out (see ChainCollapse)
+        workers: process pool size (None = one per CPU, 1 = render in-process)
+        onRendered: optional callback(result), called as each model finishes
+        Returns:
+            [ result, ... ] in the order of `models` (see renderModel)
+        """
+        jobs = [
+            {"name": name, "paths": paths, "outDir": outDir, "formats": list(formats), "engine": engine,
+             "useCache": useCache, "scale": scale, "collapseChains": collapseChains, "quiet": quiet}
+            for name, paths in models
+        ]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(jobs)))
+
+        results = [None] * len(jobs)
+        if workers == 1:
+            for i, job in enumerate(jobs):
+                results[i] = _renderJob(job)
+                if onRendered is not None:
+                    onRendered(results[i])
+            return results
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker) as pool:
+            futures = {pool.submit(_renderJob, job): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if onRendered is not None:
+                    onRendered(results[futures[future]])
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--manifest", help="JSON list of models to render")
+    for flag in BatchRender.PATH_FLAGS:
+        parser.add_argument(f"--{flag.replace('_', '-')}", dest=flag, help=f"{flag.replace('_', ' ')} CSV")
+    parser.add_argument("--name", help="output name for a single model (default: nodes file name)")
+    parser.add_argument("-o", "--out-dir", default=".", help="folder for the rendered files")
+    parser.add_argument("--format", nargs="+", default=["svg"], choices=BatchRender.FORMATS)
+    parser.add_argument("--engine", default="layered", choices=NetworkDrawer.LAYOUT_ENGINES)
+    parser.add_argument("--scale", type=float, default=1.0, help="PNG pixels per scene unit")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="don't reuse or store cached layouts")
+    parser.add_argument("--collapse-chains", action="store_true",
+                        help="draw runs of plain manholes as single conduits")
+    parser.add_argument("--verbose", action="store_true", help="show the per-model build output")
+    args = parser.parse_args()
+
+    models = BatchRender.readManifest(args.manifest) if args.manifest else []
+    paths = {key: getattr(args, flag) for flag, key in BatchRender.PATH_FLAGS.items()}
+    if any(paths.values()):
+        if not paths["nodePath"]:
+            parser.error("--nodes is required for a single model")
+        models.append((args.name or os.path.splitext(os.path.basename(paths["nodePath"]))[0], paths))
+    if not models:
+        parser.error("give a --manifest or at least --nodes and --links")
+
+    stages = ("load", "collapse", "layout", "scene", "render", "total")
+    print(f"{'model':<24} {'nodes':>8} {'conduits':>8} " + " ".join(f"{stage + ' (s)':>10}" for stage in stages))
+
+    def report(result):
+        if result["error"]:
+            print(f"{result['name']:<24} FAILED {result['error']}")
+            return
+        timings = " ".join(f"{result['timings'].get(stage, 0.0):>10.2f}" for stage in stages)
+        print(f"{result['name']:<24} {result['nodes']:>8} {result['conduits']:>8} {timings}", flush=True)
+
+    start = time.perf_counter()
+    results = BatchRender.renderAll(
+        models, args.out_dir, args.format, args.engine, not args.no_cache, args.scale,
+        args.workers, quiet=not args.verbose, onRendered=report, collapseChains=args.collapse_chains,
+    )
+    failed = sum(1 for result in results if result["error"])
+    print(f"Rendered {len(results) - failed}/{len(results)} models in {time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
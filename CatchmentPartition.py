@@ -0,0 +1,126 @@
+import numpy as np
+
+from ComponentLayout import ComponentLayout
+
+
+class CatchmentPartition:
+    """
+    A network split into monitor sub-catchments, so the schematic can be laid
+    out and built one part at a time (see CatchmentView).
+
+    A monitor's sub-catchment is the monitor and everything that drains into
+    it short of the next monitors upstream: each node goes with the first
+    monitor downstream of it, or where flow splits between monitors, with the
+    upstream-most of them (see NetworkTrace.order). Nodes that drain into no
+    monitor are split into their connected pieces, and nodes without any
+    conduit are kept together in one last part.
+
+    Parts are numbered monitor sub-catchments first, upstream before
+    downstream, then the unmonitored pieces by decreasing size.
+    """
+
+    def __init__(self, model):
+        n = model.nodeCount
+        trace = model.trace()
+        rank = np.empty(n, dtype=np.int64)
+        rank[trace.order()] = np.arange(n)
+
+        # --------------------------
+        # Monitor sub-catchments
+        # --------------------------
+        monitors = np.flatnonzero(model.isMonitor)
+        monitors = monitors[np.argsort(rank[monitors], kind="stable")]
+        labels = np.full(n, -1, dtype=np.int64)
+        for part, monitor in enumerate(monitors.tolist()):
+            catchment = trace.catchment(monitor)
+            labels[catchment[labels[catchment] < 0]] = part
+        heads = [monitors]
+        self.monitorParts = monitors.size
+
+        # --------------------------
+        # Everything else
+        # --------------------------
+        rest = labels < 0
+        connected = model.connected()
+        loose = np.flatnonzero(rest & connected)
+        if loose.size:
+            remap = np.full(n, -1, dtype=np.int64)
+            remap[loose] = np.arange(loose.size)
+            inside = (remap[model.edgeSrc] >= 0) & (remap[model.edgeDst] >= 0)
+            pieces, sizes = ComponentLayout.componentLabels(
+                loose.size, remap[model.edgeSrc[inside]], remap[model.edgeDst[inside]]
+            )
+            labels[loose] = self.monitorParts + pieces
+            # each piece is headed by its most downstream node
+            by_rank = np.lexsort((rank[loose], pieces))
+            last = np.flatnonzero(np.diff(pieces[by_rank], append=sizes.size))
+            heads.append(loose[by_rank[last]])
+
+        unconnected = np.flatnonzero(rest & ~connected)
+        if unconnected.size:
+            labels[unconnected] = sum(h.size for h in heads)
+            heads.append(np.array([-1], dtype=np.int64))
+
+        # node index heading each part; -1 for the unconnected nodes
+        self.heads = np.concatenate(heads).astype(np.int64)
+        # part of every node
+        self.labels = labels
+
+        # the part each monitor's flow goes on to, or -1. Always a later part,
+        # so a loop between two monitors can't make them each other's parent;
+        # the unmonitored pieces drain nowhere else
+        self.parents = np.full(self.heads.size, -1, dtype=np.int64)
+        for part, monitor in enumerate(monitors.tolist()):
+            below = labels[model.edgeDst[model.indptr[monitor]:model.indptr[monitor + 1]]]
+            below = below[below > part]
+            if below.size:
+                self.parents[part] = below[0]
+
+        # members of part k are self._members[self._indptr[k]:self._indptr[k + 1]], in index order
+        self._members = np.argsort(labels, kind="stable")
+        self._indptr = np.zeros(self.heads.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=self.heads.size), out=self._indptr[1:])
+
+        self.names = [
+            model.nodeIds[head] if part < self.monitorParts
+            else f"Unmonitored: {model.nodeIds[head]}" if head >= 0
+            else "Unconnected nodes"
+            for part, head in enumerate(self.heads.tolist())
+        ]
+
+    @property
+    def partCount(self):
+        return self.heads.size
+
+    def size(self, part):
+        return int(self._indptr[part + 1] - self._indptr[part])
+
+    def members(self, part):
+        """Node indices in part, sorted."""
+        return self._members[self._indptr[part]:self._indptr[part + 1]]
+
+    def children(self, part):
+        """Parts that drain into part, upstream-most first."""
+        return np.flatnonzero(self.parents == part)
+
+    def largest(self):
+        """The part with the most nodes, or -1 if there are none."""
+        return int(np.argmax(np.diff(self._indptr))) if self.partCount else -1
+
+    def roots(self):
+        """Parts that drain into no other part, largest first."""
+        roots = np.flatnonzero(self.parents < 0)
+        sizes = np.diff(self._indptr)[roots]
+        return roots[np.argsort(-sizes, kind="stable")]
+
+    def boundary(self, model, part):
+        """
+        Nodes of other parts joined to part by a conduit: the monitors
+        upstream that drain into it and wherever its flow goes on to.
+        Returns:
+            sorted node indices
+        """
+        inside = self.labels == part
+        crossing = inside[model.edgeSrc] != inside[model.edgeDst]
+        ends = np.concatenate([model.edgeSrc[crossing], model.edgeDst[crossing]])
+        return np.unique(ends[~inside[ends]]).astype(np.int64)
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+
+import numpy as np
+from PyQt6.QtWidgets import QStackedWidget
+from PyQt6.QtCore import pyqtSignal
+
+from NetworkDrawer import NetworkDrawer
+
+
+class CatchmentView(QStackedWidget):
+    """
+    Shows a network one monitor sub-catchment at a time (see
+    CatchmentPartition), instead of one scene with every node in it.
+
+    A part is laid out and built into a SchematicView the first time it is
+    shown, along with the nodes of neighbouring parts it is joined to, drawn
+    faded. The last MAX_VIEWS parts stay built so moving back and forth is
+    instant; older ones are dropped. Startup time and memory so follow what
+    has been looked at, not the size of the network.
+
+    Double-clicking a faded node moves to the part it belongs to.
+    """
+
+    MAX_VIEWS = 4
+    # opacity of the nodes that belong to a neighbouring part
+    BOUNDARY_OPACITY = 0.4
+
+    # part number now on screen
+    partShown = pyqtSignal(int)
+    # SchematicView.nodeClicked / pipeClicked of the part on screen
+    nodeClicked = pyqtSignal(str)
+    pipeClicked = pyqtSignal(str)
+
+    def __init__(self, model, partition, engine="layered", parent=None):
+        """
+        model: the whole network
+        partition: CatchmentPartition of model
+        engine: NetworkDrawer layout engine for each part
+        """
+        super().__init__(parent)
+        self.model = model
+        self.partition = partition
+        self.engine = engine
+        self.views = OrderedDict()  # part -> SchematicView, least recently shown first
+        self.currentPart = None
+
+    def currentView(self):
+        return self.currentWidget()
+
+    def showPart(self, part):
+        """
+        Bring part on screen, building it first if it isn't built.
+        Returns:
+            its SchematicView
+        """
+        view = self.views.get(part)
+        if view is None:
+            view = self.buildPart(part)
+            self.addWidget(view)
+            self.views[part] = view
+        else:
+            self.views.move_to_end(part)
+        self.setCurrentWidget(view)
+
+        while len(self.views) > CatchmentView.MAX_VIEWS:
+            _, old = self.views.popitem(last=False)
+            self.removeWidget(old)
+            old.deleteLater()
+
+        if part != self.currentPart:
+            self.currentPart = part
+            self.partShown.emit(part)
+        return view
+
+    def showNode(self, node_id):
+        """Show the part node_id belongs to, centred on it."""
+        index = self.model.nodeIndex.get(node_id)
+        if index is None:
+            return
+        view = self.showPart(int(self.partition.labels[index]))
+        item = view.nodeItems.get(node_id)
+        if item is not None:
+            view.centerOn(item)
+
+    def buildPart(self, part):
+        """
+        Lay out part and its boundary nodes (see CatchmentPartition.boundary) and build their scene.
+        Raises ValueError as NetworkDrawer.layoutNetwork does.
+        """
+        model = self.model
+        boundary = self.partition.boundary(model, part)
+        sub = model.subModel(np.union1d(self.partition.members(part), boundary))
+        NetworkDrawer.layoutNetwork(sub, self.engine)
+
+        view = NetworkDrawer.buildScene(sub)
+        for index in boundary.tolist():
+            item = view.nodeItems.get(model.nodeIds[index])
+            if item is not None:
+                item.setOpacity(CatchmentView.BOUNDARY_OPACITY)
+        view.nodeClicked.connect(self.nodeClicked)
+        view.pipeClicked.connect(self.pipeClicked)
+        view.nodeActivated.connect(self.showNode)
+        return view
@@ -0,0 +1,152 @@
+import numpy as np
+
+from NetworkModel import NetworkModel
+
+
+class ChainCollapse:
+    """
+    A network with its runs of plain manholes contracted, so that layout and
+    the scene only deal with the nodes that matter on a flow schematic.
+
+    A manhole is hidden when it has exactly one conduit in and one out, both
+    plain links, and isn't monitored. Each run of hidden manholes becomes one
+    "chain" conduit between the nodes either side of it. Everything else is
+    kept: monitors, junctions, storage, outfalls and any other node type, and
+    pumps, weirs and every other conduit type. A closed loop made only of
+    such manholes is kept as it is, having no end to hang a chain on, and so
+    is a run that leaves and rejoins the same node.
+
+    `collapsed` is the contracted NetworkModel to lay out and draw; chains are
+    expanded back on screen with NetworkDrawer.expandChain.
+    """
+
+    def __init__(self, model):
+        """model: the whole network"""
+        self.model = model
+        n = model.nodeCount
+        src = model.edgeSrc
+        dst = model.edgeDst
+
+        # --------------------------
+        # Manholes that can be hidden
+        # --------------------------
+        names = list(model.nodeTypeNames)
+        codes = model.nodeTypeCodes.astype(np.int64)
+        codes[codes < 0] = len(names)
+        manhole = np.array(
+            [isinstance(name, str) and name.strip().lower() == "manhole" for name in names] + [False], dtype=bool
+        )
+        in_indptr, in_edges = model.reverse()
+        out_degree = np.diff(model.indptr)
+        in_degree = np.diff(in_indptr)
+
+        candidates = np.flatnonzero(manhole[codes] & ~model.isMonitor & (in_degree == 1) & (out_degree == 1))
+        link = model.edgeTypes == NetworkModel.CONDUIT_CODES["link"]
+        out_edge = model.indptr[candidates]
+        in_edge = in_edges[in_indptr[candidates]]
+        hideable = np.zeros(n, dtype=bool)
+        hideable[candidates[link[out_edge] & link[in_edge] & (dst[out_edge] != candidates)]] = True
+
+        # --------------------------
+        # Follow every chain from its upstream end, all of them a step at a time
+        # --------------------------
+        starts = np.flatnonzero(~hideable[src] & hideable[dst]).astype(np.int64)
+        ends = np.empty(starts.size, dtype=np.int64)
+        node_chain = np.full(n, -1, dtype=np.int64)
+        node_step = np.zeros(n, dtype=np.int64)
+
+        chain = np.arange(starts.size)
+        current = dst[starts].astype(np.int64)
+        step = 0
+        while current.size:
+            node_chain[current] = chain
+            node_step[current] = step
+            out = model.indptr[current]
+            below = dst[out].astype(np.int64)
+            more = hideable[below]
+            ends[chain[~more]] = out[~more]
+            chain, current = chain[more], below[more]
+            step += 1
+
+        # a run leaving and rejoining the same node would be a chain onto itself, drawn as
+        # a point nobody can click: keep it, like a closed loop
+        ring = src[starts] == dst[ends]
+        if ring.any():
+            renumber = np.cumsum(~ring) - 1
+            renumber[ring] = -1
+            on_chain = node_chain >= 0
+            node_chain[on_chain] = renumber[node_chain[on_chain]]
+            starts = starts[~ring]
+            ends = ends[~ring]
+
+        # hideable manholes no chain reached are on a closed loop: keep them
+        hidden = node_chain >= 0
+
+        # hidden manholes of chain c, upstream first, are self._nodes[self._nodeIndptr[c]:self._nodeIndptr[c + 1]];
+        # its conduits (one more than its manholes) likewise in self._edges / self._edgeIndptr
+        hidden_nodes = np.flatnonzero(hidden)
+        self._nodes = hidden_nodes[np.lexsort((node_step[hidden_nodes], node_chain[hidden_nodes]))]
+        self._nodeIndptr = np.zeros(starts.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(node_chain[hidden_nodes], minlength=starts.size), out=self._nodeIndptr[1:])
+
+        self._edgeIndptr = self._nodeIndptr + np.arange(starts.size + 1)
+        self._edges = np.empty(self._nodes.size + starts.size, dtype=np.int64)
+        self._edges[np.arange(self._nodes.size) + node_chain[self._nodes]] = in_edges[in_indptr[self._nodes]]
+        self._edges[self._edgeIndptr[1:] - 1] = ends
+
+        # --------------------------
+        # Contracted model
+        # --------------------------
+        edge_ids = model.edgeIds
+        # named after the first and last conduit, so a chain keeps its ID across reloads while it is unchanged
+        self.chainIds = [f"{edge_ids[first]}..{edge_ids[last]}" for first, last in zip(starts.tolist(), ends.tolist())]
+        self.chainIndex = {chain_id: c for c, chain_id in enumerate(self.chainIds)}
+        # node index in the whole network of every node in collapsed
+        self.keptNodes = np.flatnonzero(~hidden)
+        # the kept nodes either side of each chain
+        self.sourceEnds = src[starts].astype(np.int64)
+        self.sinkEnds = dst[ends].astype(np.int64)
+        self.collapsed = model.subModel(self.keptNodes, (
+            self.sourceEnds,
+            self.sinkEnds,
+            np.full(starts.size, NetworkModel.CONDUIT_CODES["chain"], dtype=np.int8),
+            self.chainIds,
+        ))
+
+    @property
+    def chainCount(self):
+        return len(self.chainIds)
+
+    @property
+    def hiddenCount(self):
+        return self._nodes.size
+
+    def chain(self, edge_id):
+        """The chain a collapsed conduit stands for, or None for an ordinary conduit."""
+        return self.chainIndex.get(edge_id)
+
+    def nodes(self, chain):
+        """Hidden manholes of chain, upstream first, as node indices in the whole network."""
+        return self._nodes[self._nodeIndptr[chain]:self._nodeIndptr[chain + 1]]
+
+    def edges(self, chain):
+        """Conduits of chain, upstream first, as edge indices in the whole network."""
+        return self._edges[self._edgeIndptr[chain]:self._edgeIndptr[chain + 1]]
+
+    def fullPositions(self):
+        """
+        Fill the whole network's positions from the laid out collapsed model,
+        spacing each chain's manholes evenly along the conduit it was drawn as.
+        Returns:
+            the whole network's NetworkModel
+        """
+        model = self.model
+        model.positions[self.keptNodes] = self.collapsed.positions
+        if self._nodes.size:
+            counts = np.diff(self._nodeIndptr)
+            chain = np.repeat(np.arange(self.chainCount), counts)
+            step = np.arange(self._nodes.size) - self._nodeIndptr[chain]
+            along = ((step + 1) / (counts[chain] + 1))[:, None]
+            start = model.positions[self.sourceEnds[chain]]
+            model.positions[self._nodes] = start + along * (model.positions[self.sinkEnds[chain]] - start)
+        return model
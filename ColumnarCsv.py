@@ -0,0 +1,171 @@
+import csv
+import gc
+import threading
+from contextlib import contextmanager
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # optional dependency
+    pa = None
+    pacsv = None
+
+
+_gcLock = threading.Lock()
+_gcPauses = 0
+_gcWasEnabled = False
+
+
+class ColumnarCsv:
+    """
+    Reads selected columns of a CSV file into per-column lists of strings.
+
+    Uses pyarrow's multi-threaded CSV reader when it is installed and falls
+    back to csv.reader (no per-row dicts) otherwise. Headers are matched after
+    stripping whitespace and a UTF-8 BOM, like NetworkGenerator's DictReader path.
+    """
+
+    # rows per block yielded by iterColumns
+    BLOCK_ROWS = 65536
+
+    @staticmethod
+    @contextmanager
+    def gcPaused():
+        """
+        Pause the cyclic garbage collector while bulk-building millions of small
+        acyclic containers (lists/tuples), which otherwise trigger repeated full
+        collections. Nests safely across the loader threads.
+        """
+        global _gcPauses, _gcWasEnabled
+        with _gcLock:
+            if _gcPauses == 0:
+                _gcWasEnabled = gc.isenabled()
+                gc.disable()
+            _gcPauses += 1
+        try:
+            yield
+        finally:
+            with _gcLock:
+                _gcPauses -= 1
+                if _gcPauses == 0 and _gcWasEnabled:
+                    gc.enable()
+
+    @staticmethod
+    def backend():
+        return "pyarrow" if pacsv is not None else "csv"
+
+    @staticmethod
+    def readHeader(filename):
+        with open(filename, newline="", encoding="utf-8-sig") as f:
+            return next(csv.reader(f), [])
+
+    @staticmethod
+    def readColumns(filename, columns):
+        """
+        columns: header names to read, e.g. ["US node ID", "Link suffix", "DS node ID"]
+        Returns:
+            { column: [str, ...], ... }
+        Raises KeyError if a column is missing from the header.
+        """
+        header = ColumnarCsv.readHeader(filename)
+        raw_names = {name.strip(): name for name in header if name}
+        for column in columns:
+            if column not in raw_names:
+                raise KeyError(column)
+
+        if pacsv is not None:
+            return ColumnarCsv._readPyarrow(filename, columns, raw_names)
+        return ColumnarCsv._readCsv(filename, columns, header)
+
+    @staticmethod
+    def iterColumns(filename, columns, blockRows=BLOCK_ROWS):
+        """
+        Like readColumns, but yields the file a block at a time so only one
+        block's strings are alive at once. pyarrow sizes blocks by bytes, the
+        csv fallback by rows; both aim for roughly blockRows rows.
+        Yields:
+            { column: [str, ...], ... } per block
+        Raises KeyError if a column is missing from the header.
+        """
+        header = ColumnarCsv.readHeader(filename)
+        raw_names = {name.strip(): name for name in header if name}
+        for column in columns:
+            if column not in raw_names:
+                raise KeyError(column)
+
+        if pacsv is not None:
+            yield from ColumnarCsv._iterPyarrow(filename, columns, raw_names, blockRows)
+        else:
+            yield from ColumnarCsv._iterCsv(filename, columns, header, blockRows)
+
+    @staticmethod
+    def _convertOptions(raw):
+        return pacsv.ConvertOptions(
+            include_columns=raw,
+            # keep IDs such as "007" as text, and empty cells as ""
+            column_types={name: pa.string() for name in raw},
+            strings_can_be_null=False,
+        )
+
+    @staticmethod
+    def _readPyarrow(filename, columns, raw_names):
+        raw = [raw_names[column] for column in columns]
+        table = pacsv.read_csv(filename, convert_options=ColumnarCsv._convertOptions(raw))
+        return {column: table.column(name).to_pylist() for column, name in zip(columns, raw)}
+
+    @staticmethod
+    def _iterPyarrow(filename, columns, raw_names, blockRows):
+        raw = [raw_names[column] for column in columns]
+        reader = pacsv.open_csv(
+            filename,
+            # block_size is in bytes; allow for a generous row width
+            read_options=pacsv.ReadOptions(block_size=max(blockRows * 64, 1 << 16)),
+            convert_options=ColumnarCsv._convertOptions(raw),
+        )
+        for batch in reader:
+            if batch.num_rows:
+                yield {column: batch.column(name).to_pylist() for column, name in zip(columns, raw)}
+
+    @staticmethod
+    def _readCsv(filename, columns, header):
+        stripped = [name.strip() if name else name for name in header]
+        indices = [stripped.index(column) for column in columns]
+        values = [[] for _ in columns]
+        appends = [v.append for v in values]
+
+        with open(filename, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if not row:
+                    continue
+                for append, index in zip(appends, indices):
+                    append(row[index] if index < len(row) else "")
+
+        return dict(zip(columns, values))
+
+    @staticmethod
+    def _iterCsv(filename, columns, header, blockRows):
+        stripped = [name.strip() if name else name for name in header]
+        indices = [stripped.index(column) for column in columns]
+
+        with open(filename, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            while True:
+                values = [[] for _ in columns]
+                appends = [v.append for v in values]
+                rows = 0
+                for row in reader:
+                    if not row:
+                        continue
+                    for append, index in zip(appends, indices):
+                        append(row[index] if index < len(row) else "")
+                    rows += 1
+                    if rows == blockRows:
+                        break
+                if not rows:
+                    return
+                yield dict(zip(columns, values))
+                if rows < blockRows:
+                    return
@@ -0,0 +1,220 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import networkx as nx
+import numpy as np
+
+from LayeredLayout import LayeredLayout
+
+
+def _layoutBatch(batch):
+    """
+    Process-pool entry point: lay out a batch of components.
+    batch: [(engine, n, src, dst), ...] with node indices local to each component
+    Returns:
+        [float64 array (n, 2), ...]
+    """
+    return [ComponentLayout.layoutArrays(engine, n, src, dst) for engine, n, src, dst in batch]
+
+
+class ComponentLayout:
+    """
+    Lays out each weakly connected component of a network independently, in a
+    process pool when the network is large enough, then packs the components
+    onto one canvas with a shelf bin-packing pass so they never overlap.
+    """
+
+    # space between packed components, in layout units (see LayeredLayout)
+    COMPONENT_GAP = 144.0
+
+    # below this many nodes, starting a pool costs more than it saves
+    MIN_PARALLEL_NODES = 5000
+
+    # layout runs on GraphBuildWorker's QThread, and forking a process that
+    # has Qt threads running can deadlock the child, so workers start fresh
+    POOL_START_METHOD = "spawn"
+
+    @staticmethod
+    def layoutArrays(engine, n, src, dst):
+        """
+        Lay out one component given as integer edge arrays.
+        Returns:
+            float64 array (n, 2) of (x, y) with flow running left-to-right
+        """
+        if engine == "layered":
+            return LayeredLayout.layout(n, src, dst)
+
+        if engine == "graphviz":
+            from networkx.drawing.nx_pydot import graphviz_layout
+
+            G = nx.DiGraph()
+            G.add_nodes_from(range(n))
+            G.add_edges_from(zip(src.tolist(), dst.tolist()))
+            pos = graphviz_layout(
+                G,
+                prog="dot",
+            )
+
+            # `dot` lays ranks out top-to-bottom in y-up coordinates, so upstream
+            # nodes get the largest y. Rotate so flow runs left-to-right.
+            coords = np.zeros((n, 2), dtype=np.float64)
+            for i, (x, y) in pos.items():
+                coords[int(i)] = (-y, x)
+            return coords
+
+        raise ValueError(f"Unknown layout engine: {engine!r}")
+
+    @staticmethod
+    def componentLabels(n, src, dst):
+        """
+        Weakly connected components by hooking and pointer jumping on the edge
+        arrays (O(log n) vectorised rounds, no per-node Python work).
+        Returns:
+            (labels, sizes) -- labels[i] in 0..k-1, numbered by decreasing size
+        """
+        parent = np.arange(n, dtype=np.int64)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+
+        while True:
+            pu, pv = parent[src], parent[dst]
+            differ = pu != pv
+            if not differ.any():
+                break
+            # hook the larger root under the smaller one, then flatten every tree
+            np.minimum.at(parent, np.maximum(pu[differ], pv[differ]), np.minimum(pu[differ], pv[differ]))
+            while True:
+                grand = parent[parent]
+                if np.array_equal(grand, parent):
+                    break
+                parent = grand
+
+        roots, labels, sizes = np.unique(parent, return_inverse=True, return_counts=True)
+        by_size = np.argsort(-sizes, kind="stable")
+        rename = np.empty_like(by_size)
+        rename[by_size] = np.arange(by_size.size)
+        return rename[labels], sizes[by_size]
+
+    @staticmethod
+    def layout(G, engine="layered", workers=None):
+        """
+        Lay out a networkx DiGraph component by component.
+        Returns:
+            { node_id: (x, y), ... }
+        """
+        node_list = list(G.nodes)
+        index = {node: i for i, node in enumerate(node_list)}
+        src = np.fromiter((index[u] for u, _ in G.edges), dtype=np.int64, count=G.number_of_edges())
+        dst = np.fromiter((index[v] for _, v in G.edges), dtype=np.int64, count=G.number_of_edges())
+
+        coords = ComponentLayout.layoutEdges(len(node_list), src, dst, engine, workers)
+        return {node: (x, y) for node, (x, y) in zip(node_list, coords.tolist())}
+
+    @staticmethod
+    def layoutEdges(n, src, dst, engine="layered", workers=None):
+        """
+        Lay out n nodes joined by src[i] -> dst[i], component by component.
+        workers: pool size (None = one per CPU, 1 = lay out in-process)
+        Returns:
+            float64 array (n, 2) of (x, y) with flow running left-to-right
+        """
+        if n == 0:
+            return np.zeros((0, 2), dtype=np.float64)
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+
+        # label every node with its component and its index within that component
+        label, sizes = ComponentLayout.componentLabels(n, src, dst)
+        members_order = np.argsort(label, kind="stable")
+        member_ptr = np.zeros(sizes.size + 1, dtype=np.int64)
+        np.cumsum(sizes, out=member_ptr[1:])
+        local = np.empty(n, dtype=np.int64)
+        local[members_order] = np.arange(n) - member_ptr[label[members_order]]
+
+        # group edges by component
+        edge_order = np.argsort(label[src], kind="stable")
+        edge_ptr = np.zeros(sizes.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(label[src], minlength=sizes.size), out=edge_ptr[1:])
+
+        jobs = []
+        for comp_index in range(sizes.size):
+            edges = edge_order[edge_ptr[comp_index]:edge_ptr[comp_index + 1]]
+            jobs.append((engine, int(sizes[comp_index]), local[src[edges]], local[dst[edges]]))
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(jobs))
+
+        if workers <= 1 or n < ComponentLayout.MIN_PARALLEL_NODES:
+            results = _layoutBatch(jobs)
+        else:
+            results = ComponentLayout._layoutInPool(jobs, workers)
+
+        offsets = ComponentLayout.pack(results)
+
+        coords = np.zeros((n, 2), dtype=np.float64)
+        for comp_index in range(sizes.size):
+            members = members_order[member_ptr[comp_index]:member_ptr[comp_index + 1]]
+            coords[members] = results[comp_index] + offsets[comp_index]
+        return coords
+
+    @staticmethod
+    def _layoutInPool(jobs, workers):
+        """
+        Spread jobs over `workers` processes. Jobs are grouped into a few batches
+        per worker, largest first onto the lightest batch, so dozens of tiny
+        catchments don't each pay a round trip and one huge one doesn't stall the rest.
+        """
+        batch_count = min(len(jobs), workers * 4)
+        batches = [[] for _ in range(batch_count)]
+        loads = [0] * batch_count
+        slots = [[] for _ in range(batch_count)]
+
+        for job_index, job in enumerate(jobs):  # jobs are sorted largest first
+            lightest = loads.index(min(loads))
+            batches[lightest].append(job)
+            slots[lightest].append(job_index)
+            loads[lightest] += job[1] + job[2].size
+
+        results = [None] * len(jobs)
+        context = multiprocessing.get_context(ComponentLayout.POOL_START_METHOD)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for batch_slots, batch_result in zip(slots, pool.map(_layoutBatch, batches)):
+                for job_index, coords in zip(batch_slots, batch_result):
+                    results[job_index] = coords
+        return results
+
+    @staticmethod
+    def pack(layouts, gap=COMPONENT_GAP):
+        """
+        Shelf-pack component layouts (next-fit, by decreasing height).
+        Returns:
+            float64 array (len(layouts), 2) of offsets to add to each layout
+        """
+        offsets = np.zeros((len(layouts), 2), dtype=np.float64)
+        if not layouts:
+            return offsets
+
+        mins = np.array([coords.min(axis=0) for coords in layouts])
+        sizes = np.array([coords.max(axis=0) for coords in layouts]) - mins
+
+        # aim for a roughly square canvas, but never narrower than the widest component
+        area = float(((sizes[:, 0] + gap) * (sizes[:, 1] + gap)).sum())
+        shelf_width = max(float(sizes[:, 0].max()), math.sqrt(area))
+
+        x = y = shelf_height = 0.0
+        for i in np.argsort(-sizes[:, 1], kind="stable"):
+            w, h = sizes[i]
+            if x > 0.0 and x + w > shelf_width:
+                # start a new shelf
+                x = 0.0
+                y += shelf_height + gap
+                shelf_height = 0.0
+            offsets[i] = (x - mins[i, 0], y - mins[i, 1])
+            x += w + gap
+            shelf_height = max(shelf_height, h)
+
+        return offsets
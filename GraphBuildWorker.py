@@ -0,0 +1,226 @@
+import threading
+
+import numpy as np
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from NetworkGenerator import NetworkGenerator
+from NetworkDrawer import NetworkDrawer
+from NetworkSnapshot import NetworkSnapshot
+from NetworkDiff import NetworkDiff
+from CatchmentPartition import CatchmentPartition
+from ChainCollapse import ChainCollapse
+
+
+class BuildCancelled(Exception):
+    pass
+
+
+class GraphBuildWorker(QObject):
+    """
+    Runs the (concurrent) CSV load, conduit merge and layout stages off the GUI thread.
+
+    Move to a QThread and connect `run` to QThread.started. Scene construction
+    creates QGraphicsItems, so it stays on the GUI thread; `finished` hands the
+    laid out network back for MainWindow.drawGraph.
+
+    Given the model currently on screen as `previous`, the new load is diffed
+    against it and only the changed components are laid out again, for
+    MainWindow.updateGraph to apply to the existing scene.
+
+    With the datasets of an earlier load and the keys of the files that changed
+    since (see SourceWatcher), only those files are parsed again.
+
+    Monitor catchments are traced up front (see NetworkTrace.precompute), so
+    tracing on screen starts fast; a reload that leaves the conduits alone
+    keeps the previous model's traces.
+
+    With `partitioned`, nothing is laid out here: the network is split into
+    monitor sub-catchments (see CatchmentPartition) for CatchmentView to lay
+    out and build one at a time.
+
+    With `collapseChains`, runs of plain manholes are contracted (see
+    ChainCollapse) before anything else sees the network: the model handed
+    back, laid out and partitioned is the collapsed one.
+    """
+
+    # overall progress range (percent) covered by each stage
+    STAGES = {
+        "load": (0, 40, "Loading CSV files..."),
+        "merge": (40, 48, "Merging conduits..."),
+        "collapse": (48, 50, "Collapsing manhole chains..."),
+        "layout": (50, 72, "Laying out network..."),
+        "trace": (72, 75, "Tracing monitor catchments..."),
+        "scene": (75, 100, "Building schematic..."),
+    }
+
+    # (stage, overall percent, message)
+    progress = pyqtSignal(str, int, str)
+    # {"model": NetworkModel, "sources": NetworkSnapshot.fingerprint(...) or None,
+    #  "previous": NetworkModel or None, "diff": NetworkDiff or None (None: draw from scratch),
+    #  "datasets": loadAll output if keepDatasets, else None,
+    #  "partition": CatchmentPartition if partitioned, else None,
+    #  "chains": ChainCollapse that "model" is the collapsed model of, if collapseChains, else None}
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, paths, engine="layered", columnar=True, snapshotPath=None, previous=None,
+                 datasets=None, reloadKeys=None, keepDatasets=False, partitioned=False, collapseChains=False):
+        """
+        paths: {"nodePath": str, "monitorsPath": str, "pipePath": str, ...}
+               as held on AppManager
+        columnar: parse CSVs with the columnar reader (see ColumnarCsv)
+        snapshotPath: if set, open from this snapshot when its sources are
+                      unchanged, and (re)write it after a full build
+        previous: laid out NetworkModel of the same network, for an incremental reload
+        datasets: loadAll output of an earlier build, reused for every file not in reloadKeys
+        reloadKeys: path keys to parse again; None parses every file
+        keepDatasets: hand the parsed datasets back in the result, for the next reload
+        partitioned: split into monitor sub-catchments instead of laying out
+                     (previous then only lends its traces, and there is no snapshot)
+        collapseChains: lay out and draw the network with its manhole runs
+                        contracted; previous is then a collapsed model too
+        """
+        super().__init__()
+        self.paths = dict(paths)
+        self.engine = engine
+        self.columnar = columnar
+        self.snapshotPath = snapshotPath
+        self.previous = previous
+        self.datasets = datasets
+        self.reloadKeys = reloadKeys
+        self.keepDatasets = keepDatasets
+        self.partitioned = partitioned
+        self.collapseChains = collapseChains
+        self._cancelEvent = threading.Event()
+
+    def cancel(self):
+        # Called from the GUI thread; checked between stages and files
+        self._cancelEvent.set()
+
+    def isCancelled(self):
+        return self._cancelEvent.is_set()
+
+    @staticmethod
+    def stageProgress(stage, fraction):
+        """Map a fraction of one stage onto the overall 0-100 range."""
+        start, end, _ = GraphBuildWorker.STAGES[stage]
+        return int(start + (end - start) * min(max(fraction, 0.0), 1.0))
+
+    def _report(self, stage, fraction):
+        if self.isCancelled():
+            raise BuildCancelled()
+        self.progress.emit(stage, GraphBuildWorker.stageProgress(stage, fraction), GraphBuildWorker.STAGES[stage][2])
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            result = self._build()
+        except BuildCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(f"{type(e).__name__}: {e}")
+        else:
+            self.finished.emit(result)
+
+    def _precomputeTrace(self, model):
+        self._report("trace", 0.0)
+        model.trace().precompute(np.flatnonzero(model.isMonitor))
+        self._report("trace", 1.0)
+
+    def _build(self):
+        paths = self.paths
+
+        # --------------------------
+        # Snapshot (skips every other stage when current)
+        # --------------------------
+        self._report("load", 0.0)
+        if self.snapshotPath and self.previous is None:
+            snapshot = NetworkSnapshot.loadIfCurrent(self.snapshotPath, paths, self.engine)
+            if snapshot is not None:
+                model, sources = snapshot
+                self._precomputeTrace(model)
+                return {"model": model, "sources": sources, "previous": None, "diff": None, "datasets": None,
+                        "partition": None, "chains": None}
+
+        # fingerprint before reading, so edits made during the load leave the snapshot stale
+        sources = NetworkSnapshot.fingerprint(paths) if self.snapshotPath else None
+
+        # --------------------------
+        # Load
+        # --------------------------
+        # the source layout engines place nodes at the nodes table's x/y
+        coordinates = self.engine in NetworkDrawer.SOURCE_ENGINES
+        if not self.keepDatasets:
+            # nothing to cache: stream the conduit tables into the model, so
+            # the parsed tables never all sit in memory at once (load and merge in one pass)
+            model = NetworkGenerator.streamModel(
+                paths,
+                columnar=self.columnar,
+                coordinates=coordinates,
+                onFile=lambda key, done, total: self._report("load", done / total),
+            )
+            datasets = None
+        else:
+            reuse = self.datasets if self.reloadKeys is not None else None
+            if reuse is not None:
+                # only the changed files, plus any the cached load didn't have
+                paths = {key: path for key, path in paths.items() if key in self.reloadKeys or key not in reuse}
+            datasets = NetworkGenerator.loadAll(
+                paths,
+                onLoaded=lambda key, done, total: self._report("load", done / total),
+                columnar=self.columnar,
+                coordinates=coordinates,
+            )
+            if reuse is not None:
+                datasets = {**reuse, **datasets}
+
+            # --------------------------
+            # Merge
+            # --------------------------
+            self._report("merge", 0.0)
+            model = NetworkGenerator.generateModel(datasets)
+        self._report("merge", 1.0)
+
+        chains = None
+        if self.collapseChains:
+            self._report("collapse", 0.0)
+            chains = ChainCollapse(model)
+            model = chains.collapsed
+            self._report("collapse", 1.0)
+
+        if self.partitioned:
+            # each part is laid out when it is first shown
+            if self.previous is not None:
+                model.inheritTrace(self.previous)
+            self._precomputeTrace(model)
+            partition = CatchmentPartition(model)
+            return {"model": model, "sources": sources, "previous": self.previous, "diff": None,
+                    "datasets": datasets, "partition": partition, "chains": chains}
+
+        # --------------------------
+        # Layout
+        # --------------------------
+        self._report("layout", 0.0)
+        diff = None
+        if self.previous is not None:
+            diff = NetworkDiff.compare(self.previous, model)
+            NetworkDrawer.layoutIncremental(model, self.previous, diff, self.engine)
+        else:
+            NetworkDrawer.layoutNetwork(model, self.engine)
+
+        if self.snapshotPath:
+            try:
+                NetworkSnapshot.save(self.snapshotPath, model, sources, self.engine)
+            except OSError as e:
+                # the schematic is still usable without a snapshot
+                print(f"Snapshot write failed: {e}")
+        self._report("layout", 1.0)
+
+        if self.previous is not None:
+            model.inheritTrace(self.previous)
+        self._precomputeTrace(model)
+
+        return {"model": model, "sources": sources, "previous": self.previous, "diff": diff, "datasets": datasets,
+                "partition": None, "chains": chains}
@@ -0,0 +1,311 @@
+import numpy as np
+
+
+class LayeredLayout:
+    """
+    In-process Sugiyama-style layout for directed drainage networks.
+
+    Works on integer edge arrays (node indices 0..n-1) rather than DOT text:
+        1. break cycles by reversing DFS back edges
+        2. rank nodes by longest path to a sink, so flow runs along +x and
+           tributaries sit right next to the junction they drain into
+        3. split edges spanning several ranks with dummy nodes
+        4. order each rank with barycentre sweeps
+        5. assign cross-rank (y) coordinates with order-preserving compaction
+
+    Spacing defaults mirror Graphviz `dot` (0.75in nodes, 0.25in nodesep, 0.5in
+    ranksep, in points), so the drawer's scale factor behaves the same for both.
+    """
+
+    RANK_SEP = 72.0
+    NODE_SEP = 72.0
+
+    @staticmethod
+    def layoutGraph(G, rank_sep=RANK_SEP, node_sep=NODE_SEP, sweeps=4):
+        """
+        Lay out a networkx DiGraph.
+        Returns:
+            { node: (x, y), ... }
+        """
+        node_list = list(G.nodes)
+        index = {node: i for i, node in enumerate(node_list)}
+
+        src = np.fromiter((index[u] for u, _ in G.edges), dtype=np.int64, count=G.number_of_edges())
+        dst = np.fromiter((index[v] for _, v in G.edges), dtype=np.int64, count=G.number_of_edges())
+
+        coords = LayeredLayout.layout(len(node_list), src, dst, rank_sep, node_sep, sweeps)
+        return {node: (x, y) for node, (x, y) in zip(node_list, coords.tolist())}
+
+    @staticmethod
+    def layout(n, src, dst, rank_sep=RANK_SEP, node_sep=NODE_SEP, sweeps=4):
+        """
+        Lay out n nodes joined by the directed edges src[i] -> dst[i].
+        Returns:
+            float64 array of shape (n, 2) holding (x, y) per node index
+        """
+        coords = np.zeros((n, 2), dtype=np.float64)
+        if n == 0:
+            return coords
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+
+        # Self loops carry no layering information
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+
+        height = LayeredLayout._heights(n, src, dst)
+        if (height < 0).any():
+            # Loops in the network (e.g. pumped returns): reverse back edges and retry
+            back = LayeredLayout._backEdges(n, src, dst)
+            src, dst = np.where(back, dst, src), np.where(back, src, dst)
+            height = LayeredLayout._heights(n, src, dst)
+
+        rank = height.max() - height
+
+        rank, es, ed = LayeredLayout._splitLongEdges(rank, src, dst)
+        order = LayeredLayout._orderRanks(rank, es, ed, sweeps)
+        y = LayeredLayout._assignCoordinates(rank, order, es, ed, node_sep)
+
+        coords[:, 0] = rank[:n] * rank_sep
+        coords[:, 1] = y[:n]
+        return coords
+
+    # --------------------------
+    # CSR helpers
+    # --------------------------
+
+    @staticmethod
+    def _csr(n, keys, values):
+        """Group `values` by `keys` (0..n-1). Returns (indptr, grouped_values)."""
+        order = np.argsort(keys, kind="stable")
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=n), out=indptr[1:])
+        return indptr, values[order]
+
+    @staticmethod
+    def _gather(indptr, values, rows):
+        """Concatenate the CSR rows listed in `rows`."""
+        starts = indptr[rows]
+        counts = indptr[rows + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return values[:0]
+        offsets = np.cumsum(counts) - counts
+        idx = np.repeat(starts - offsets, counts) + np.arange(total)
+        return values[idx]
+
+    # --------------------------
+    # 1 + 2: cycle breaking and ranking
+    # --------------------------
+
+    @staticmethod
+    def _heights(n, src, dst):
+        """
+        Longest path (in edges) from each node to a sink, found by peeling sinks
+        level by level. Nodes on a cycle never get peeled and are left at -1.
+        """
+        height = np.full(n, -1, dtype=np.int64)
+        outdeg = np.bincount(src, minlength=n)
+        in_ptr, in_src = LayeredLayout._csr(n, dst, src)
+
+        frontier = np.flatnonzero(outdeg == 0)
+        level = 0
+        while frontier.size:
+            height[frontier] = level
+            preds = LayeredLayout._gather(in_ptr, in_src, frontier)
+            if preds.size == 0:
+                break
+            uniq, counts = np.unique(preds, return_counts=True)
+            outdeg[uniq] -= counts
+            frontier = uniq[outdeg[uniq] == 0]
+            level += 1
+        return height
+
+    @staticmethod
+    def _backEdges(n, src, dst):
+        """Mask of edges closing a cycle in an iterative DFS."""
+        out_ptr, out_edge = LayeredLayout._csr(n, src, np.arange(src.size))
+        ptr = out_ptr.tolist()
+        edge_ids = out_edge.tolist()
+        targets = dst[out_edge].tolist()
+
+        back = np.zeros(src.size, dtype=bool)
+        state = bytearray(n)  # 0 = unvisited, 1 = on the DFS stack, 2 = finished
+        for root in range(n):
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [[root, ptr[root]]]
+            while stack:
+                top = stack[-1]
+                node, i = top
+                if i < ptr[node + 1]:
+                    top[1] = i + 1
+                    t = targets[i]
+                    if state[t] == 0:
+                        state[t] = 1
+                        stack.append([t, ptr[t]])
+                    elif state[t] == 1:
+                        back[edge_ids[i]] = True
+                else:
+                    state[node] = 2
+                    stack.pop()
+        return back
+
+    # --------------------------
+    # 3: dummy nodes
+    # --------------------------
+
+    @staticmethod
+    def _splitLongEdges(rank, src, dst):
+        """
+        Replace every edge spanning k > 1 ranks with a chain through k - 1 dummy
+        nodes, numbered after the real nodes. Returns (rank, src, dst) covering
+        real and dummy nodes, where every edge spans exactly one rank.
+        """
+        n = rank.size
+        span = rank[dst] - rank[src]
+        is_long = span > 1
+        if not is_long.any():
+            return rank, src, dst
+
+        long_src, long_dst = src[is_long], dst[is_long]
+        per_edge = span[is_long] - 1
+        total = int(per_edge.sum())
+        offsets = np.cumsum(per_edge) - per_edge
+
+        step = np.arange(total) - np.repeat(offsets, per_edge)
+        dummies = n + np.arange(total)
+        dummy_rank = np.repeat(rank[long_src], per_edge) + step + 1
+
+        # each dummy is fed by the previous dummy in its chain (or the edge source)
+        prev = dummies - 1
+        first = step == 0
+        prev[first] = long_src
+        last_dummy = n + offsets + per_edge - 1
+
+        es = np.concatenate([src[~is_long], prev, last_dummy])
+        ed = np.concatenate([dst[~is_long], dummies, long_dst])
+        return np.concatenate([rank, dummy_rank]), es, ed
+
+    # --------------------------
+    # 4: crossing reduction
+    # --------------------------
+
+    @staticmethod
+    def _orderRanks(rank, es, ed, sweeps):
+        """
+        Barycentre ordering. The first sweep runs upstream from the sinks, which
+        already gives a crossing-free order for tree-shaped (dendritic) networks;
+        further sweeps alternate direction to untangle loops and splits.
+        Returns the position of every node within its rank.
+        """
+        N = rank.size
+        max_rank = int(rank.max())
+        rank_ptr, rank_nodes = LayeredLayout._csr(max_rank + 1, rank, np.arange(N))
+
+        # edges grouped by the rank of their upstream / downstream end
+        up_ptr, up_edges = LayeredLayout._csr(max_rank + 1, rank[es], np.arange(es.size))
+        down_ptr, down_edges = LayeredLayout._csr(max_rank + 1, rank[ed], np.arange(ed.size))
+
+        pos = np.empty(N, dtype=np.float64)
+        for r in range(max_rank + 1):
+            members = rank_nodes[rank_ptr[r]:rank_ptr[r + 1]]
+            pos[members] = np.arange(members.size)
+
+        for sweep in range(max(1, sweeps)):
+            upstream = sweep % 2 == 0
+            ranks = range(max_rank - 1, -1, -1) if upstream else range(1, max_rank + 1)
+            for r in ranks:
+                members = rank_nodes[rank_ptr[r]:rank_ptr[r + 1]]
+                if members.size < 2:
+                    continue
+                if upstream:
+                    edges = up_edges[up_ptr[r]:up_ptr[r + 1]]
+                    mine, theirs = es[edges], ed[edges]
+                else:
+                    edges = down_edges[down_ptr[r]:down_ptr[r + 1]]
+                    mine, theirs = ed[edges], es[edges]
+
+                LayeredLayout._sortByBarycentre(members, mine, theirs, pos)
+        return pos
+
+    @staticmethod
+    def _sortByBarycentre(members, mine, theirs, pos):
+        """Reorder `members` (one rank) in place in `pos` by neighbour barycentre."""
+        members = members[np.argsort(pos[members], kind="stable")]
+
+        # map each edge endpoint to its slot within this rank
+        sorter = np.argsort(members)
+        slots = sorter[np.searchsorted(members, mine, sorter=sorter)]
+        sums = np.bincount(slots, weights=pos[theirs], minlength=members.size)
+        counts = np.bincount(slots, minlength=members.size)
+
+        has = counts > 0
+        key = np.empty(members.size, dtype=np.float64)
+        key[has] = sums[has] / counts[has]
+        if not has.all():
+            # nodes with no neighbour on this side stay glued to the node before them
+            idx = np.where(has, np.arange(members.size), -1)
+            np.maximum.accumulate(idx, out=idx)
+            key[~has] = np.where(idx[~has] >= 0, key[np.maximum(idx[~has], 0)], -np.inf)
+
+        new_order = np.lexsort((np.arange(members.size), key))
+        pos[members[new_order]] = np.arange(members.size)
+
+    # --------------------------
+    # 5: coordinate assignment
+    # --------------------------
+
+    @staticmethod
+    def _assignCoordinates(rank, pos, es, ed, node_sep, iterations=6):
+        """
+        Pull each node towards the mean of its neighbours while keeping the rank
+        order and at least `node_sep` between consecutive nodes of a rank.
+        """
+        N = rank.size
+        seq = np.lexsort((pos, rank))  # nodes sorted by (rank, position)
+        seq_rank = rank[seq]
+
+        y = np.empty(N, dtype=np.float64)
+        y[seq] = pos[seq] * node_sep
+
+        degree = np.bincount(es, minlength=N) + np.bincount(ed, minlength=N)
+        lonely = degree == 0
+        degree[lonely] = 1
+
+        for _ in range(iterations):
+            # float even without edges (e.g. only a self-loop), where bincount gives int64
+            desired = (np.bincount(es, weights=y[ed], minlength=N)
+                       + np.bincount(ed, weights=y[es], minlength=N)).astype(np.float64)
+            desired /= degree
+            desired[lonely] = y[lonely]
+
+            wanted = desired[seq]
+            forward = LayeredLayout._pack(wanted, seq_rank, node_sep)
+            backward = -LayeredLayout._pack(-wanted[::-1], seq_rank[::-1], node_sep)[::-1]
+            y[seq] = (forward + backward) / 2.0
+
+        return y - y.min()
+
+    @staticmethod
+    def _pack(wanted, seq_rank, node_sep):
+        """
+        Smallest coordinates >= `wanted` with consecutive entries of the same rank
+        at least `node_sep` apart. `seq_rank` must be grouped (constant runs).
+        """
+        if wanted.size == 0:
+            return wanted
+        boundary = np.ones(wanted.size, dtype=bool)
+        boundary[1:] = seq_rank[1:] != seq_rank[:-1]
+        starts = np.flatnonzero(boundary)
+        run = np.cumsum(boundary) - 1
+        k = np.arange(wanted.size) - starts[run]
+
+        z = wanted - k * node_sep
+        # offset each run above the previous one so a single cumulative max is segmented
+        spread = float(z.max() - z.min()) + 1.0
+        z = z + run * spread
+        np.maximum.accumulate(z, out=z)
+        return z - run * spread + k * node_sep
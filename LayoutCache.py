@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+class LayoutCache:
+    """
+    On-disk cache of computed node positions.
+
+    Entries are keyed by a hash of the laid out node IDs, the edges between
+    them and the layout parameters, so re-opening an unchanged network skips
+    the layout step. Positions are stored as one .npy array in node order, so
+    neither hashing nor loading touches nodes one at a time.
+    The directory is bounded to MAX_BYTES; least recently used entries go first.
+    """
+
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fm-schematic-automation", "layouts")
+    MAX_BYTES = 256 * 1024 * 1024
+    EXTENSION = ".npy"
+
+    # bump when the stored format or the layout algorithms change
+    VERSION = 3
+
+    @staticmethod
+    def key(nodeIds, src, dst, params):
+        """
+        Hash a network plus the layout parameters that shaped its positions.
+        nodeIds: laid out node IDs, in the order their positions are stored
+        src, dst: integer arrays, each edge's end points as indices into nodeIds
+        params: JSON-serialisable dict, e.g. {"engine": "layered", "scale": 1.5}
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{LayoutCache.VERSION}\n".encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+
+        digest.update(f"\nnodes {len(nodeIds)}\n".encode())
+        digest.update("\n".join(str(n) for n in nodeIds).encode())
+
+        digest.update(b"\nedges\n")
+        digest.update(np.ascontiguousarray(src, dtype="<i8").tobytes())
+        digest.update(np.ascontiguousarray(dst, dtype="<i8").tobytes())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _path(key):
+        return os.path.join(LayoutCache.CACHE_DIR, key + LayoutCache.EXTENSION)
+
+    @staticmethod
+    def load(key, count):
+        """
+        count: number of laid out nodes the entry must hold
+        Returns:
+            (count, 2) float64 array of positions in key's node order, or None on a cache miss
+        """
+        path = LayoutCache._path(key)
+        try:
+            positions = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        if positions.shape != (count, 2):
+            return None
+
+        # mark as recently used for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return positions.astype(np.float64, copy=False)
+
+    @staticmethod
+    def store(key, positions):
+        """Persist an (n, 2) positions array under key, then enforce the size bound."""
+        path = LayoutCache._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(LayoutCache.CACHE_DIR, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.asarray(positions, dtype=np.float64))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # a read-only or full cache directory must never break drawing
+            print(f"Layout cache write failed: {e}")
+            # evict() doesn't count partial writes, so don't leave one behind
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        LayoutCache.evict()
+
+    @staticmethod
+    def evict(max_bytes=None):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        if max_bytes is None:
+            max_bytes = LayoutCache.MAX_BYTES
+
+        entries = []
+        try:
+            with os.scandir(LayoutCache.CACHE_DIR) as it:
+                for entry in it:
+                    # .json entries are from before VERSION 3
+                    if entry.name.endswith((LayoutCache.EXTENSION, ".json")):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    @staticmethod
+    def invalidate(key=None):
+        """Remove one cached layout, or every cached layout when key is None."""
+        if key is not None:
+            try:
+                os.remove(LayoutCache._path(key))
+            except OSError:
+                pass
+            return
+
+        LayoutCache.evict(max_bytes=0)
@@ -0,0 +1,144 @@
+import numpy as np
+
+
+class NetworkDiff:
+    """
+    What changed between two NetworkModels of the same network, for an
+    incremental reload (see NetworkDrawer.layoutIncremental and updateScene).
+
+    Node and link IDs tie the models together. The added/removed/changed lists
+    describe what is drawn: nodes in the nodes table, and conduits joining two
+    of them. touchedNodes (indices into the new model) are the end nodes of
+    conduits that were added, removed or re-routed, whose components have to
+    be laid out again.
+    """
+
+    def __init__(self):
+        self.addedNodes = []      # node IDs drawn now but not before
+        self.removedNodes = []    # node IDs drawn before but not now
+        self.changedNodes = []    # node IDs drawn in both, with a new type or tooltip
+        self.addedEdges = []      # link IDs, including re-routed conduits
+        self.removedEdges = []    # link IDs, including re-routed conduits
+        self.restyledEdges = []   # link IDs with the same ends and a new conduit type
+        # new model edge indices of addedEdges / restyledEdges
+        self.addedEdgeIndices = np.zeros(0, dtype=np.int64)
+        self.restyledEdgeIndices = np.zeros(0, dtype=np.int64)
+
+        # new model index -> previous model index (-1 for new nodes)
+        self.nodeMap = np.zeros(0, dtype=np.int64)
+        self.touchedNodes = np.zeros(0, dtype=np.int64)
+        # new model indices moved by NetworkDrawer.layoutIncremental
+        self.relaidNodes = np.zeros(0, dtype=np.int64)
+
+    def isEmpty(self):
+        return not (self.addedNodes or self.removedNodes or self.changedNodes
+                    or self.addedEdges or self.removedEdges or self.restyledEdges or self.touchedNodes.size)
+
+    def summary(self):
+        return (f"nodes +{len(self.addedNodes)} -{len(self.removedNodes)} ~{len(self.changedNodes)}, "
+                f"conduits +{len(self.addedEdges)} -{len(self.removedEdges)} ~{len(self.restyledEdges)}")
+
+    @staticmethod
+    def displayTypes(model):
+        """Object array of model.displayNodeType for every node, without a per-node Python call."""
+        names = list(model.nodeTypeNames)
+        codes = model.nodeTypeCodes.astype(np.int64)
+        codes[codes < 0] = len(names)
+
+        types = np.array(names + [None], dtype=object)[codes]
+        manhole = np.array(
+            [isinstance(name, str) and name.strip().lower() == "manhole" for name in names] + [False], dtype=bool
+        )
+        types[model.isMonitor & manhole[codes]] = "flowmonitor"
+        return types
+
+    @staticmethod
+    def compare(previous, model):
+        """
+        Returns:
+            NetworkDiff from previous to model
+        """
+        diff = NetworkDiff()
+
+        # --------------------------
+        # Nodes
+        # --------------------------
+        node_map = np.fromiter((previous.nodeIndex.get(node_id, -1) for node_id in model.nodeIds),
+                               dtype=np.int64, count=model.nodeCount)
+        known = node_map >= 0
+        reverse = np.full(previous.nodeCount, -1, dtype=np.int64)
+        reverse[node_map[known]] = np.flatnonzero(known)
+        diff.nodeMap = node_map
+
+        drawn = model.inTable()
+        was_drawn = np.zeros(model.nodeCount, dtype=bool)
+        was_drawn[known] = previous.inTable()[node_map[known]]
+        still_drawn = np.zeros(previous.nodeCount, dtype=bool)
+        mapped = reverse >= 0
+        still_drawn[mapped] = drawn[reverse[mapped]]
+
+        diff.addedNodes = [model.nodeIds[i] for i in np.flatnonzero(drawn & ~was_drawn).tolist()]
+        diff.removedNodes = [previous.nodeIds[i] for i in np.flatnonzero(previous.inTable() & ~still_drawn).tolist()]
+
+        both = np.flatnonzero(drawn & was_drawn)
+        changed = NetworkDiff.displayTypes(model)[both] != NetworkDiff.displayTypes(previous)[node_map[both]]
+        changed = set(both[np.asarray(changed, dtype=bool)].tolist())
+
+        # tooltips are sparse, so only nodes with metadata on either side can differ
+        candidates = set(model.metadata) | {int(reverse[i]) for i in previous.metadata if reverse[i] >= 0}
+        for i in candidates:
+            if i in changed or not (drawn[i] and was_drawn[i]):
+                continue
+            old = previous.metadata.get(int(node_map[i]), {}).get("tooltip")
+            if model.metadata.get(i, {}).get("tooltip") != old:
+                changed.add(i)
+        diff.changedNodes = [model.nodeIds[i] for i in sorted(changed)]
+
+        # --------------------------
+        # Conduits
+        # --------------------------
+        previous_edges = {edge_id: e for e, edge_id in enumerate(previous.edgeIds)}
+        edge_map = np.fromiter((previous_edges.get(edge_id, -1) for edge_id in model.edgeIds),
+                               dtype=np.int64, count=model.edgeCount)
+        matched = edge_map >= 0
+        old_e = edge_map[matched]
+
+        # same link ID between the same two nodes
+        kept = np.zeros(model.edgeCount, dtype=bool)
+        kept[matched] = (
+            (node_map[model.edgeSrc[matched]] == previous.edgeSrc[old_e])
+            & (node_map[model.edgeDst[matched]] == previous.edgeDst[old_e])
+        )
+        previous_kept = np.zeros(previous.edgeCount, dtype=bool)
+        previous_kept[edge_map[kept]] = True
+
+        edge_drawn = drawn[model.edgeSrc] & drawn[model.edgeDst]
+        previous_inTable = previous.inTable()
+        previous_edge_drawn = previous_inTable[previous.edgeSrc] & previous_inTable[previous.edgeDst]
+
+        stays = kept & edge_drawn
+        stays[kept] &= previous_edge_drawn[edge_map[kept]]
+        previous_stays = np.zeros(previous.edgeCount, dtype=bool)
+        previous_stays[edge_map[stays]] = True
+
+        restyled = np.zeros(model.edgeCount, dtype=bool)
+        restyled[stays] = model.edgeTypes[stays] != previous.edgeTypes[edge_map[stays]]
+
+        diff.addedEdgeIndices = np.flatnonzero(edge_drawn & ~stays)
+        diff.restyledEdgeIndices = np.flatnonzero(restyled)
+        diff.addedEdges = [model.edgeIds[e] for e in diff.addedEdgeIndices.tolist()]
+        diff.removedEdges = [previous.edgeIds[e] for e in np.flatnonzero(previous_edge_drawn & ~previous_stays).tolist()]
+        diff.restyledEdges = [model.edgeIds[e] for e in diff.restyledEdgeIndices.tolist()]
+
+        # --------------------------
+        # Layout: ends of conduits that appeared, disappeared or moved
+        # --------------------------
+        added = np.flatnonzero(~kept)
+        removed = np.flatnonzero(~previous_kept)
+        touched = np.concatenate([
+            model.edgeSrc[added], model.edgeDst[added],
+            reverse[previous.edgeSrc[removed]], reverse[previous.edgeDst[removed]],
+        ]).astype(np.int64)
+        diff.touchedNodes = np.unique(touched[touched >= 0])
+
+        return diff
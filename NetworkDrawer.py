@@ -1,148 +1,699 @@
-from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView
-from PyQt6.QtGui import QPainter, QColor
+from PyQt6 import sip
+from PyQt6.QtWidgets import QGraphicsScene
+from PyQt6.QtGui import QColor
 from PyQt6.QtCore import Qt
 
 from SvgNodeFactory import SvgNodeFactory
 from PipeItem import PipeItem
+from PipeLayerItem import PipeLayerItem
+from SchematicView import SchematicView
+from SegmentIndex import SegmentIndex
+from ComponentLayout import ComponentLayout
+from LayoutCache import LayoutCache
+from SourceLayout import SourceLayout
+from NetworkModel import NetworkModel
 
-import networkx as nx
-from networkx.drawing.nx_pydot import graphviz_layout
+import numpy as np
 
 
 class NetworkDrawer:
+    # "layered" runs in-process; "graphviz" needs pydot and the `dot` binary;
+    # "source" places nodes at the x/y of the nodes table (see SourceLayout),
+    # and "source-separated" also pushes overlapping symbols apart
+    LAYOUT_ENGINES = ("layered", "graphviz", "source", "source-separated")
+    # engines that need the nodes table's coordinates loaded (see NetworkGenerator.loadNodes)
+    SOURCE_ENGINES = ("source", "source-separated")
+
+    @staticmethod
+    def computeLayout(G, engine="layered", workers=None):
+        """
+        Lay out a conduit graph with flow running left-to-right. Each weakly
+        connected component (catchment) is laid out on its own, in parallel for
+        large networks, and the results are packed side by side.
+        Returns:
+            { node_id: (x, y), ... }
+        Raises ValueError for SOURCE_ENGINES, which need a model's node
+        coordinates rather than a bare graph (use layoutNetwork).
+        """
+        if engine in NetworkDrawer.SOURCE_ENGINES:
+            raise ValueError(f"The {engine!r} layout engine needs the nodes table's coordinates; use layoutNetwork")
+        return ComponentLayout.layout(G, engine, workers)
+
+    # how many items buildScene creates between progress/cancel checks
+    PROGRESS_INTERVAL = 1000
+
+    # "items": one PipeItem per conduit; "layers": one PipeLayerItem per conduit type
+    PIPE_MODES = ("items", "layers")
+    # buildScene switches to "layers" automatically from this many conduits
+    PIPE_LAYER_THRESHOLD = 10000
+
+    # layout units -> scene units
+    LAYOUT_SCALE = 1.5
+    # model.positions -> scene: layout y runs up, scene y runs down
+    SCENE_AXES = np.array([1.0, -1.0])
+
+    # incremental reloads lay out at most this share of the network again
+    # before a full layout is cheaper (see layoutIncremental)
+    MAX_RELAYOUT_FRACTION = 0.5
+    # scene units a node can be off its laid out position before it counts as dragged
+    DRAG_TOLERANCE = 0.5
+
+    CONDUIT_COLOURS = {
+        "link": QColor("#7a7a7a"),
+        "user_control": QColor("#9467bd"),
+        "flap_valve": QColor("#8c564b"),
+        "pump": QColor("#d62728"),
+        "sluice": QColor("#ff7f0e"),
+        "weir": QColor("#1f77b4"),
+        "flume": QColor("#2ca02c"),
+        "orifice": QColor("#bcbd22"),
+        "chain": QColor("#3b3b3b"),
+    }
+
     @staticmethod
-    def drawNetwork(conduits, nodes, monitors):
+    def drawNetwork(conduits, nodes, monitors, engine="layered", useCache=True):
         """
         conduits format:
             [
                 {"id": str, "upstream": str, "downstream": str, "type": str},
                 ...
             ]
+        engine: one of LAYOUT_ENGINES
+        useCache: reuse/persist positions through LayoutCache
         """
+        model = NetworkModel.fromConduits(conduits, nodes, monitors)
+        NetworkDrawer.layoutNetwork(model, engine, useCache)
 
-        # --------------------------
-        # Auto layout using Graphviz (flow diagram)
-        # --------------------------
-        G = nx.DiGraph()
-        for c in (conduits or []):
-            up = str(c.get("upstream", "")).strip()
-            ds = str(c.get("downstream", "")).strip()
-            if up and ds:
-                G.add_edge(up, ds)
+        # Mirror positions back onto the node dicts for callers that read them
+        connected = model.connected().tolist()
+        xs = model.positions[:, 0].tolist()
+        ys = model.positions[:, 1].tolist()
+        for node_id in nodes:
+            index = model.nodeIndex[str(node_id)]
+            if connected[index]:
+                nodes[node_id]["x"] = xs[index]
+                nodes[node_id]["y"] = ys[index]
+            else:
+                # Ensure x/y exist even if the input nodes table has no coordinates
+                nodes[node_id].setdefault("x", 0.0)
+                nodes[node_id].setdefault("y", 0.0)
 
-        # --------------------------
-        # DEBUG: Graph diagnostics
-        # --------------------------
-        print("--- GRAPH DEBUG ---")
-        print(f"Total nodes in NetworkX graph: {G.number_of_nodes()}")
-        print(f"Total edges in NetworkX graph: {G.number_of_edges()}")
+        return NetworkDrawer.buildScene(model)
 
-        weak_components = list(nx.weakly_connected_components(G))
-        print(f"Weakly connected components: {len(weak_components)}")
+    @staticmethod
+    def layoutNetwork(model, engine="layered", useCache=True, workers=None):
+        """
+        Compute positions for every node with a conduit into model.positions.
+        Touches no Qt objects, so it is safe to call from a worker thread.
+        workers: layout process pool size (see ComponentLayout.layoutEdges)
+        """
+        if engine in NetworkDrawer.SOURCE_ENGINES:
+            # cheap enough that the cache doesn't pay off
+            NetworkDrawer.layoutFromSource(model, separate=engine == "source-separated")
+            return
 
-        for i, comp in enumerate(weak_components[:5]):
-            print(f"Component {i+1} size: {len(comp)}")
-            print(f"Sample nodes: {list(comp)[:5]}")
+        active = np.flatnonzero(model.connected())
+        node_ids = model.nodeIds
 
-        print("-------------------")
+        remap = np.full(model.nodeCount, -1, dtype=np.int64)
+        remap[active] = np.arange(active.size)
+        src = remap[model.edgeSrc]
+        dst = remap[model.edgeDst]
 
-        # Ensure x/y exist even if the input nodes table has no coordinates
-        for node_id in nodes:
-            nodes[node_id].setdefault("x", 0.0)
-            nodes[node_id].setdefault("y", 0.0)
+        if active.size == 0:
+            return
+
+        scale = NetworkDrawer.LAYOUT_SCALE
+
+        # Re-opening an unchanged network reuses the positions computed last time
+        cache_key = None
+        if useCache:
+            cache_key = LayoutCache.key([node_ids[n] for n in active.tolist()], src, dst,
+                                        {"engine": engine, "scale": scale})
+        positions = LayoutCache.load(cache_key, active.size) if cache_key else None
+
+        if positions is None:
+            coords = ComponentLayout.layoutEdges(active.size, src, dst, engine, workers)
+            positions = NetworkDrawer.normalise(coords)
+            if cache_key:
+                LayoutCache.store(cache_key, positions)
+
+        model.positions[active] = positions
+
+    @staticmethod
+    def layoutFromSource(model, separate=False):
+        """
+        Fill model.positions from the nodes table's coordinates (see
+        SourceLayout). Every node is placed, including ones without conduits.
+        Raises ValueError when the model has no source coordinates.
+        """
+        if model.sourcePositions is None:
+            raise ValueError("The nodes table has no x/y coordinate columns to lay out from")
+        if model.nodeCount == 0:
+            return
+        coords = SourceLayout.layout(model.sourcePositions, model.edgeSrc, model.edgeDst, separate)
+        model.positions[:] = NetworkDrawer.normalise(coords)
+
+    @staticmethod
+    def layoutIncremental(model, previous, diff, engine="layered"):
+        """
+        Fill model.positions from previous (an earlier load of the same network,
+        already laid out), laying out again only the components containing
+        diff.touchedNodes. Each of those is placed over the area its existing
+        nodes covered, or to the right of the network if it is all new.
+        Falls back to layoutNetwork when more than MAX_RELAYOUT_FRACTION of
+        the network would move.
+        Sets diff.relaidNodes to the nodes given new positions.
+        Returns:
+            True if laid out incrementally, False after a full layout
+        """
+        node_map = diff.nodeMap
+        known = node_map >= 0
 
-        if len(G.nodes) > 0:
-            pos = graphviz_layout(
-                G,
-                prog="dot",
+        if engine in NetworkDrawer.SOURCE_ENGINES:
+            # as cheap as copying positions over; relaid are the nodes that moved
+            NetworkDrawer.layoutNetwork(model, engine)
+            moved = (model.positions[known] != previous.positions[node_map[known]]).any(axis=1)
+            diff.relaidNodes = np.flatnonzero(known)[moved]
+            return True
+
+        model.positions[known] = previous.positions[node_map[known]]
+        diff.relaidNodes = np.zeros(0, dtype=np.int64)
+
+        active = np.flatnonzero(model.connected())
+        if active.size == 0 or diff.touchedNodes.size == 0:
+            return True
+
+        remap = np.full(model.nodeCount, -1, dtype=np.int64)
+        remap[active] = np.arange(active.size)
+        src = remap[model.edgeSrc]
+        dst = remap[model.edgeDst]
+        labels, sizes = ComponentLayout.componentLabels(active.size, src, dst)
+
+        touched = remap[diff.touchedNodes]
+        components = np.unique(labels[touched[touched >= 0]])
+        if sizes[components].sum() > NetworkDrawer.MAX_RELAYOUT_FRACTION * active.size:
+            NetworkDrawer.layoutNetwork(model, engine)
+            diff.relaidNodes = active
+            return False
+
+        # nodes that already had a position to keep the component anchored to
+        was_placed = np.zeros(model.nodeCount, dtype=bool)
+        was_placed[known] = previous.connected()[node_map[known]]
+        placed = was_placed.copy()
+        placed[diff.touchedNodes] = False
+
+        scale = NetworkDrawer.LAYOUT_SCALE
+        relaid = []
+        for comp in components.tolist():
+            members = np.flatnonzero(labels == comp)
+            in_comp = labels[src] == comp
+            local = np.full(active.size, -1, dtype=np.int64)
+            local[members] = np.arange(members.size)
+            coords = NetworkDrawer.normalise(
+                ComponentLayout.layoutArrays(engine, members.size, local[src[in_comp]], local[dst[in_comp]])
             )
 
-            # `dot` defaults to a top-to-bottom layout. To mimic LR flow, swap axes.
-            pos = {n: (y, x) for n, (x, y) in pos.items()}
+            nodes = active[members]
+            anchored = nodes[was_placed[nodes]]
+            if anchored.size:
+                origin = previous.positions[node_map[anchored]].min(axis=0)
+            else:
+                # all new: start a column right of everything already placed
+                others = model.positions[placed]
+                gap = ComponentLayout.COMPONENT_GAP * scale
+                origin = np.array([others[:, 0].max() + gap, others[:, 1].min()]) if others.size else np.zeros(2)
 
-            min_x = min(x for x, y in pos.values())
-            min_y = min(y for x, y in pos.values())
+            model.positions[nodes] = coords + origin
+            placed[nodes] = True
+            relaid.append(nodes)
 
-            scale = 1.5
+        diff.relaidNodes = np.concatenate(relaid)
+        return True
 
-            for node_id in nodes:
-                sid = str(node_id)
-                if sid in pos:
-                    x, y = pos[sid]
-                    nodes[node_id]["x"] = (x - min_x) * scale
-                    nodes[node_id]["y"] = (y - min_y) * scale
+    @staticmethod
+    def buildScene(model, progress=None, isCancelled=None, pipeMode=None, indexPipes=True):
+        """
+        Create node and pipe items from an already laid out model (see layoutNetwork).
+        Only nodes present in the nodes table are drawn, along with the conduits
+        joining two of them.
+        progress: optional callback receiving the completed fraction (0.0 - 1.0)
+        isCancelled: optional callable; when it returns True the build stops
+        pipeMode: one of PIPE_MODES; None picks "layers" for networks with at
+            least PIPE_LAYER_THRESHOLD conduits
+        indexPipes: register pipes in a SegmentIndex for the view's hover lookup;
+            False leaves hover to Qt's per-item shapes
+        Returns:
+            SchematicView, or None if cancelled
+        """
+        drawn = np.flatnonzero(model.inTable()).tolist()
+        total = max(1, len(drawn) + model.edgeCount)
+        done = 0
 
         scene = QGraphicsScene()
 
         # --------------------------
         # Create SVG node items (store references)
         # --------------------------
-        node_items = {}
-        node_items_str = {}
-        for node_id, data in nodes.items():
-            node_type = data["type"]
+        node_items = [None] * model.nodeCount
+        centres = NetworkDrawer.sceneCentres(model, drawn)
+        # per-column tolist is several times cheaper than a nested one
+        for index, centre in zip(drawn, zip(centres[:, 0].tolist(), centres[:, 1].tolist())):
+            item = NetworkDrawer.createNode(model, index, centre)
+            scene.addItem(item)
+            node_items[index] = item
+
+            done += 1
+            if done % NetworkDrawer.PROGRESS_INTERVAL == 0:
+                if isCancelled is not None and isCancelled():
+                    return None
+                if progress is not None:
+                    progress(done / total)
+
+        # --------------------------
+        # Create Pipes (conduits) and register them on nodes
+        # --------------------------
+        if pipeMode is None:
+            pipeMode = "layers" if model.edgeCount >= NetworkDrawer.PIPE_LAYER_THRESHOLD else "items"
+        if pipeMode not in NetworkDrawer.PIPE_MODES:
+            raise ValueError(f"Unknown pipe mode '{pipeMode}', expected one of {NetworkDrawer.PIPE_MODES}")
 
-            # If this node is a monitor and is a Manhole, override type
-            if monitors and node_id in monitors:
-                if isinstance(node_type, str) and node_type.strip().lower() == "manhole":
-                    node_type = "flowmonitor"
+        edge_src = model.edgeSrc.tolist()
+        edge_dst = model.edgeDst.tolist()
+        edge_types = model.edgeTypes.tolist()
 
-            x = data.get("x", 0.0)
-            y = -data.get("y", 0.0)
+        # hover lookup for the view, see SchematicView.hoverPipeAt
+        pipe_index = SegmentIndex() if indexPipes else None
+        pipes = {}
+        layers = {}
 
-            tooltip_text = data.get("tooltip")
+        if pipeMode == "layers":
+            # edges by conduit type; unknown types are drawn with the link colour
+            edges_by_type = {}
+            for e in range(model.edgeCount):
+                if node_items[edge_src[e]] is None or node_items[edge_dst[e]] is None:
+                    continue
+                edges_by_type.setdefault(NetworkDrawer.layerType(model.conduitType(e)), []).append(e)
 
-            item = SvgNodeFactory.create(node_id, node_type, x, y, tooltip_text=tooltip_text)
+            for ctype, edges in edges_by_type.items():
+                if isCancelled is not None and isCancelled():
+                    return None
+
+                layer = NetworkDrawer.createLayer(
+                    ctype,
+                    [node_items[edge_src[e]] for e in edges],
+                    [node_items[edge_dst[e]] for e in edges],
+                    [model.edgeIds[e] for e in edges],
+                    pipe_index,
+                )
+                scene.addItem(layer)
+                layers[ctype] = layer
+
+                for pipe in layer.handles():
+                    NetworkDrawer.connectPipe(pipe)
+                    pipes[pipe.edge_id] = pipe
+
+                done += len(edges)
+                if progress is not None:
+                    progress(done / total)
+        else:
+            for e in range(model.edgeCount):
+                done += 1
+                if done % NetworkDrawer.PROGRESS_INTERVAL == 0:
+                    if isCancelled is not None and isCancelled():
+                        return None
+                    if progress is not None:
+                        progress(done / total)
+
+                up_item = node_items[edge_src[e]]
+                ds_item = node_items[edge_dst[e]]
+
+                if up_item is None or ds_item is None:
+                    continue
+
+                pipe = NetworkDrawer.createPipe(up_item, ds_item, model.edgeIds[e],
+                                                NetworkModel.CONDUIT_TYPES[edge_types[e]], pipe_index)
+                scene.addItem(pipe)
+                NetworkDrawer.connectPipe(pipe)
+                pipes[pipe.edge_id] = pipe
+
+        if progress is not None:
+            progress(1.0)
+
+        view = SchematicView(scene, pipeIndex=pipe_index)
+        view.pipeMode = pipeMode
+        view.nodeItems = {model.nodeIds[index]: node_items[index] for index in drawn}
+        view.pipes = pipes
+        view.pipeLayers = layers
+        return view
+
+    @staticmethod
+    def updateScene(view, model, previous, diff):
+        """
+        Bring a view built by buildScene from previous up to date with model,
+        touching only the items in diff (see NetworkDiff, layoutIncremental).
+        Nodes the user has dragged away from their laid out position stay put.
+        """
+        PipeItem.flushDirty()
+        view.setHoverPipe(None)
+        scene = view.scene()
+        nodes = view.nodeItems
+        pipes = view.pipes
+
+        for edge_id in diff.removedEdges:
+            pipe = pipes.pop(edge_id, None)
+            if pipe is not None:
+                NetworkDrawer.removePipe(view, pipe)
+
+        for node_id in diff.removedNodes:
+            item = nodes.pop(node_id, None)
+            if item is None:
+                continue
+            for pipe in list(item.connectedPipes):
+                pipes.pop(pipe.edge_id, None)
+                NetworkDrawer.removePipe(view, pipe)
+            scene.removeItem(item)
+
+        # a new type or tooltip: swap in a fresh item where the old one was
+        for node_id in diff.changedNodes:
+            old = nodes.get(node_id)
+            if old is None:
+                continue
+            item = NetworkDrawer.createNode(model, model.nodeIndex[node_id])
+            # symbols differ in size, so line up the centres (where pipes attach), not the corners
+            centre = old.sceneCentre()
+            now = item.sceneCentre()
+            item.moveBy(centre.x() - now.x(), centre.y() - now.y())
             scene.addItem(item)
-            node_items[node_id] = item
-            node_items_str[str(node_id)] = item
+            item.setSelected(old.isSelected())
+            for pipe in old.connectedPipes:
+                if pipe.upstream_item is old:
+                    pipe.upstream_item = item
+                if pipe.downstream_item is old:
+                    pipe.downstream_item = item
+                pipe.markDirty()
+            item.connectedPipes = old.connectedPipes
+            old.connectedPipes = []
+            scene.removeItem(old)
+            nodes[node_id] = item
 
-        # --------------------------
-        # Create Pipes (conduits) and register them on nodes
-        # --------------------------
-        conduit_colours = {
-            "link": QColor("#7a7a7a"),
-            "user_control": QColor("#9467bd"),
-            "flap_valve": QColor("#8c564b"),
-            "pump": QColor("#d62728"),
-            "sluice": QColor("#ff7f0e"),
-            "weir": QColor("#1f77b4"),
-            "flume": QColor("#2ca02c"),
-            "orifice": QColor("#bcbd22"),
-        }
-
-        for c in (conduits or []):
-            up = str(c.get("upstream", "")).strip()
-            ds = str(c.get("downstream", "")).strip()
-            edge_id = c.get("id")
-            ctype = str(c.get("type", "link")).strip().lower()
-            colour = conduit_colours.get(ctype, conduit_colours["link"])
-
-            if not up or not ds:
+        moved = []
+        relaid = diff.relaidNodes[diff.nodeMap[diff.relaidNodes] >= 0]
+        laid_out = NetworkDrawer.sceneCentres(previous, diff.nodeMap[relaid])
+        targets = NetworkDrawer.sceneCentres(model, relaid)
+        for index, old_x, old_y, x, y in zip(relaid.tolist(), laid_out[:, 0].tolist(), laid_out[:, 1].tolist(),
+                                             targets[:, 0].tolist(), targets[:, 1].tolist()):
+            item = nodes.get(model.nodeIds[index])
+            if item is None:
                 continue
+            centre = item.sceneCentre()
+            if (abs(centre.x() - old_x) > NetworkDrawer.DRAG_TOLERANCE
+                    or abs(centre.y() - old_y) > NetworkDrawer.DRAG_TOLERANCE):
+                continue  # dragged by the user
+            item.moveBy(x - centre.x(), y - centre.y())
+            moved.append(item)
 
-            up_item = node_items_str.get(up)
-            ds_item = node_items_str.get(ds)
+        for node_id in diff.addedNodes:
+            item = NetworkDrawer.createNode(model, model.nodeIndex[node_id])
+            scene.addItem(item)
+            nodes[node_id] = item
+            moved.append(item)
 
-            if up_item is None or ds_item is None:
+        # (up_item, ds_item, edge_id, ctype) for addPipes
+        added = []
+        for e in diff.restyledEdgeIndices.tolist():
+            pipe = pipes.get(model.edgeIds[e])
+            if pipe is None:
                 continue
+            ctype = model.conduitType(e)
+            if isinstance(pipe, PipeItem):
+                pipe.pen_colour = NetworkDrawer.conduitColour(ctype)
+                pipe.updatePen()
+                pipe.update()
+            elif pipe.layer is not view.pipeLayers.get(NetworkDrawer.layerType(ctype)):
+                added.append((pipe.upstream_item, pipe.downstream_item, model.edgeIds[e], ctype))
+                NetworkDrawer.removePipe(view, pipe)
 
-            pipe = PipeItem(
-                upstream_item=up_item,
-                downstream_item=ds_item,
-                edge_id=edge_id,
-                pen_colour=colour,
-                base_width=1,
-                hover_width=2,
-                arrow_size=10.0,
-                hit_width=12.0,
-                draw_label=False,
-            )
-            scene.addItem(pipe)
+        for e in diff.addedEdgeIndices.tolist():
+            up_item = nodes.get(model.nodeIds[model.edgeSrc[e]])
+            ds_item = nodes.get(model.nodeIds[model.edgeDst[e]])
+            if up_item is not None and ds_item is not None:
+                added.append((up_item, ds_item, model.edgeIds[e], model.conduitType(e)))
+        NetworkDrawer.addPipes(view, added)
+
+        # grow the fixed scene rect if anything landed outside it
+        rect = scene.sceneRect()
+        if any(not rect.contains(item.sceneBoundingRect()) for item in moved):
+            view.tuneScene()
+
+    # --------------------------
+    # Traces
+    # --------------------------
+
+    @staticmethod
+    def showTrace(view, model, edges):
+        """
+        Highlight conduits in a view built by buildScene, replacing any trace
+        shown before. Conduits that aren't drawn are skipped.
+        edges: model edge indices, e.g. from NetworkTrace.trace
+        """
+        NetworkDrawer.clearTrace(view)
+        pipes = view.pipes
+        edge_ids = model.edgeIds
+        traced = []
+        for e in np.asarray(edges, dtype=np.int64).tolist():
+            pipe = pipes.get(edge_ids[e])
+            if pipe is not None:
+                traced.append(pipe)
+            elif edge_ids[e] in view.expandedChains:
+                # a chain expanded since (see expandChain): its conduits instead
+                traced.extend(pipes[link_id] for link_id in view.expandedChains[edge_ids[e]][1] if link_id in pipes)
+
+        by_layer = {}
+        for pipe in traced:
+            if isinstance(pipe, PipeItem):
+                pipe.setTraced(True)
+                view.tracedPipes.append(pipe)
+            else:
+                by_layer.setdefault(pipe.layer, []).append(pipe.index)
+        for layer, indices in by_layer.items():
+            layer.setTraced(indices)
+
+    @staticmethod
+    def clearTrace(view):
+        for pipe in view.tracedPipes:
+            # may have been removed by updateScene since
+            if not sip.isdeleted(pipe):
+                pipe.setTraced(False)
+        view.tracedPipes = []
+        for layer in (view.pipeLayers or {}).values():
+            layer.clearTraced()
+        view.trace = None
+
+    # --------------------------
+    # Collapsed chains (see ChainCollapse)
+    # --------------------------
+
+    @staticmethod
+    def expandChain(view, chains, edge_id):
+        """
+        Replace a chain conduit in a view built from chains.collapsed with the
+        manholes and conduits it stands for, spaced evenly along where it was
+        drawn. Remembered in view.expandedChains, for collapseChain.
+        Returns:
+            True if edge_id was a drawn, collapsed chain
+        """
+        chain = chains.chain(edge_id)
+        pipe = view.pipes.get(edge_id)
+        if chain is None or pipe is None:
+            return False
+
+        PipeItem.flushDirty()
+        view.setHoverPipe(None)
+        up_item, ds_item = pipe.upstream_item, pipe.downstream_item
+        del view.pipes[edge_id]
+        NetworkDrawer.removePipe(view, pipe)
+
+        model = chains.model
+        nodes = chains.nodes(chain).tolist()
+        start = PipeItem.itemCentre(up_item)
+        end = PipeItem.itemCentre(ds_item)
+        items = [up_item]
+        for step, index in enumerate(nodes, 1):
+            along = step / (len(nodes) + 1)
+            item = NetworkDrawer.createNode(model, index, (start.x() + along * (end.x() - start.x()),
+                                                           start.y() + along * (end.y() - start.y())))
+            view.scene().addItem(item)
+            view.nodeItems[model.nodeIds[index]] = item
+            items.append(item)
+        items.append(ds_item)
+
+        links = chains.edges(chain).tolist()
+        link_ids = [model.edgeIds[e] for e in links]
+        NetworkDrawer.addPipes(view, [(up, ds, link_id, model.conduitType(e))
+                                      for link_id, e, up, ds in zip(link_ids, links, items[:-1], items[1:])])
+        view.expandedChains[edge_id] = ([model.nodeIds[index] for index in nodes], link_ids)
+        return True
+
+    @staticmethod
+    def collapseChain(view, edge_id):
+        """Undo expandChain: draw the chain as one conduit again."""
+        expanded = view.expandedChains.pop(edge_id, None)
+        if expanded is None:
+            return
+        node_ids, link_ids = expanded
+
+        PipeItem.flushDirty()
+        view.setHoverPipe(None)
+        pipes = [view.pipes.pop(link_id) for link_id in link_ids]
+        up_item, ds_item = pipes[0].upstream_item, pipes[-1].downstream_item
+        for pipe in pipes:
+            NetworkDrawer.removePipe(view, pipe)
+        for node_id in node_ids:
+            view.scene().removeItem(view.nodeItems.pop(node_id))
+        NetworkDrawer.addPipe(view, up_item, ds_item, edge_id, "chain")
+
+    @staticmethod
+    def collapseChains(view):
+        """collapseChain every chain expanded in view."""
+        for edge_id in list(view.expandedChains):
+            NetworkDrawer.collapseChain(view, edge_id)
+
+    @staticmethod
+    def addPipe(view, up_item, ds_item, edge_id, ctype):
+        """Draw a conduit in a view built by buildScene, as an item or in its type's layer."""
+        return NetworkDrawer.addPipes(view, [(up_item, ds_item, edge_id, ctype)])[0]
+
+    @staticmethod
+    def addPipes(view, conduits):
+        """
+        addPipe for many conduits, appending to each layer once.
+        conduits: (up_item, ds_item, edge_id, ctype) tuples
+        Returns:
+            the new PipeItems / LayerPipes, in the same order
+        """
+        if view.pipeMode == "layers":
+            # positions in conduits, by layer
+            by_layer = {}
+            for i, conduit in enumerate(conduits):
+                by_layer.setdefault(NetworkDrawer.layerType(conduit[3]), []).append(i)
+            pipes = [None] * len(conduits)
+            for layer_type, positions in by_layer.items():
+                layer = view.pipeLayers.get(layer_type)
+                if layer is None:
+                    layer = NetworkDrawer.createLayer(layer_type, [], [], [], view.pipeIndex)
+                    view.scene().addItem(layer)
+                    view.pipeLayers[layer_type] = layer
+                handles = layer.addSegments([conduits[i][0] for i in positions], [conduits[i][1] for i in positions],
+                                            [conduits[i][2] for i in positions])
+                for i, handle in zip(positions, handles):
+                    pipes[i] = handle
+        else:
+            pipes = []
+            for up_item, ds_item, edge_id, ctype in conduits:
+                pipe = NetworkDrawer.createPipe(up_item, ds_item, edge_id, ctype, view.pipeIndex)
+                view.scene().addItem(pipe)
+                pipes.append(pipe)
+        for pipe in pipes:
+            NetworkDrawer.connectPipe(pipe)
+            view.pipes[pipe.edge_id] = pipe
+        return pipes
+
+    @staticmethod
+    def removePipe(view, pipe):
+        NetworkDrawer.disconnectPipe(pipe)
+        if isinstance(pipe, PipeItem):
+            if view.pipeIndex is not None:
+                view.pipeIndex.remove(pipe)
+            view.scene().removeItem(pipe)
+        else:
+            pipe.layer.removeSegment(pipe.index)
+
+    # --------------------------
+    # Items
+    # --------------------------
+
+    @staticmethod
+    def normalise(coords):
+        """
+        Raw layout coordinates -> model.positions units: shifted so the
+        minimum is at (0, 0) and scaled by LAYOUT_SCALE, in one array pass.
+        Empty input is fine: it comes back as a (0, 2) array.
+        """
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        if not coords.size:
+            return coords
+        return (coords - coords.min(axis=0)) * NetworkDrawer.LAYOUT_SCALE
+
+    @staticmethod
+    def sceneCentres(model, indices):
+        """
+        Where nodes are drawn: layout positions with y flipped (see SCENE_AXES).
+        Returns:
+            (len(indices), 2) float array of scene coordinates
+        """
+        return model.positions[np.asarray(indices, dtype=np.int64)] * NetworkDrawer.SCENE_AXES
+
+    @staticmethod
+    def sceneCentre(model, index):
+        """sceneCentres for one node, as an (x, y) tuple."""
+        x, y = model.positions[index].tolist()
+        return x, -y
+
+    @staticmethod
+    def createNode(model, index, centre=None):
+        """centre: scene (x, y) from sceneCentres, to skip the per-node lookup"""
+        x, y = centre if centre is not None else NetworkDrawer.sceneCentre(model, index)
+        tooltip_text = model.metadata.get(index, {}).get("tooltip")
+        return SvgNodeFactory.create(model.nodeIds[index], model.displayNodeType(index), x, y,
+                                     tooltip_text=tooltip_text)
+
+    @staticmethod
+    def conduitColour(ctype):
+        return NetworkDrawer.CONDUIT_COLOURS.get(ctype, NetworkDrawer.CONDUIT_COLOURS["link"])
 
-            up_item.connectedPipes.append(pipe)
-            ds_item.connectedPipes.append(pipe)
+    @staticmethod
+    def layerType(ctype):
+        """The PipeLayerItem a conduit type is drawn in; unknown types go with the links."""
+        return ctype if ctype in NetworkDrawer.CONDUIT_COLOURS else "link"
 
-        view = QGraphicsView(scene)
-        view.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        return view
\ No newline at end of file
+    @staticmethod
+    def createPipe(up_item, ds_item, edge_id, ctype, pipe_index=None):
+        return PipeItem(
+            upstream_item=up_item,
+            downstream_item=ds_item,
+            edge_id=edge_id,
+            pen_colour=NetworkDrawer.conduitColour(ctype),
+            base_width=1,
+            hover_width=2,
+            arrow_size=10.0,
+            hit_width=12.0,
+            draw_label=False,
+            segment_index=pipe_index,
+        )
+
+    @staticmethod
+    def createLayer(ctype, up_items, ds_items, edge_ids, pipe_index=None):
+        return PipeLayerItem(
+            upstream_items=up_items,
+            downstream_items=ds_items,
+            edge_ids=edge_ids,
+            pen_colour=NetworkDrawer.conduitColour(ctype),
+            base_width=1,
+            hover_width=2,
+            arrow_size=10.0,
+            hit_width=12.0,
+            segment_index=pipe_index,
+        )
+
+    @staticmethod
+    def connectPipe(pipe):
+        """Register a PipeItem / LayerPipe on its end nodes, so moving them updates it."""
+        pipe.upstream_item.connectedPipes.append(pipe)
+        pipe.downstream_item.connectedPipes.append(pipe)
+
+    @staticmethod
+    def disconnectPipe(pipe):
+        for node in (pipe.upstream_item, pipe.downstream_item):
+            if pipe in node.connectedPipes:
+                node.connectedPipes.remove(pipe)
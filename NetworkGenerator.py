@@ -1,9 +1,51 @@
 import csv
+import functools
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ColumnarCsv import ColumnarCsv
+from NetworkModel import NetworkModel, NetworkModelBuilder
 
 class NetworkGenerator:
 
+    # AppManager path attributes holding conduit tables, in generateConduits argument order
+    EDGE_PATH_KEYS = ("pipePath", "userControlPath", "flumePath", "flapValvePath",
+                      "orficePath", "pumpPath", "sluicePath", "weirPath")
+
+    # (path key, conduit type) in merge priority order: specialised types override plain links
+    CONDUIT_PRIORITY = (
+        ("userControlPath", "user_control"),
+        ("flapValvePath", "flap_valve"),
+        ("pumpPath", "pump"),
+        ("sluicePath", "sluice"),
+        ("weirPath", "weir"),
+        ("flumePath", "flume"),
+        ("orficePath", "orifice"),
+        ("pipePath", "link"),
+    )
+
+    # node table coordinate column pairs, lower case, in order of preference
+    COORDINATE_COLUMNS = (("x", "y"), ("easting", "northing"))
+
     @staticmethod
-    def loadEdges(filename):
+    def loadEdges(filename, columnar=False):
+        """
+        Reads a conduit CSV with columns: US node ID, Link suffix, DS node ID
+        columnar: read just those columns in bulk (see ColumnarCsv)
+        Returns:
+            { upstream: [(downstream, link_id), ...], ... }
+        """
+        if columnar:
+            cols = ColumnarCsv.readColumns(filename, ["US node ID", "Link suffix", "DS node ID"])
+            graph = {}
+            with ColumnarCsv.gcPaused():
+                for upstream, suffix, downstream in zip(cols["US node ID"], cols["Link suffix"], cols["DS node ID"]):
+                    outs = graph.get(upstream)
+                    if outs is None:
+                        outs = graph[upstream] = []
+                    outs.append((downstream, f"{upstream}.{suffix}"))
+            return graph
 
         graph = {}
 
@@ -22,16 +64,59 @@ class NetworkGenerator:
                 if upstream not in graph:
                     graph[upstream] = []
                 graph[upstream].append((downstream, link_id))
-                print(graph[upstream])
         return graph
 
     @staticmethod
-    def loadNodes(filename):
+    def iterEdges(filename, columnar=False):
+        """
+        Streams a conduit CSV (same columns as loadEdges) one row at a time,
+        without building the adjacency dict. IDs are stripped once here, as
+        generateConduits would.
+        columnar: read in blocks with ColumnarCsv.iterColumns
+        Yields:
+            (link_id, upstream, downstream)
+        """
+        if columnar:
+            for cols in ColumnarCsv.iterColumns(filename, ["US node ID", "Link suffix", "DS node ID"]):
+                for upstream, suffix, downstream in zip(cols["US node ID"], cols["Link suffix"], cols["DS node ID"]):
+                    yield f"{upstream}.{suffix}".strip(), upstream.strip(), downstream.strip()
+            return
+
+        # Use utf-8-sig to automatically strip BOM if present
+        with open(filename, newline="", encoding="utf-8-sig") as file:
+            reader = csv.DictReader(file)
+            # Normalise headers (strip whitespace)
+            if reader.fieldnames:
+                reader.fieldnames = [name.strip() if name else name for name in reader.fieldnames]
+
+            for row in reader:
+                upstream = row["US node ID"]
+                downstream = row["DS node ID"]
+                yield f"{upstream}.{row['Link suffix']}".strip(), upstream.strip(), downstream.strip()
+
+    @staticmethod
+    def loadNodes(filename, columnar=False, coordinates=False):
         """
         Reads a node CSV with columns: Node ID, Node type
+        columnar: read just those columns in bulk (see ColumnarCsv)
+        coordinates: also keep each node's x/y (see coordinateColumns), for
+                     the source layout engines; nodes without them get none
         Returns:
-            { node_id: {"type": int}, ... }
+            { node_id: {"type": int}, ... } -- plus "x" and "y" with coordinates
         """
+        if coordinates:
+            nodeMap = {}
+            for nodeID, nodeType, position in NetworkGenerator.iterNodes(filename, columnar, coordinates=True):
+                nodeMap[nodeID] = {"type": nodeType}
+                if position is not None:
+                    nodeMap[nodeID]["x"], nodeMap[nodeID]["y"] = position
+            return nodeMap
+
+        if columnar:
+            cols = ColumnarCsv.readColumns(filename, ["Node ID", "Node type"])
+            with ColumnarCsv.gcPaused():
+                return {nodeID: {"type": nodeType} for nodeID, nodeType in zip(cols["Node ID"], cols["Node type"])}
+
         nodeMap = {}
 
         # Use utf-8-sig to automatically strip BOM if present
@@ -51,12 +136,74 @@ class NetworkGenerator:
         return nodeMap
 
     @staticmethod
-    def loadMonitors(filename):
+    def coordinateColumns(header):
+        """
+        The node table's coordinate columns, matched case-insensitively
+        against COORDINATE_COLUMNS.
+        Returns:
+            (x column, y column) as stripped header names, or None
+        """
+        names = {name.strip().lower(): name.strip() for name in header if name}
+        for x, y in NetworkGenerator.COORDINATE_COLUMNS:
+            if x in names and y in names:
+                return names[x], names[y]
+        return None
+
+    @staticmethod
+    def parsePosition(x, y):
+        """Returns (x, y) as floats, or None when either cell is blank or not a finite number."""
+        try:
+            position = (float(x), float(y))
+        except (TypeError, ValueError):
+            return None
+        if not (math.isfinite(position[0]) and math.isfinite(position[1])):
+            return None
+        return position
+
+    @staticmethod
+    def iterNodes(filename, columnar=False, coordinates=False):
+        """
+        Streams a node CSV (same columns as loadNodes) one row at a time.
+        coordinates: parse each node's x/y when the table has them
+        Yields:
+            (node_id, node_type, (x, y) or None)
+        """
+        xy = NetworkGenerator.coordinateColumns(ColumnarCsv.readHeader(filename)) if coordinates else None
+        parse = NetworkGenerator.parsePosition
+
+        if columnar:
+            for cols in ColumnarCsv.iterColumns(filename, ["Node ID", "Node type"] + list(xy or ())):
+                if xy is None:
+                    for nodeID, nodeType in zip(cols["Node ID"], cols["Node type"]):
+                        yield nodeID, nodeType, None
+                else:
+                    for nodeID, nodeType, x, y in zip(cols["Node ID"], cols["Node type"], cols[xy[0]], cols[xy[1]]):
+                        yield nodeID, nodeType, parse(x, y)
+            return
+
+        # Use utf-8-sig to automatically strip BOM if present
+        with open(filename, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+
+            # Normalise headers (strip whitespace)
+            if reader.fieldnames:
+                reader.fieldnames = [name.strip() if name else name for name in reader.fieldnames]
+
+            for row in reader:
+                yield row["Node ID"], row["Node type"], parse(row[xy[0]], row[xy[1]]) if xy else None
+
+    @staticmethod
+    def loadMonitors(filename, columnar=False):
         """
         Reads a monitor CSV with columns: Node ID, Node type
+        columnar: read just those columns in bulk (see ColumnarCsv)
         Returns:
             { node_id: {"type": str}, ... }
         """
+        if columnar:
+            cols = ColumnarCsv.readColumns(filename, ["Node ID", "Node type"])
+            return {nodeID: {"type": nodeType.strip()} for nodeID, nodeType in zip(cols["Node ID"], cols["Node type"])}
+
         monitorMap = {}
 
         # Use utf-8-sig to automatically strip BOM if present
@@ -125,3 +272,120 @@ class NetworkGenerator:
         _add_dataset(links, "link")
 
         return conduits
+
+    @staticmethod
+    def generateModel(datasets):
+        """
+        Merge loaded datasets straight into a NetworkModel (same priority and
+        dedup rules as generateConduits, without building per-conduit dicts).
+        datasets: loadAll output, keyed by AppManager path attribute
+        """
+        return NetworkModel.fromDatasets(
+            datasets.get("nodePath"),
+            datasets.get("monitorsPath"),
+            [(conduit_type, datasets.get(key)) for key, conduit_type in NetworkGenerator.CONDUIT_PRIORITY],
+        )
+
+    @staticmethod
+    def iterConduits(paths, columnar=False, onFile=None):
+        """
+        Streams every conduit table in CONDUIT_PRIORITY order, one file at a
+        time, for NetworkModelBuilder.addConduits (which keeps the first
+        conduit per link ID, so specialised types still override plain links).
+        paths: {"pipePath": str, ...}; paths that are None or do not exist are skipped
+        onFile: optional callback(key, done, total), called as each file is finished
+        Yields:
+            (link_id, upstream, downstream, conduit type code)
+        """
+        tables = [(key, conduit_type) for key, conduit_type in NetworkGenerator.CONDUIT_PRIORITY if paths.get(key)]
+        for done, (key, conduit_type) in enumerate(tables, start=1):
+            path = paths[key]
+            if not os.path.isfile(path):
+                print(f"Skipping {key}: {path} not found")
+            else:
+                code = NetworkModel.CONDUIT_CODES[conduit_type]
+                for link_id, upstream, downstream in NetworkGenerator.iterEdges(path, columnar):
+                    yield link_id, upstream, downstream, code
+            if onFile is not None:
+                onFile(key, done, len(tables))
+
+    @staticmethod
+    def streamModel(paths, columnar=False, onFile=None, coordinates=False):
+        """
+        Build a NetworkModel straight from the CSVs, streaming the node and
+        conduit tables into the builder instead of loading them all first (see
+        generateModel), so peak memory stays near the size of the model.
+        paths: {"nodePath": str, "monitorsPath": str, "pipePath": str, ...}
+               Paths that are None or do not exist are skipped.
+        onFile: optional callback(key, done, total) over the conduit tables
+        coordinates: keep node x/y as model.sourcePositions (see loadNodes)
+        """
+        def present(key):
+            path = paths.get(key)
+            if path and not os.path.isfile(path):
+                print(f"Skipping {key}: {path} not found")
+                return None
+            return path
+
+        builder = NetworkModelBuilder()
+        nodePath = present("nodePath")
+        if nodePath:
+            for node_id, node_type, position in NetworkGenerator.iterNodes(nodePath, columnar, coordinates):
+                builder.addNode(node_id, node_type, position=position)
+        # monitors are few, and only their IDs are kept
+        monitorsPath = present("monitorsPath")
+        if monitorsPath:
+            builder.addMonitors(NetworkGenerator.loadMonitors(monitorsPath, columnar))
+
+        builder.addConduits(NetworkGenerator.iterConduits(paths, columnar, onFile))
+        return builder.build()
+
+    @staticmethod
+    def loadAll(paths, maxWorkers=None, onLoaded=None, columnar=False, coordinates=False):
+        """
+        Read every dataset concurrently, so per-file open latency (e.g. on a
+        network share) overlaps instead of adding up.
+        paths: {"nodePath": str, "monitorsPath": str, "pipePath": str, ...}
+               Paths that are None or do not exist are skipped.
+        onLoaded: optional callback(key, done, total), called from this thread
+                  as each file finishes
+        columnar: use the columnar parser for every file
+        coordinates: keep node x/y (see loadNodes)
+        Returns:
+            { key: dataset, ... } -- skipped keys map to an empty dict
+        """
+        datasets = {}
+        jobs = {}
+        for key, path in paths.items():
+            if key == "nodePath":
+                loader = functools.partial(NetworkGenerator.loadNodes, coordinates=coordinates)
+            elif key == "monitorsPath":
+                loader = NetworkGenerator.loadMonitors
+            else:
+                loader = NetworkGenerator.loadEdges
+
+            if not path or not os.path.isfile(path):
+                if path:
+                    print(f"Skipping {key}: {path} not found")
+                datasets[key] = {}
+                continue
+            jobs[key] = (loader, path)
+
+        if not jobs:
+            return datasets
+
+        with ThreadPoolExecutor(max_workers=maxWorkers or len(jobs)) as pool:
+            futures = {pool.submit(loader, path, columnar): key for key, (loader, path) in jobs.items()}
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    key = futures[future]
+                    datasets[key] = future.result()
+                    if onLoaded is not None:
+                        onLoaded(key, done, len(futures))
+            except BaseException:
+                # don't start files that are still queued
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return datasets
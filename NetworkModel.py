@@ -0,0 +1,419 @@
+import sys
+from array import array
+
+import numpy as np
+
+
+class NetworkModel:
+    """
+    Compact, array-backed drainage network.
+
+    Node IDs are interned to integer indices. Conduits are stored CSR-style,
+    grouped by upstream node: the outgoing conduits of node i are the edge
+    indices indptr[i]:indptr[i + 1], with edgeDst/edgeTypes/edgeIds aligned
+    to that order. Node and Pipe are thin __slots__ views over a model.
+
+    Build one with NetworkModelBuilder, NetworkModel.fromDatasets or
+    NetworkModel.fromConduits.
+    """
+
+    # conduit type codes index into this tuple; "chain" is a run of manholes
+    # contracted into one conduit (see ChainCollapse), never read from a table
+    CONDUIT_TYPES = ("link", "user_control", "flap_valve", "pump", "sluice", "weir", "flume", "orifice", "chain")
+    CONDUIT_CODES = {name: code for code, name in enumerate(CONDUIT_TYPES)}
+
+    def __init__(self, nodeIds, nodeTypeNames, nodeTypeCodes, isMonitor, src, dst, edgeTypes, edgeIds, metadata=None):
+        n = len(nodeIds)
+
+        self.nodeIds = nodeIds
+        self.nodeIndex = {node_id: i for i, node_id in enumerate(nodeIds)}
+
+        # distinct node type strings; nodeTypeCodes[i] == -1 marks a node that is
+        # only referenced by conduits (not in the nodes table, so it is not drawn)
+        self.nodeTypeNames = nodeTypeNames
+        self.nodeTypeCodes = np.asarray(nodeTypeCodes, dtype=np.int16)
+        self.isMonitor = np.asarray(isMonitor, dtype=bool)
+
+        # sparse per-node extras (e.g. "tooltip"), keyed by node index
+        self.metadata = metadata or {}
+
+        src = np.asarray(src, dtype=np.int32)
+        order = np.argsort(src, kind="stable")
+
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+        self.edgeSrc = src[order]
+        self.edgeDst = np.asarray(dst, dtype=np.int32)[order]
+        self.edgeTypes = np.asarray(edgeTypes, dtype=np.int8)[order]
+        self.edgeIds = [edgeIds[e] for e in order.tolist()]
+
+        # laid out positions (layout coordinates, see NetworkDrawer.layoutNetwork)
+        self.positions = np.zeros((n, 2), dtype=np.float64)
+        # x/y from the nodes table, NaN where a node has none; None when no
+        # node has any (or they weren't loaded, see NetworkGenerator.loadNodes)
+        self.sourcePositions = None
+
+        self._inIndptr = None
+        self._inEdges = None
+        self._trace = None
+
+    # --------------------------
+    # Construction
+    # --------------------------
+
+    @staticmethod
+    def fromCsr(nodeIds, nodeTypeNames, nodeTypeCodes, isMonitor, indptr, edgeSrc, edgeDst, edgeTypes, edgeIds,
+                positions, metadata=None):
+        """
+        Wrap arrays that are already in CSR order (e.g. read back by
+        NetworkSnapshot) without copying or re-sorting them.
+        """
+        model = NetworkModel.__new__(NetworkModel)
+        model.nodeIds = nodeIds
+        model.nodeIndex = {node_id: i for i, node_id in enumerate(nodeIds)}
+        model.nodeTypeNames = nodeTypeNames
+        model.nodeTypeCodes = nodeTypeCodes
+        model.isMonitor = isMonitor
+        model.metadata = metadata or {}
+        model.indptr = indptr
+        model.edgeSrc = edgeSrc
+        model.edgeDst = edgeDst
+        model.edgeTypes = edgeTypes
+        model.edgeIds = edgeIds
+        model.positions = positions
+        model.sourcePositions = None
+        model._inIndptr = None
+        model._inEdges = None
+        model._trace = None
+        return model
+
+    @staticmethod
+    def fromDatasets(nodes, monitors, conduitDatasets):
+        """
+        Build straight from loader output, without the per-conduit dicts of
+        NetworkGenerator.generateConduits (same priority/dedup rules).
+        conduitDatasets: [(conduit_type, {upstream: [(downstream, link_id), ...]}), ...]
+                         in priority order
+        """
+        builder = NetworkModelBuilder()
+        builder.addNodes(nodes)
+        builder.addMonitors(monitors)
+        for conduit_type, dataset in conduitDatasets:
+            builder.addDataset(dataset, conduit_type)
+        return builder.build()
+
+    @staticmethod
+    def fromConduits(conduits, nodes, monitors):
+        """
+        Build from the generateConduits format:
+            [{"id": str, "upstream": str, "downstream": str, "type": str}, ...]
+        """
+        builder = NetworkModelBuilder()
+        builder.addNodes(nodes)
+        builder.addMonitors(monitors)
+        for c in (conduits or []):
+            builder.addConduit(c.get("id"), c.get("upstream", ""), c.get("downstream", ""),
+                               str(c.get("type", "link")).strip().lower())
+        return builder.build()
+
+    def subModel(self, indices, extraEdges=None):
+        """
+        The given nodes and the conduits between them as a model of their own,
+        e.g. one part of a CatchmentPartition. IDs, types, monitors, metadata and
+        source positions carry over; positions start at zero.
+        indices: sorted, unique node indices
+        extraEdges: (src, dst, type codes, link IDs) of conduits to add between
+                    the given nodes, by index in this model (see ChainCollapse)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        remap = np.full(self.nodeCount, -1, dtype=np.int64)
+        remap[indices] = np.arange(indices.size)
+        keep = np.flatnonzero((remap[self.edgeSrc] >= 0) & (remap[self.edgeDst] >= 0))
+
+        # metadata is sparse: walk whichever of it and indices is smaller
+        if len(self.metadata) < indices.size:
+            metadata = {int(remap[i]): data for i, data in self.metadata.items() if remap[i] >= 0}
+        else:
+            metadata = {k: self.metadata[i] for k, i in enumerate(indices.tolist()) if i in self.metadata}
+
+        edge_ids = self.edgeIds
+        src = remap[self.edgeSrc[keep]]
+        dst = remap[self.edgeDst[keep]]
+        types = self.edgeTypes[keep]
+        ids = [edge_ids[e] for e in keep.tolist()]
+        if extraEdges is not None:
+            extra_src, extra_dst, extra_types, extra_ids = extraEdges
+            src = np.concatenate([src, remap[np.asarray(extra_src, dtype=np.int64)]])
+            dst = np.concatenate([dst, remap[np.asarray(extra_dst, dtype=np.int64)]])
+            types = np.concatenate([types, np.asarray(extra_types, dtype=np.int8)])
+            ids = ids + list(extra_ids)
+
+        model = NetworkModel(
+            [self.nodeIds[i] for i in indices.tolist()],
+            self.nodeTypeNames,
+            self.nodeTypeCodes[indices],
+            self.isMonitor[indices],
+            src,
+            dst,
+            types,
+            ids,
+            metadata,
+        )
+        if self.sourcePositions is not None:
+            model.sourcePositions = self.sourcePositions[indices]
+        return model
+
+    # --------------------------
+    # Sizes and lookups
+    # --------------------------
+
+    @property
+    def nodeCount(self):
+        return len(self.nodeIds)
+
+    @property
+    def edgeCount(self):
+        return self.edgeDst.size
+
+    def nodeType(self, index):
+        code = int(self.nodeTypeCodes[index])
+        return self.nodeTypeNames[code] if code >= 0 else None
+
+    def displayNodeType(self, index):
+        """The node type a node is drawn as: monitored manholes are drawn as flow monitors."""
+        node_type = self.nodeType(index)
+        if self.isMonitor[index] and isinstance(node_type, str) and node_type.strip().lower() == "manhole":
+            return "flowmonitor"
+        return node_type
+
+    def conduitType(self, edge):
+        return NetworkModel.CONDUIT_TYPES[int(self.edgeTypes[edge])]
+
+    def inTable(self):
+        """Mask of nodes present in the nodes table (the ones that get drawn)."""
+        return self.nodeTypeCodes >= 0
+
+    def connected(self):
+        """Mask of nodes with at least one conduit (the ones that get laid out)."""
+        n = self.nodeCount
+        return (np.bincount(self.edgeSrc, minlength=n) + np.bincount(self.edgeDst, minlength=n)) > 0
+
+    def outEdges(self, index):
+        return range(int(self.indptr[index]), int(self.indptr[index + 1]))
+
+    def inEdges(self, index):
+        self._buildReverse()
+        return self._inEdges[self._inIndptr[index]:self._inIndptr[index + 1]].tolist()
+
+    def reverse(self):
+        """
+        Conduits grouped by downstream node, CSR-style like indptr: the incoming
+        conduits of node i are edges[inIndptr[i]:inIndptr[i + 1]].
+        Returns:
+            (inIndptr, edges) int64 arrays
+        """
+        self._buildReverse()
+        return self._inIndptr, self._inEdges
+
+    def _buildReverse(self):
+        if self._inIndptr is not None:
+            return
+        n = self.nodeCount
+        self._inEdges = np.argsort(self.edgeDst, kind="stable").astype(np.int64)
+        self._inIndptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edgeDst, minlength=n), out=self._inIndptr[1:])
+
+    # --------------------------
+    # Tracing
+    # --------------------------
+
+    def trace(self):
+        """Upstream/downstream tracing over this model's conduits (see NetworkTrace), created on first use."""
+        if self._trace is None:
+            from NetworkTrace import NetworkTrace
+            self._trace = NetworkTrace(self)
+        return self._trace
+
+    def sameTopology(self, other):
+        """True when other has the same node IDs, in the same order, and the same conduits between them."""
+        return (self.nodeIds == other.nodeIds
+                and np.array_equal(self.edgeSrc, other.edgeSrc)
+                and np.array_equal(self.edgeDst, other.edgeDst))
+
+    def inheritTrace(self, previous):
+        """
+        Take over previous's NetworkTrace, and everything it has memoised, when
+        the conduit graph hasn't changed (see sameTopology).
+        Returns:
+            True if inherited
+        """
+        if previous._trace is None or self._trace is not None or not self.sameTopology(previous):
+            return False
+        self._trace = previous._trace
+        return True
+
+    def node(self, index):
+        from Node import Node
+        return Node(self, index)
+
+    def pipe(self, edge):
+        from Pipe import Pipe
+        return Pipe(self, edge)
+
+    def nbytes(self):
+        """Approximate memory held by the model's arrays and ID strings."""
+        arrays = (self.nodeTypeCodes, self.isMonitor, self.indptr, self.edgeSrc, self.edgeDst,
+                  self.edgeTypes, self.positions)
+        strings = sum(sys.getsizeof(s) for s in self.nodeIds) + sum(sys.getsizeof(s) for s in self.edgeIds)
+        return sum(a.nbytes for a in arrays) + strings + sys.getsizeof(self.nodeIds) + sys.getsizeof(self.edgeIds)
+
+
+class NetworkModelBuilder:
+    """
+    Accumulates nodes and conduits into flat typed arrays, then freezes them
+    into a NetworkModel. Conduits are deduplicated by link ID: the first one
+    added wins, so add specialised conduit types before plain links.
+    """
+
+    def __init__(self):
+        self.nodeIds = []
+        self.nodeIndex = {}
+        self.nodeTypeNames = []
+        self.nodeTypeIndex = {}
+        self.nodeTypeCodes = array("h")
+        self.monitorIds = set()
+        self.metadata = {}
+        # nodes given a source position, and that position
+        self.positionIndex = array("i")
+        self.positionX = array("d")
+        self.positionY = array("d")
+
+        self.src = array("i")
+        self.dst = array("i")
+        self.edgeTypes = array("b")
+        self.edgeIds = []
+        self.seenIds = set()
+
+    def intern(self, node_id):
+        index = self.nodeIndex.get(node_id)
+        if index is None:
+            index = len(self.nodeIds)
+            self.nodeIndex[node_id] = index
+            self.nodeIds.append(node_id)
+            self.nodeTypeCodes.append(-1)
+        return index
+
+    def addNode(self, node_id, node_type, metadata=None, position=None):
+        """position: (x, y) from the nodes table, kept as model.sourcePositions"""
+        index = self.intern(str(node_id))
+        code = self.nodeTypeIndex.get(node_type)
+        if code is None:
+            code = len(self.nodeTypeNames)
+            self.nodeTypeIndex[node_type] = code
+            self.nodeTypeNames.append(node_type)
+        self.nodeTypeCodes[index] = code
+        if metadata:
+            self.metadata[index] = metadata
+        if position is not None:
+            self.positionIndex.append(index)
+            self.positionX.append(position[0])
+            self.positionY.append(position[1])
+        return index
+
+    def addNodes(self, nodes):
+        """nodes: loadNodes format, { node_id: {"type": ..., ...}, ... }"""
+        for node_id, data in (nodes or {}).items():
+            extra = {k: v for k, v in data.items() if k not in ("type", "x", "y")}
+            position = (data["x"], data["y"]) if "x" in data and "y" in data else None
+            self.addNode(node_id, data["type"], extra, position)
+
+    def addMonitors(self, monitors):
+        for node_id in (monitors or {}):
+            self.monitorIds.add(str(node_id))
+
+    def addConduit(self, link_id, upstream, downstream, conduit_type):
+        """Returns False when the link ID was already added (the earlier one wins)."""
+        lid = str(link_id).strip()
+        if lid in self.seenIds:
+            return False
+        self.seenIds.add(lid)
+
+        up = str(upstream).strip()
+        ds = str(downstream).strip()
+        if not up or not ds:
+            # reserves the ID (as generateConduits does) but can't be drawn
+            return True
+
+        self.src.append(self.intern(up))
+        self.dst.append(self.intern(ds))
+        # unknown types are drawn as plain links
+        self.edgeTypes.append(NetworkModel.CONDUIT_CODES.get(conduit_type, 0))
+        self.edgeIds.append(lid)
+        return True
+
+    def addDataset(self, dataset, conduit_type):
+        """dataset: loadEdges format, { upstream: [(downstream, link_id), ...], ... }"""
+        for upstream, outs in (dataset or {}).items():
+            for downstream, link_id in outs:
+                self.addConduit(link_id, upstream, downstream, conduit_type)
+
+    def addConduits(self, conduits):
+        """
+        Bulk addConduit for already stripped, typed rows, e.g. from
+        NetworkGenerator.iterConduits; consumes the iterable lazily.
+        conduits: iterable of (link_id, upstream, downstream, conduit type code)
+        Returns:
+            number of conduits kept
+        """
+        seen = self.seenIds
+        node_index = self.nodeIndex
+        intern = self.intern
+        src = self.src.append
+        dst = self.dst.append
+        types = self.edgeTypes.append
+        ids = self.edgeIds.append
+
+        kept = 0
+        for lid, up, ds, code in conduits:
+            if lid in seen:
+                continue
+            seen.add(lid)
+            if not up or not ds:
+                continue
+            u = node_index.get(up)
+            src(u if u is not None else intern(up))
+            d = node_index.get(ds)
+            dst(d if d is not None else intern(ds))
+            types(code)
+            ids(lid)
+            kept += 1
+        return kept
+
+    def build(self):
+        isMonitor = np.zeros(len(self.nodeIds), dtype=bool)
+        for node_id in self.monitorIds:
+            index = self.nodeIndex.get(node_id)
+            if index is not None:
+                isMonitor[index] = True
+
+        model = NetworkModel(
+            self.nodeIds,
+            self.nodeTypeNames,
+            np.frombuffer(self.nodeTypeCodes, dtype=np.int16) if len(self.nodeTypeCodes) else [],
+            isMonitor,
+            np.frombuffer(self.src, dtype=np.int32) if len(self.src) else np.zeros(0, dtype=np.int32),
+            np.frombuffer(self.dst, dtype=np.int32) if len(self.dst) else np.zeros(0, dtype=np.int32),
+            np.frombuffer(self.edgeTypes, dtype=np.int8) if len(self.edgeTypes) else np.zeros(0, dtype=np.int8),
+            self.edgeIds,
+            self.metadata,
+        )
+
+        if len(self.positionIndex):
+            model.sourcePositions = np.full((len(self.nodeIds), 2), np.nan)
+            index = np.frombuffer(self.positionIndex, dtype=np.int32)
+            # a node listed twice keeps its last position, as addNode keeps its last type
+            _, last = np.unique(index[::-1], return_index=True)
+            last = index.size - 1 - last
+            model.sourcePositions[index[last], 0] = np.frombuffer(self.positionX, dtype=np.float64)[last]
+            model.sourcePositions[index[last], 1] = np.frombuffer(self.positionY, dtype=np.float64)[last]
+        return model
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from NetworkModel import NetworkModel
+
+
+class NetworkSnapshot:
+    """
+    Single-file binary snapshot of a laid out NetworkModel.
+
+    Layout:
+        MAGIC (8 bytes) | version, header length (2 x uint32 LE) | JSON header |
+        array blobs, each starting on an ALIGN-byte boundary
+
+    The header lists every array's dtype, shape and offset, so numeric arrays
+    are read back as zero-copy views of a memory map. Node and conduit IDs are
+    stored as NUL-separated UTF-8 blobs. The header also records a fingerprint
+    (mtime, size, SHA-256) of each source CSV; a snapshot whose sources have
+    changed is reported stale and must be rebuilt from the CSVs.
+    """
+
+    MAGIC = b"FMSNAP\x00\x01"
+    VERSION = 1
+    ALIGN = 64
+    EXTENSION = ".fmsnap"
+
+    SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fm-schematic-automation", "snapshots")
+
+    # numeric model arrays stored as-is
+    ARRAYS = ("nodeTypeCodes", "isMonitor", "indptr", "edgeSrc", "edgeDst", "edgeTypes", "positions")
+
+    # --------------------------
+    # Source fingerprints
+    # --------------------------
+
+    @staticmethod
+    def autoPath(paths, engine="layered"):
+        """Default snapshot location for a set of source paths (see AppManager.paths)."""
+        digest = hashlib.sha256()
+        digest.update(engine.encode())
+        for key in sorted(paths):
+            if paths[key]:
+                digest.update(f"\n{key}={os.path.abspath(paths[key])}".encode())
+        return os.path.join(NetworkSnapshot.SNAPSHOT_DIR, digest.hexdigest()[:32] + NetworkSnapshot.EXTENSION)
+
+    @staticmethod
+    def _hashFile(path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint(paths):
+        """
+        Returns:
+            { key: {"path": str, "mtime_ns": int, "size": int, "sha256": str}, ... }
+            for every path that exists
+        """
+        sources = {}
+        for key, path in paths.items():
+            if not path or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            sources[key] = {
+                "path": os.path.abspath(path),
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "sha256": NetworkSnapshot._hashFile(path),
+            }
+        return sources
+
+    @staticmethod
+    def sourcesChanged(sources, paths=None):
+        """
+        True if the recorded sources no longer match the files on disk (or, when
+        `paths` is given, a different set of files is requested). A touched file
+        whose content hash is unchanged still counts as current.
+        """
+        if paths is not None:
+            wanted = {key: os.path.abspath(path) for key, path in paths.items() if path and os.path.isfile(path)}
+            if wanted != {key: source["path"] for key, source in sources.items()}:
+                return True
+
+        for source in sources.values():
+            try:
+                st = os.stat(source["path"])
+            except OSError:
+                return True
+            if st.st_size != source["size"]:
+                return True
+            if st.st_mtime_ns != source["mtime_ns"] and NetworkSnapshot._hashFile(source["path"]) != source["sha256"]:
+                return True
+        return False
+
+    # --------------------------
+    # Save / load
+    # --------------------------
+
+    @staticmethod
+    def save(path, model, sources, engine="layered"):
+        """
+        Write model (with its positions) to path atomically.
+        sources: NetworkSnapshot.fingerprint(...) of the CSVs it was built from
+        """
+        blobs = {name: np.ascontiguousarray(getattr(model, name)) for name in NetworkSnapshot.ARRAYS}
+        blobs["nodeIds"] = np.frombuffer("\x00".join(model.nodeIds).encode("utf-8"), dtype=np.uint8)
+        blobs["edgeIds"] = np.frombuffer("\x00".join(model.edgeIds).encode("utf-8"), dtype=np.uint8)
+
+        arrays = {}
+        offset = 0
+        for name, blob in blobs.items():
+            offset = -(-offset // NetworkSnapshot.ALIGN) * NetworkSnapshot.ALIGN
+            arrays[name] = {"dtype": blob.dtype.str, "shape": list(blob.shape), "offset": offset}
+            offset += blob.nbytes
+
+        header = json.dumps({
+            "version": NetworkSnapshot.VERSION,
+            "engine": engine,
+            "nodeCount": model.nodeCount,
+            "edgeCount": model.edgeCount,
+            "nodeTypeNames": model.nodeTypeNames,
+            "metadata": {str(index): data for index, data in model.metadata.items()},
+            "sources": sources,
+            "arrays": arrays,
+        }).encode("utf-8")
+
+        prefix = NetworkSnapshot.MAGIC + struct.pack("<II", NetworkSnapshot.VERSION, len(header)) + header
+        data_start = -(-len(prefix) // NetworkSnapshot.ALIGN) * NetworkSnapshot.ALIGN
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(prefix)
+            for name, blob in blobs.items():
+                f.seek(data_start + arrays[name]["offset"])
+                f.write(blob.tobytes())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def readHeader(path):
+        """Returns (header dict, byte offset of the array data)."""
+        with open(path, "rb") as f:
+            magic = f.read(len(NetworkSnapshot.MAGIC))
+            if magic != NetworkSnapshot.MAGIC:
+                raise ValueError(f"{path} is not a network snapshot")
+            version, header_len = struct.unpack("<II", f.read(8))
+            if version != NetworkSnapshot.VERSION:
+                raise ValueError(f"{path}: unsupported snapshot version {version}")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        prefix_len = len(NetworkSnapshot.MAGIC) + 8 + header_len
+        return header, -(-prefix_len // NetworkSnapshot.ALIGN) * NetworkSnapshot.ALIGN
+
+    @staticmethod
+    def load(path):
+        """
+        Returns:
+            (NetworkModel, header dict)
+        Numeric arrays are read-only views of a memory map, except positions,
+        which are copied so the schematic can be edited.
+        """
+        header, data_start = NetworkSnapshot.readHeader(path)
+        mapped = np.memmap(path, dtype=np.uint8, mode="r")
+
+        def array(name):
+            spec = header["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            start = data_start + spec["offset"]
+            return np.frombuffer(mapped, dtype=dtype, count=count, offset=start).reshape(spec["shape"])
+
+        def strings(name):
+            raw = array(name).tobytes().decode("utf-8")
+            return raw.split("\x00") if raw else []
+
+        node_ids = strings("nodeIds")
+        edge_ids = strings("edgeIds")
+        if len(node_ids) != header["nodeCount"] or len(edge_ids) != header["edgeCount"]:
+            raise ValueError(f"{path}: corrupt ID tables")
+
+        model = NetworkModel.fromCsr(
+            node_ids,
+            header["nodeTypeNames"],
+            array("nodeTypeCodes"),
+            array("isMonitor"),
+            array("indptr"),
+            array("edgeSrc"),
+            array("edgeDst"),
+            array("edgeTypes"),
+            edge_ids,
+            array("positions").copy(),
+            {int(index): data for index, data in header["metadata"].items()},
+        )
+        return model, header
+
+    @staticmethod
+    def loadIfCurrent(path, paths=None, engine="layered"):
+        """
+        Load a snapshot only if it exists, matches engine and its sources are unchanged.
+        Returns:
+            (NetworkModel, sources) or None
+        """
+        if not os.path.isfile(path):
+            return None
+        try:
+            header, _ = NetworkSnapshot.readHeader(path)
+            if header.get("engine") != engine or NetworkSnapshot.sourcesChanged(header["sources"], paths):
+                return None
+            model, _ = NetworkSnapshot.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable snapshot {path}: {e}")
+            return None
+        return model, header["sources"]
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class NetworkTrace:
+    """
+    Upstream / downstream tracing over a NetworkModel's conduits: what drains
+    into a node, or where the flow from it ends up. Get one with model.trace().
+
+    - order(): topological order of the conduit graph, found a whole frontier
+      at a time (Kahn's algorithm); nodes on or below a loop come last
+    - catchment(): everything upstream of a monitor, memoised. precompute()
+      fills them in upstream-most first, so each search stops at the monitors
+      above it and takes their catchments whole
+    - trace(): upstream or downstream of any node, stopping at memoised
+      catchments the same way; the last CACHE_SIZE results are kept
+
+    Everything here depends only on the conduit graph, so a reload that leaves
+    the conduits alone keeps it (see NetworkModel.inheritTrace).
+    """
+
+    DIRECTIONS = ("upstream", "downstream")
+    # traces memoised besides the monitor catchments
+    CACHE_SIZE = 32
+
+    def __init__(self, model):
+        self.nodeCount = model.nodeCount
+        self.edgeSrc = model.edgeSrc
+        self.edgeDst = model.edgeDst
+
+        # (indptr, neighbour) CSR pairs: downstream along each node's outgoing
+        # conduits, upstream along its incoming ones
+        in_indptr, in_edges = model.reverse()
+        self._down = (model.indptr, model.edgeDst)
+        self._up = (in_indptr, model.edgeSrc[in_edges])
+
+        self._order = None
+        self._catchments = {}   # node index -> sorted node indices upstream of it
+        self._hasCatchment = np.zeros(self.nodeCount, dtype=bool)
+        self._traces = OrderedDict()  # (index, direction) -> (nodes, edges)
+
+    # --------------------------
+    # Precomputed structure
+    # --------------------------
+
+    def order(self):
+        """
+        Returns:
+            int64 array of every node index, upstream before downstream
+        """
+        if self._order is not None:
+            return self._order
+
+        indptr, targets = self._down
+        indegree = np.bincount(self.edgeDst, minlength=self.nodeCount)
+        frontier = np.flatnonzero(indegree == 0)
+        levels = []
+        while frontier.size:
+            levels.append(frontier)
+            below, counts = np.unique(NetworkTrace._neighbours(indptr, targets, frontier), return_counts=True)
+            indegree[below] -= counts
+            frontier = below[indegree[below] == 0]
+
+        # loops never reach zero; keep them (and everything below them) in index order
+        levels.append(np.flatnonzero(indegree > 0))
+        self._order = np.concatenate(levels).astype(np.int64)
+        return self._order
+
+    def precompute(self, monitors):
+        """
+        Memoise the catchment of every monitor, upstream-most first.
+        monitors: node indices, e.g. np.flatnonzero(model.isMonitor)
+        """
+        monitors = np.asarray(monitors, dtype=np.int64)
+        if not monitors.size:
+            return
+        rank = np.empty(self.nodeCount, dtype=np.int64)
+        rank[self.order()] = np.arange(self.nodeCount)
+        for monitor in monitors[np.argsort(rank[monitors], kind="stable")].tolist():
+            self.catchment(monitor)
+
+    def catchment(self, monitor):
+        """
+        Every node that drains into monitor (itself included), memoised.
+        Returns:
+            sorted int64 array of node indices
+        """
+        nodes = self._catchments.get(monitor)
+        if nodes is None:
+            nodes = self._reach(monitor, self._up, stops=True)
+            self._catchments[monitor] = nodes
+            self._hasCatchment[monitor] = True
+        return nodes
+
+    # --------------------------
+    # Traces
+    # --------------------------
+
+    def trace(self, index, direction="upstream"):
+        """
+        Nodes and conduits upstream of index (everything that drains into
+        it), or downstream of it (everywhere its flow can go).
+        direction: one of DIRECTIONS
+        Returns:
+            (sorted node indices including index, sorted edge indices), int64 arrays
+        """
+        if direction not in NetworkTrace.DIRECTIONS:
+            raise ValueError(f"Unknown trace direction '{direction}', expected one of {NetworkTrace.DIRECTIONS}")
+        key = (int(index), direction)
+        traced = self._traces.get(key)
+        if traced is not None:
+            self._traces.move_to_end(key)
+            return traced
+
+        if direction == "upstream":
+            nodes = self._catchments.get(key[0])
+            if nodes is None:
+                nodes = self._reach(key[0], self._up, stops=True)
+            # any conduit into a node upstream of index is on a path to it
+            inside = np.zeros(self.nodeCount, dtype=bool)
+            inside[nodes] = True
+            edges = np.flatnonzero(inside[self.edgeDst])
+        else:
+            nodes = self._reach(key[0], self._down, stops=False)
+            inside = np.zeros(self.nodeCount, dtype=bool)
+            inside[nodes] = True
+            edges = np.flatnonzero(inside[self.edgeSrc])
+
+        traced = (nodes, edges)
+        self._traces[key] = traced
+        if len(self._traces) > NetworkTrace.CACHE_SIZE:
+            self._traces.popitem(last=False)
+        return traced
+
+    def _reach(self, start, csr, stops):
+        """
+        Breadth-first search from start along csr, a whole frontier per step.
+        stops: take memoised catchments whole instead of searching above them
+        Returns:
+            sorted int64 array of the nodes reached, start included
+        """
+        indptr, targets = csr
+        seen = np.zeros(self.nodeCount, dtype=bool)
+        seen[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        while frontier.size:
+            reached = NetworkTrace._neighbours(indptr, targets, frontier)
+            reached = np.unique(reached[~seen[reached]])
+            if stops and self._catchments:
+                known = self._hasCatchment[reached]
+                for monitor in reached[known].tolist():
+                    seen[self._catchments[monitor]] = True
+                reached = reached[~known]
+            seen[reached] = True
+            frontier = reached
+        return np.flatnonzero(seen)
+
+    @staticmethod
+    def _neighbours(indptr, targets, frontier):
+        """targets[indptr[v]:indptr[v + 1]] for every v in frontier, concatenated."""
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            return np.zeros(0, dtype=np.int64)
+        ends = np.cumsum(counts)
+        return targets[np.arange(total) + np.repeat(starts - (ends - counts), counts)]
@@ -1,11 +1,48 @@
 class Node:
-    def __init__(self, nodeID, x, y, nodeType=1, metadata=None):
-        self.id = str(nodeID)
-        self.x = float(x)
-        self.y = float(y)
-        self.type = int(nodeType)
+    """
+    View of one node in a NetworkModel. Holds only (model, index); every
+    attribute is read from the model's arrays on access.
+    """
+
+    __slots__ = ("model", "index")
+
+    def __init__(self, model, index):
+        self.model = model
+        self.index = int(index)
+
+    @property
+    def id(self):
+        return self.model.nodeIds[self.index]
+
+    @property
+    def x(self):
+        return float(self.model.positions[self.index, 0])
+
+    @property
+    def y(self):
+        return float(self.model.positions[self.index, 1])
+
+    @property
+    def type(self):
+        return self.model.nodeType(self.index)
+
+    @property
+    def isMonitor(self):
+        return bool(self.model.isMonitor[self.index])
+
+    @property
+    def metadata(self):
         #extra info to show on hover (flow, pressure, name, etc.)
-        self.metadata = metadata or {}
-        #stores a list of tuples (nodeID, pipeID)
-        self.downstream = list()
-        self.upstream = list()
+        return self.model.metadata.setdefault(self.index, {})
+
+    @property
+    def downstream(self):
+        #list of tuples (nodeID, pipeID)
+        model = self.model
+        return [(model.nodeIds[model.edgeDst[e]], model.edgeIds[e]) for e in model.outEdges(self.index)]
+
+    @property
+    def upstream(self):
+        #list of tuples (nodeID, pipeID)
+        model = self.model
+        return [(model.nodeIds[model.edgeSrc[e]], model.edgeIds[e]) for e in model.inEdges(self.index)]
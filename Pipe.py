@@ -1,6 +1,24 @@
 class Pipe:
-    def __init__(self, suffix, upstreamNode, downstreamNode):
-        self.pipeID = upstreamNode + '.' + suffix
-        self.upstreamNode = upstreamNode
-        self.downstreamNode = downstreamNode
+    """View of one conduit in a NetworkModel (see Node)."""
 
+    __slots__ = ("model", "index")
+
+    def __init__(self, model, index):
+        self.model = model
+        self.index = int(index)
+
+    @property
+    def pipeID(self):
+        return self.model.edgeIds[self.index]
+
+    @property
+    def upstreamNode(self):
+        return self.model.nodeIds[self.model.edgeSrc[self.index]]
+
+    @property
+    def downstreamNode(self):
+        return self.model.nodeIds[self.model.edgeDst[self.index]]
+
+    @property
+    def type(self):
+        return self.model.conduitType(self.index)
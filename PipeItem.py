@@ -1,18 +1,42 @@
 import math
+from PyQt6 import sip
 from PyQt6.QtWidgets import QGraphicsItem, QToolTip
 from PyQt6.QtGui import QPen, QBrush, QPainterPath, QPolygonF, QColor
-from PyQt6.QtCore import Qt, QRectF, QPointF, QPoint
+from PyQt6.QtCore import Qt, QRectF, QPointF, QPoint, QTimer
 
 
 class PipeItem(QGraphicsItem):
     """A hoverable directed pipe drawn as a straight line + arrowhead.
 
-    This item stores references to two node QGraphicsItems. Call `updatePosition()`
-    whenever either node moves.
+    This item stores references to two node QGraphicsItems. Call `markDirty()`
+    whenever either node moves: dirty pipes are recomputed once each in a single
+    deferred pass (see flushDirty), however many times their nodes moved since.
+    `updatePosition()` recomputes immediately.
 
-    The pipe endpoints are computed from each node's sceneBoundingRect().center().
+    The pipe endpoints are each node's sceneCentre() if it has one (SvgNodeItem),
+    otherwise its sceneBoundingRect().center().
+    When zoomed out, arrowheads shorter than ARROW_MIN_PIXELS on screen are skipped.
+
+    Given a segment_index (SegmentIndex), the pipe keeps its line registered
+    there and leaves hover to the view (see SchematicView.hoverPipeAt) instead
+    of taking Qt hover events through its shape.
     """
 
+    LEVEL_OF_DETAIL = True
+    ARROW_MIN_PIXELS = 3.0
+
+    # pipes on a trace (see NetworkDrawer.showTrace) are drawn in this colour, this many pixels wide
+    TRACE_COLOUR = QColor("#00a6d6")
+    TRACE_WIDTH = 3
+
+    # (QColor.rgba(), base_width) -> shared pen for setOverlayColour
+    _overlayPens = {}
+
+    # pipes waiting for updatePosition(), and whether a flush is queued
+    BATCH_UPDATES = True
+    _dirty = set()
+    _flushQueued = False
+
     def __init__(
         self,
         upstream_item: QGraphicsItem,
@@ -24,6 +48,7 @@ class PipeItem(QGraphicsItem):
         arrow_size: float = 10.0,
         hit_width: float = 12.0,
         draw_label: bool = False,
+        segment_index=None,
     ):
         super().__init__()
 
@@ -37,10 +62,15 @@ class PipeItem(QGraphicsItem):
         self.arrow_size = float(arrow_size)
         self.hit_width = float(hit_width)
         self.draw_label = bool(draw_label)
+        self.segmentIndex = segment_index
 
         self._hover = False
+        self._traced = False
+        # pen for setOverlayColour, or None to draw in pen_colour
+        self._overlay_pen = None
+        self.updatePen()
 
-        self.setAcceptHoverEvents(True)
+        self.setAcceptHoverEvents(segment_index is None)
         self.setZValue(-10)  # keep pipes behind nodes
 
         # geometry caches
@@ -63,40 +93,34 @@ class PipeItem(QGraphicsItem):
         return self._hit_shape
 
     def paint(self, painter, option, widget=None):
-        painter.setRenderHint(painter.RenderHint.Antialiasing, True)
-
-        colour = self.pen_colour
-        if isinstance(colour, str):
-            colour = QColor(colour)
-
-        if colour is None:
-            pen = QPen(Qt.GlobalColor.black)
-            brush = QBrush(Qt.GlobalColor.black)
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        draw_arrow = not PipeItem.LEVEL_OF_DETAIL or self.arrow_size * lod >= PipeItem.ARROW_MIN_PIXELS
+
+        # once arrowheads are too small to see, 1px aliased lines look the same and draw faster;
+        # never turn antialiasing on when the view has it off (see SchematicView.beginInteraction)
+        antialias = draw_arrow and painter.testRenderHint(painter.RenderHint.Antialiasing)
+        painter.setRenderHint(painter.RenderHint.Antialiasing, antialias)
+        if self._traced:
+            painter.setPen(self._trace_pen)
+        elif self._hover:
+            painter.setPen(self._hover_pen)
         else:
-            pen = QPen(colour)
-            brush = QBrush(colour)
-
-        pen.setWidth(self.hover_width if self._hover else self.base_width)
-        pen.setCosmetic(True)
-        painter.setPen(pen)
+            painter.setPen(self._overlay_pen or self._pen)
 
         painter.drawPath(self._draw_path)
 
-        painter.setBrush(brush)
-        painter.drawPolygon(self._arrow_poly)
+        if draw_arrow:
+            painter.setBrush(self._brush)
+            painter.drawPolygon(self._arrow_poly)
 
         if self.draw_label and self.edge_id is not None and self._label_pos is not None:
-            painter.setPen(pen)
             painter.drawText(self._label_pos, str(self.edge_id))
 
     # -----------------
     # Hover behaviour
     # -----------------
 
-    def hoverEnterEvent(self, event):
-        self._hover = True
-        self.update()
-
+    def tooltipText(self):
         u_id = getattr(self.upstream_item, "node_id", None)
         d_id = getattr(self.downstream_item, "node_id", None)
 
@@ -106,41 +130,59 @@ class PipeItem(QGraphicsItem):
         if u_id is not None and d_id is not None:
             lines.append(f"{u_id} -> {d_id}")
 
-        text = "\n".join(lines) if lines else "Pipe"
+        return "\n".join(lines) if lines else "Pipe"
+
+    def setHovered(self, hovered):
+        if hovered != self._hover:
+            self._hover = hovered
+            self.update()
+
+    def setTraced(self, traced):
+        if traced != self._traced:
+            self._traced = traced
+            self.update()
+
+    def setOverlayColour(self, colour):
+        """
+        Draw the pipe in colour instead of its type's, e.g. for a monitor
+        reading (see TimeSeriesOverlay); None goes back to pen_colour.
+        Repaints only if the colour changed.
+        """
+        current = self._overlay_pen.color().rgba() if self._overlay_pen is not None else None
+        if (colour.rgba() if colour is not None else None) == current:
+            return
+        self._overlay_pen = PipeItem.overlayPen(colour, self.base_width) if colour is not None else None
+        self.update()
 
-        pos = event.screenPos()
-        if hasattr(pos, "toPoint"):
-            pos = pos.toPoint()
-        else:
-            pos = QPoint(int(pos.x()), int(pos.y()))
+    @staticmethod
+    def overlayPen(colour, base_width):
+        # overlays use a handful of colours (a ramp), so the pens are shared
+        key = (colour.rgba(), base_width)
+        pen = PipeItem._overlayPens.get(key)
+        if pen is None:
+            # one pixel wider than the type colour, so the reading stands out
+            pen = QPen(colour)
+            pen.setWidth(base_width + 1)
+            pen.setCosmetic(True)
+            PipeItem._overlayPens[key] = pen
+        return pen
 
-        QToolTip.showText(pos + QPoint(6, 6), text)
-        super().hoverEnterEvent(event)
+    def hoverEnterEvent(self, event):
+        self.setHovered(True)
+        self.hoverMoveEvent(event)
 
     def hoverMoveEvent(self, event):
-        u_id = getattr(self.upstream_item, "node_id", None)
-        d_id = getattr(self.downstream_item, "node_id", None)
-
-        lines = []
-        if self.edge_id is not None:
-            lines.append(f"Pipe: {self.edge_id}")
-        if u_id is not None and d_id is not None:
-            lines.append(f"{u_id} -> {d_id}")
-
-        text = "\n".join(lines) if lines else "Pipe"
-
         pos = event.screenPos()
         if hasattr(pos, "toPoint"):
             pos = pos.toPoint()
         else:
             pos = QPoint(int(pos.x()), int(pos.y()))
 
-        QToolTip.showText(pos + QPoint(6, 6), text)
+        QToolTip.showText(pos + QPoint(6, 6), self.tooltipText())
         super().hoverMoveEvent(event)
 
     def hoverLeaveEvent(self, event):
-        self._hover = False
-        self.update()
+        self.setHovered(False)
         QToolTip.hideText()
         super().hoverLeaveEvent(event)
 
@@ -148,14 +190,63 @@ class PipeItem(QGraphicsItem):
     # Public API
     # -----------------
 
+    @staticmethod
+    def itemCentre(item):
+        centre = getattr(item, "sceneCentre", None)
+        return centre() if centre is not None else item.sceneBoundingRect().center()
+
+    def updatePen(self):
+        """Rebuild the cached pens/brush; call after changing pen_colour or the widths."""
+        colour = self.pen_colour
+        if isinstance(colour, str):
+            colour = QColor(colour)
+        if colour is None:
+            colour = QColor(Qt.GlobalColor.black)
+
+        self._pen = QPen(colour)
+        self._pen.setWidth(self.base_width)
+        self._pen.setCosmetic(True)
+        self._hover_pen = QPen(self._pen)
+        self._hover_pen.setWidth(self.hover_width)
+        self._trace_pen = QPen(PipeItem.TRACE_COLOUR)
+        self._trace_pen.setWidth(PipeItem.TRACE_WIDTH)
+        self._trace_pen.setCosmetic(True)
+        self._brush = QBrush(colour)
+
+    def markDirty(self):
+        """Queue updatePosition() for the next pass of the event loop."""
+        if not PipeItem.BATCH_UPDATES:
+            self.updatePosition()
+            return
+        PipeItem.queueUpdate(self)
+
+    @staticmethod
+    def queueUpdate(item):
+        """Queue any object with an updatePosition() method (e.g. a PipeLayerItem) for flushDirty."""
+        PipeItem._dirty.add(item)
+        if not PipeItem._flushQueued:
+            PipeItem._flushQueued = True
+            QTimer.singleShot(0, PipeItem.flushDirty)
+
+    @staticmethod
+    def flushDirty():
+        """Recompute every dirty pipe once. Safe to call directly (e.g. before an export)."""
+        items = PipeItem._dirty
+        PipeItem._dirty = set()
+        PipeItem._flushQueued = False
+        for item in items:
+            # the scene may have been torn down since the item was marked
+            if not sip.isdeleted(item):
+                item.updatePosition()
+
     def updatePosition(self):
         """Recompute endpoints/arrow/bounds based on current node positions."""
         if self.upstream_item is None or self.downstream_item is None:
             return
 
         # Endpoints are in scene coordinates
-        start = self.upstream_item.sceneBoundingRect().center()
-        end = self.downstream_item.sceneBoundingRect().center()
+        start = PipeItem.itemCentre(self.upstream_item)
+        end = PipeItem.itemCentre(self.downstream_item)
 
         self.prepareGeometryChange()
 
@@ -196,25 +287,30 @@ class PipeItem(QGraphicsItem):
         pad = max(self.hit_width, self.arrow_size) + 2.0
         self._bounds = QRectF(rect.left() - pad, rect.top() - pad, rect.width() + 2 * pad, rect.height() + 2 * pad)
 
-        # Hit shape: a thick rectangle along the line + arrowhead
+        # Hit shape: a hit_width strip along the line + arrowhead
         hit = QPainterPath()
         hw = self.hit_width / 2.0
 
         x1, y1 = start.x(), start.y()
         x2, y2 = end.x(), end.y()
 
-        if not (x1 == x2 and y1 == y2):
-            if abs(x2 - x1) >= abs(y2 - y1):
-                left = min(x1, x2)
-                right = max(x1, x2)
-                # approximate line hitbox as horizontal strip at y1
-                hit.addRect(QRectF(left, y1 - hw, right - left, 2 * hw))
-            else:
-                top = min(y1, y2)
-                bottom = max(y1, y2)
-                hit.addRect(QRectF(x1 - hw, top, 2 * hw, bottom - top))
+        length = math.hypot(x2 - x1, y2 - y1)
+        if length > 0:
+            # unit normal to the line, scaled to half the hit width
+            nx = -(y2 - y1) / length * hw
+            ny = (x2 - x1) / length * hw
+            hit.addPolygon(QPolygonF([
+                QPointF(x1 + nx, y1 + ny),
+                QPointF(x2 + nx, y2 + ny),
+                QPointF(x2 - nx, y2 - ny),
+                QPointF(x1 - nx, y1 - ny),
+            ]))
+            hit.closeSubpath()
 
         hit.addPolygon(self._arrow_poly)
         self._hit_shape = hit
 
+        if self.segmentIndex is not None:
+            self.segmentIndex.setSegment(self, x1, y1, x2, y2)
+
         self.update()
\ No newline at end of file
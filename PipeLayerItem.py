@@ -0,0 +1,525 @@
+import numpy as np
+from PyQt6.QtWidgets import QGraphicsItem, QToolTip
+from PyQt6.QtGui import QPen, QBrush, QPainterPath, QColor
+from PyQt6.QtCore import Qt, QRectF, QPoint, QLineF
+
+from PipeItem import PipeItem
+
+
+class LayerPipe:
+    """
+    Handle for one conduit drawn by a PipeLayerItem, kept in a node's
+    connectedPipes so that moving the node marks the segment dirty.
+    """
+    __slots__ = ("layer", "index")
+
+    def __init__(self, layer, index):
+        self.layer = layer
+        self.index = index
+
+    @property
+    def edge_id(self):
+        return self.layer.edge_ids[self.index]
+
+    @property
+    def upstream_item(self):
+        return self.layer.upstream_items[self.index]
+
+    @upstream_item.setter
+    def upstream_item(self, item):
+        self.layer.upstream_items[self.index] = item
+        self.markDirty()
+
+    @property
+    def downstream_item(self):
+        return self.layer.downstream_items[self.index]
+
+    @downstream_item.setter
+    def downstream_item(self, item):
+        self.layer.downstream_items[self.index] = item
+        self.markDirty()
+
+    def tooltipText(self):
+        return self.layer.tooltipText(self.index)
+
+    def setHovered(self, hovered):
+        if hovered:
+            self.layer._setHovered(self.index)
+        elif self.layer._hovered == self.index:
+            self.layer._setHovered(-1)
+
+    def setTraced(self, traced):
+        if traced:
+            self.layer.setTraced([self.index])
+        else:
+            self.layer.clearTraced([self.index])
+
+    def setOverlayColour(self, colour):
+        self.layer.setOverlayColour(self.index, colour)
+
+    def markDirty(self):
+        self.layer.markDirty(self.index)
+
+
+class PipeLayerItem(QGraphicsItem):
+    """
+    Draws every pipe of one conduit type as a single item.
+
+    Segment end points live in numpy arrays; paint() picks the segments
+    crossing the exposed rect and draws them with one drawLines() call, plus
+    their arrowheads as one path when they are big enough to see (same rule
+    as PipeItem). Hover and tooltips come from a nearest-segment lookup
+    rather than per-pipe shapes: through segment_index (SegmentIndex) when
+    given, like PipeItem, otherwise segmentAt(). Behaves like a set of
+    PipeItems with the same arguments.
+    """
+
+    # per-segment arrays, in step with edge_ids
+    _ARRAYS = ("_start", "_end", "_lo", "_hi", "_traced", "_overlay")
+
+    def __init__(
+        self,
+        upstream_items,
+        downstream_items,
+        edge_ids,
+        pen_colour=None,
+        base_width: int = 1,
+        hover_width: int = 2,
+        arrow_size: float = 10.0,
+        hit_width: float = 12.0,
+        segment_index=None,
+    ):
+        super().__init__()
+
+        self.upstream_items = list(upstream_items)
+        self.downstream_items = list(downstream_items)
+        self.edge_ids = list(edge_ids)
+        self.pen_colour = pen_colour
+
+        self.base_width = int(base_width)
+        self.hover_width = int(hover_width)
+        self.arrow_size = float(arrow_size)
+        self.hit_width = float(hit_width)
+        self.segmentIndex = segment_index
+
+        self._hovered = -1
+        self._dirty = set()
+        # see _paintBatch; dropped whenever a segment is added, removed or moved
+        self._paintCache = None
+        self.updatePen()
+
+        self.setAcceptHoverEvents(segment_index is None)
+        self.setZValue(-10)  # keep pipes behind nodes
+        # paint() needs option.exposedRect
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption, True)
+
+        n = len(self.edge_ids)
+        # segments on a trace, drawn over the rest (see PipeItem.TRACE_COLOUR)
+        self._traced = np.zeros(n, dtype=bool)
+        # per-segment overlay colour (see setOverlayColour): index into _overlayPens, or -1
+        self._overlay = np.full(n, -1, dtype=np.int32)
+        self._overlayPens = []
+        self._overlayCodes = {}  # QColor.rgba() -> index into _overlayPens
+        # segment end points, (n, 2) each, in scene coordinates
+        self._start = np.zeros((n, 2), dtype=np.float64)
+        self._end = np.zeros((n, 2), dtype=np.float64)
+        for i in range(n):
+            start = PipeItem.itemCentre(self.upstream_items[i])
+            end = PipeItem.itemCentre(self.downstream_items[i])
+            self._start[i] = (start.x(), start.y())
+            self._end[i] = (end.x(), end.y())
+        self._lines = [QLineF(*self._start[i], *self._end[i]) for i in range(n)]
+        # per-segment bounding boxes, for segmentsIn
+        self._lo = np.minimum(self._start, self._end)
+        self._hi = np.maximum(self._start, self._end)
+
+        # the arrays above are views of these, grown geometrically (see _resize)
+        self._buffers = {name: getattr(self, name) for name in PipeLayerItem._ARRAYS}
+
+        self._handles = [LayerPipe(self, i) for i in range(n)]
+        if segment_index is not None:
+            segment_index.setSegments(self._handles, self._start, self._end)
+
+        self._bounds = QRectF()
+        self._updateBounds()
+
+    def handles(self):
+        """One LayerPipe per segment, for the nodes' connectedPipes."""
+        return self._handles
+
+    # -----------------
+    # Qt required API
+    # -----------------
+
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        if not self._lines:
+            return
+
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        draw_arrow = not PipeItem.LEVEL_OF_DETAIL or self.arrow_size * lod >= PipeItem.ARROW_MIN_PIXELS
+
+        # same antialiasing rule as PipeItem.paint
+        antialias = draw_arrow and painter.testRenderHint(painter.RenderHint.Antialiasing)
+        painter.setRenderHint(painter.RenderHint.Antialiasing, antialias)
+
+        visible = self.segmentsIn(option.exposedRect, self.arrow_size if draw_arrow else 0.0)
+        if visible.size == 0:
+            return
+
+        painter.setPen(self._pen)
+        lines = self._lines
+        visible_lines, arrows = self._paintBatch(visible, draw_arrow)
+        painter.drawLines(visible_lines)
+
+        if arrows is not None:
+            painter.setBrush(self._brush)
+            painter.drawPath(arrows)
+
+        overlaid = visible[self._overlay[visible] >= 0]
+        if overlaid.size:
+            codes = self._overlay[overlaid]
+            for code in np.unique(codes).tolist():
+                painter.setPen(self._overlayPens[code])
+                painter.drawLines([lines[i] for i in overlaid[codes == code].tolist()])
+
+        traced = visible[self._traced[visible]]
+        if traced.size:
+            painter.setPen(self._trace_pen)
+            painter.drawLines([lines[i] for i in traced.tolist()])
+
+        if self._hovered >= 0:
+            painter.setPen(self._hover_pen)
+            painter.drawLine(lines[self._hovered])
+
+    def _paintBatch(self, visible, draw_arrow):
+        """
+        The QLineFs of the visible segments and one path holding all their
+        arrowheads (None without arrows), kept while the same segments are
+        painted again and none of them has moved.
+        """
+        cache = self._paintCache
+        if cache is not None and cache[0] == draw_arrow and np.array_equal(cache[1], visible):
+            return cache[2], cache[3]
+
+        lines = self._lines if visible.size == len(self._lines) else [self._lines[i] for i in visible.tolist()]
+        arrows = None
+        if draw_arrow:
+            arrows = QPainterPath()
+            # arrowheads can overlap; every one is wound the same way, so winding fills them all
+            arrows.setFillRule(Qt.FillRule.WindingFill)
+            tips, left, right = self.arrowheads(visible)
+            for (x1, y1), (x2, y2), (x3, y3) in zip(tips.tolist(), left.tolist(), right.tolist()):
+                arrows.moveTo(x1, y1)
+                arrows.lineTo(x2, y2)
+                arrows.lineTo(x3, y3)
+                arrows.closeSubpath()
+        self._paintCache = (draw_arrow, visible, lines, arrows)
+        return lines, arrows
+
+    # -----------------
+    # Geometry
+    # -----------------
+
+    def segmentsIn(self, rect, pad=0.0):
+        """Indices of segments whose bounding boxes touch rect grown by pad."""
+        lo, hi = self._lo, self._hi
+        mask = (
+            (hi[:, 0] >= rect.left() - pad) & (lo[:, 0] <= rect.right() + pad)
+            & (hi[:, 1] >= rect.top() - pad) & (lo[:, 1] <= rect.bottom() + pad)
+        )
+        return np.flatnonzero(mask)
+
+    def arrowheads(self, indices):
+        """Mid-line arrowhead corners (tip, left, right) for the given segments, as PipeItem draws them."""
+        start = self._start[indices]
+        end = self._end[indices]
+        delta = end - start
+        angle = np.arctan2(delta[:, 1], delta[:, 0])
+        tip = start + 0.5 * delta
+
+        a = self.arrow_size
+        left = tip - a * np.stack([np.cos(angle - np.pi / 6.0), np.sin(angle - np.pi / 6.0)], axis=1)
+        right = tip - a * np.stack([np.cos(angle + np.pi / 6.0), np.sin(angle + np.pi / 6.0)], axis=1)
+        return tip, left, right
+
+    def segmentAt(self, point, tolerance=None):
+        """
+        Index of the segment nearest to point (scene coordinates) within
+        tolerance (default hit_width / 2), or -1.
+        """
+        if tolerance is None:
+            tolerance = self.hit_width / 2.0
+        x, y = point.x(), point.y()
+        candidates = self.segmentsIn(QRectF(x, y, 0.0, 0.0), tolerance)
+        if candidates.size == 0:
+            return -1
+
+        start = self._start[candidates]
+        delta = self._end[candidates] - start
+        length2 = np.einsum("ij,ij->i", delta, delta)
+        offset = np.array([x, y]) - start
+        t = np.clip(np.einsum("ij,ij->i", offset, delta) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+        nearest = start + t[:, None] * delta
+        distance2 = np.sum((nearest - (x, y)) ** 2, axis=1)
+
+        best = int(np.argmin(distance2))
+        return int(candidates[best]) if distance2[best] <= tolerance * tolerance else -1
+
+    def _segmentRect(self, index):
+        pad = max(self.hit_width, self.arrow_size) + 2.0
+        (x1, y1), (x2, y2) = self._start[index], self._end[index]
+        return QRectF(min(x1, x2) - pad, min(y1, y2) - pad, abs(x2 - x1) + 2 * pad, abs(y2 - y1) + 2 * pad)
+
+    def _updateBounds(self):
+        if not self._lines:
+            bounds = QRectF()
+        else:
+            pad = max(self.hit_width, self.arrow_size) + 2.0
+            lo = self._lo.min(axis=0) - pad
+            hi = self._hi.max(axis=0) + pad
+            bounds = QRectF(lo[0], lo[1], hi[0] - lo[0], hi[1] - lo[1])
+        if bounds != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = bounds
+
+    def _segmentsRect(self, indices):
+        """_segmentRect around several segments."""
+        pad = max(self.hit_width, self.arrow_size) + 2.0
+        lo = self._lo[indices].min(axis=0) - pad
+        hi = self._hi[indices].max(axis=0) + pad
+        return QRectF(lo[0], lo[1], hi[0] - lo[0], hi[1] - lo[1])
+
+    def _growBounds(self, rect):
+        """Grow the bounds to take in rect, without measuring every segment."""
+        bounds = rect if self._bounds.isNull() else self._bounds.united(rect)
+        if bounds != self._bounds:
+            self.prepareGeometryChange()
+            self._bounds = bounds
+
+    def _resize(self, count):
+        """Make the per-segment arrays count long, growing their buffers geometrically; new rows are unset."""
+        buffers = self._buffers
+        if count > len(buffers["_start"]):
+            capacity = max(count, 2 * len(buffers["_start"]), 16)
+            kept = min(len(self._start), count)
+            for name in PipeLayerItem._ARRAYS:
+                old = buffers[name]
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:kept] = old[:kept]
+                buffers[name] = grown
+        for name in PipeLayerItem._ARRAYS:
+            setattr(self, name, buffers[name][:count])
+
+    # -----------------
+    # Hover behaviour
+    # -----------------
+
+    def tooltipText(self, index):
+        u_id = getattr(self.upstream_items[index], "node_id", None)
+        d_id = getattr(self.downstream_items[index], "node_id", None)
+
+        lines = [f"Pipe: {self.edge_ids[index]}"]
+        if u_id is not None and d_id is not None:
+            lines.append(f"{u_id} -> {d_id}")
+        return "\n".join(lines)
+
+    def _setHovered(self, index):
+        if index == self._hovered:
+            return
+        if self._hovered >= 0:
+            self.update(self._segmentRect(self._hovered))
+        self._hovered = index
+        if index >= 0:
+            self.update(self._segmentRect(index))
+
+    def hoverMoveEvent(self, event):
+        index = self.segmentAt(event.scenePos())
+        self._setHovered(index)
+
+        if index >= 0:
+            pos = event.screenPos()
+            if hasattr(pos, "toPoint"):
+                pos = pos.toPoint()
+            else:
+                pos = QPoint(int(pos.x()), int(pos.y()))
+            QToolTip.showText(pos + QPoint(6, 6), self.tooltipText(index))
+        else:
+            QToolTip.hideText()
+        super().hoverMoveEvent(event)
+
+    def hoverEnterEvent(self, event):
+        self.hoverMoveEvent(event)
+
+    def hoverLeaveEvent(self, event):
+        self._setHovered(-1)
+        QToolTip.hideText()
+        super().hoverLeaveEvent(event)
+
+    # -----------------
+    # Public API
+    # -----------------
+
+    def updatePen(self):
+        """Rebuild the cached pens/brush; call after changing pen_colour or the widths."""
+        colour = self.pen_colour
+        if isinstance(colour, str):
+            colour = QColor(colour)
+        if colour is None:
+            colour = QColor(Qt.GlobalColor.black)
+
+        self._pen = QPen(colour)
+        self._pen.setWidth(self.base_width)
+        self._pen.setCosmetic(True)
+        self._hover_pen = QPen(self._pen)
+        self._hover_pen.setWidth(self.hover_width)
+        self._trace_pen = QPen(PipeItem.TRACE_COLOUR)
+        self._trace_pen.setWidth(PipeItem.TRACE_WIDTH)
+        self._trace_pen.setCosmetic(True)
+        self._brush = QBrush(colour)
+
+    def addSegment(self, upstream_item, downstream_item, edge_id):
+        """
+        Append one pipe to the layer.
+        Returns:
+            its LayerPipe
+        """
+        return self.addSegments([upstream_item], [downstream_item], [edge_id])[0]
+
+    def addSegments(self, upstream_items, downstream_items, edge_ids):
+        """
+        Append pipes to the layer, growing the bounds once for all of them.
+        Returns:
+            their LayerPipes
+        """
+        first = len(self.edge_ids)
+        count = len(edge_ids)
+        if count == 0:
+            return []
+        self._resize(first + count)
+        self._paintCache = None
+        added = slice(first, first + count)
+
+        for i, (upstream_item, downstream_item) in enumerate(zip(upstream_items, downstream_items), first):
+            start = PipeItem.itemCentre(upstream_item)
+            end = PipeItem.itemCentre(downstream_item)
+            self._start[i] = (start.x(), start.y())
+            self._end[i] = (end.x(), end.y())
+            self._lines.append(QLineF(start, end))
+        self._lo[added] = np.minimum(self._start[added], self._end[added])
+        self._hi[added] = np.maximum(self._start[added], self._end[added])
+        self._traced[added] = False
+        self._overlay[added] = -1
+
+        self.upstream_items.extend(upstream_items)
+        self.downstream_items.extend(downstream_items)
+        self.edge_ids.extend(edge_ids)
+        handles = [LayerPipe(self, i) for i in range(first, first + count)]
+        self._handles.extend(handles)
+        if self.segmentIndex is not None:
+            self.segmentIndex.setSegments(handles, self._start[added], self._end[added])
+
+        rect = self._segmentsRect(added)
+        self._growBounds(rect)
+        self.update(rect)
+        return handles
+
+    def removeSegment(self, index):
+        """
+        Drop one pipe; the last pipe takes its index (its LayerPipe is renumbered).
+        The bounds are left as they were: at worst a little empty space is repainted.
+        """
+        self.update(self._segmentRect(index))
+        handle = self._handles[index]
+        if self.segmentIndex is not None:
+            self.segmentIndex.remove(handle)
+
+        self._dirty.discard(index)
+        self._paintCache = None
+        last = len(self.edge_ids) - 1
+        if index != last:
+            for values in (self.upstream_items, self.downstream_items, self.edge_ids, self._lines, self._handles):
+                values[index] = values[last]
+            for name in PipeLayerItem._ARRAYS:
+                values = getattr(self, name)
+                values[index] = values[last]
+            self._handles[index].index = index
+            if last in self._dirty:
+                self._dirty.discard(last)
+                self._dirty.add(index)
+
+        if self._hovered == index:
+            self._hovered = -1
+        elif self._hovered == last:
+            self._hovered = index
+
+        for values in (self.upstream_items, self.downstream_items, self.edge_ids, self._lines, self._handles):
+            values.pop()
+        self._resize(last)
+
+    def setTraced(self, indices):
+        """Draw these segments as part of a trace (see NetworkDrawer.showTrace)."""
+        self._traced[np.asarray(indices, dtype=np.int64)] = True
+        self.update()
+
+    def clearTraced(self, indices=None):
+        """Stop drawing these segments (default: all of them) as part of a trace."""
+        if indices is None:
+            if not self._traced.any():
+                return
+            self._traced[:] = False
+        else:
+            self._traced[np.asarray(indices, dtype=np.int64)] = False
+        self.update()
+
+    def setOverlayColour(self, index, colour):
+        """
+        Draw segment index in colour instead of the layer's (see
+        PipeItem.setOverlayColour); None goes back to the layer's colour.
+        Repaints only that segment, and only if its colour changed.
+        """
+        if colour is None:
+            code = -1
+        else:
+            code = self._overlayCodes.get(colour.rgba())
+            if code is None:
+                code = len(self._overlayPens)
+                self._overlayCodes[colour.rgba()] = code
+                self._overlayPens.append(PipeItem.overlayPen(colour, self.base_width))
+        if self._overlay[index] != code:
+            self._overlay[index] = code
+            self.update(self._segmentRect(index))
+
+    def markDirty(self, index):
+        """Queue segment `index` for the next batched update (see PipeItem.flushDirty)."""
+        self._dirty.add(index)
+        if PipeItem.BATCH_UPDATES:
+            PipeItem.queueUpdate(self)
+        else:
+            self.updatePosition()
+
+    def updatePosition(self):
+        """Re-read the end points of every dirty segment from its node items."""
+        if not self._dirty:
+            return
+        indices = sorted(self._dirty)
+        self._dirty.clear()
+        self._paintCache = None
+
+        for i in indices:
+            # repaint where the segment was and where it now is
+            self.update(self._segmentRect(i))
+            start = PipeItem.itemCentre(self.upstream_items[i])
+            end = PipeItem.itemCentre(self.downstream_items[i])
+            self._start[i] = (start.x(), start.y())
+            self._end[i] = (end.x(), end.y())
+            self._lines[i] = QLineF(start, end)
+            self._lo[i] = np.minimum(self._start[i], self._end[i])
+            self._hi[i] = np.maximum(self._start[i], self._end[i])
+            if self.segmentIndex is not None:
+                self.segmentIndex.setSegment(self._handles[i], start.x(), start.y(), end.x(), end.y())
+            self.update(self._segmentRect(i))
+
+        self._updateBounds()
@@ -0,0 +1,273 @@
+import math
+
+from PyQt6 import sip
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QToolTip
+from PyQt6.QtGui import QPainter, QBrush, QPixmapCache
+from PyQt6.QtCore import Qt, QTimer, QPoint, pyqtSignal
+
+
+class SchematicView(QGraphicsView):
+    """
+    QGraphicsView tuned for large schematics.
+
+    - Mouse wheel zooms about the point under the cursor; the middle button pans.
+    - The scene's BSP index depth is sized to the item count (see bspDepth) and
+      the scene rect is fixed, so moving items doesn't keep re-growing it.
+    - Only the exposed region is repainted, and the background is cached.
+    - Antialiasing is switched off while zooming, panning or dragging, and
+      switched back on once the view has been idle for SETTLE_MS.
+    - Given a pipeIndex (SegmentIndex), pipe hover and tooltips come from the
+      nearest pipe within HOVER_PIXELS of the cursor (see hoverPipeAt).
+    - A left click on a node (pressed and released without dragging it)
+      emits nodeClicked with its ID, e.g. to trace from it; a double click
+      emits nodeActivated. A click on a pipe emits pipeClicked.
+    """
+
+    # node ID of a node clicked without being dragged
+    nodeClicked = pyqtSignal(str)
+    # node ID of a double-clicked node
+    nodeActivated = pyqtSignal(str)
+    # link ID of a clicked pipe, e.g. a collapsed chain to expand
+    pipeClicked = pyqtSignal(str)
+
+    ZOOM_STEP = 1.15
+    MIN_SCALE = 0.005
+    MAX_SCALE = 8.0
+
+    # idle time after the last interaction before antialiasing is restored
+    SETTLE_MS = 150
+
+    # target number of items per BSP leaf
+    LEAF_ITEMS = 16
+    MAX_BSP_DEPTH = 18
+
+    # blank border kept around the items, in scene units
+    SCENE_MARGIN = 500.0
+
+    # QPixmapCache budget for item caches (SvgNodeItem uses DeviceCoordinateCache);
+    # Qt's 10 MB default evicts them continually on large scenes
+    PIXMAP_CACHE_KB_PER_ITEM = 2
+    MAX_PIXMAP_CACHE_KB = 256 * 1024
+
+    # how close the cursor has to be to a pipe to hover it, in screen pixels
+    HOVER_PIXELS = 6.0
+
+    # how far the cursor can move between press and release for a click, in screen pixels
+    CLICK_PIXELS = 3
+
+    def __init__(self, scene, parent=None, pipeIndex=None):
+        self._panStart = None
+        self._settleTimer = None
+        self._hoverPipe = None
+        self._click = None  # (press position, node ID, link ID) while a click may be under way
+        self.pipeIndex = pipeIndex
+        # filled in by NetworkDrawer.buildScene, for NetworkDrawer.updateScene
+        self.pipeMode = None
+        self.nodeItems = None   # {node_id: SvgNodeItem}
+        self.pipes = None       # {link_id: PipeItem or LayerPipe}
+        self.pipeLayers = None  # {conduit type: PipeLayerItem}
+        # highlighted by NetworkDrawer.showTrace: (node ID, direction), and its PipeItems
+        self.trace = None
+        self.tracedPipes = []
+        # chains expanded by NetworkDrawer.expandChain: {chain ID: ([node IDs], [link IDs])}
+        self.expandedChains = {}
+        super().__init__(scene, parent)
+
+        self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
+        self.setCacheMode(QGraphicsView.CacheModeFlag.CacheBackground)
+        self.setBackgroundBrush(QBrush(self.palette().base()))
+        self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
+
+        self._settleTimer = QTimer(self)
+        self._settleTimer.setSingleShot(True)
+        self._settleTimer.setInterval(SchematicView.SETTLE_MS)
+        self._settleTimer.timeout.connect(self.endInteraction)
+
+        self.tuneScene()
+
+    # --------------------------
+    # Scene index
+    # --------------------------
+
+    @staticmethod
+    def bspDepth(itemCount):
+        """BSP tree depth giving roughly LEAF_ITEMS items per leaf (2^depth leaves)."""
+        leaves = max(2.0, itemCount / SchematicView.LEAF_ITEMS)
+        return min(SchematicView.MAX_BSP_DEPTH, math.ceil(math.log2(leaves)))
+
+    def tuneScene(self):
+        """Fix the scene rect, BSP depth and pixmap cache size for the items currently in the scene."""
+        scene = self.scene()
+        if scene is None:
+            return
+        margin = SchematicView.SCENE_MARGIN
+        scene.setSceneRect(scene.itemsBoundingRect().adjusted(-margin, -margin, margin, margin))
+        scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+        item_count = len(scene.items())
+        scene.setBspTreeDepth(SchematicView.bspDepth(item_count))
+
+        cache_kb = min(SchematicView.MAX_PIXMAP_CACHE_KB, item_count * SchematicView.PIXMAP_CACHE_KB_PER_ITEM)
+        if cache_kb > QPixmapCache.cacheLimit():
+            QPixmapCache.setCacheLimit(cache_kb)
+
+    # --------------------------
+    # Zoom and pan
+    # --------------------------
+
+    def currentScale(self):
+        transform = self.transform()
+        return math.hypot(transform.m11(), transform.m12())
+
+    def zoomBy(self, factor, underMouse=False):
+        """
+        Scale the view by factor, clamped to MIN_SCALE..MAX_SCALE.
+        underMouse: keep the point under the cursor fixed (wheel zoom) rather than the view centre
+        """
+        current = self.currentScale()
+        target = min(max(current * factor, SchematicView.MIN_SCALE), SchematicView.MAX_SCALE)
+        if current <= 0 or target == current:
+            return
+        self.beginInteraction()
+        if underMouse:
+            self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        else:
+            self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.scale(target / current, target / current)
+
+    def zoomToFit(self):
+        scene = self.scene()
+        if scene is not None:
+            self.fitInView(scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120.0
+        if steps == 0:
+            super().wheelEvent(event)
+            return
+        self.zoomBy(SchematicView.ZOOM_STEP ** steps, underMouse=True)
+        event.accept()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton:
+            self._panStart = event.position()
+            self.viewport().setCursor(Qt.CursorShape.ClosedHandCursor)
+            event.accept()
+            return
+        if event.button() == Qt.MouseButton.LeftButton:
+            point = event.position().toPoint()
+            item = self.itemAt(point)
+            node_id = getattr(item, "node_id", None)
+            edge_id = getattr(self.pipeAt(point) or item, "edge_id", None) if node_id is None else None
+            self._click = (event.position(), node_id, edge_id) if node_id is not None or edge_id is not None else None
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._panStart is not None:
+            delta = event.position() - self._panStart
+            self._panStart = event.position()
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - int(delta.x()))
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - int(delta.y()))
+            event.accept()
+            return
+        if event.buttons() != Qt.MouseButton.NoButton:
+            # dragging nodes or a rubber band
+            self.beginInteraction()
+        elif self.pipeIndex is not None:
+            self.hoverPipeAt(event.position().toPoint())
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton and self._panStart is not None:
+            self._panStart = None
+            self.viewport().unsetCursor()
+            event.accept()
+            return
+        click, self._click = self._click, None
+        super().mouseReleaseEvent(event)
+        if event.button() == Qt.MouseButton.LeftButton and click is not None:
+            moved = event.position() - click[0]
+            if abs(moved.x()) + abs(moved.y()) <= SchematicView.CLICK_PIXELS:
+                if click[1] is not None:
+                    self.nodeClicked.emit(str(click[1]))
+                else:
+                    self.pipeClicked.emit(str(click[2]))
+
+    def mouseDoubleClickEvent(self, event):
+        node_id = None
+        if event.button() == Qt.MouseButton.LeftButton:
+            node_id = getattr(self.itemAt(event.position().toPoint()), "node_id", None)
+        super().mouseDoubleClickEvent(event)
+        if node_id is not None:
+            self.nodeActivated.emit(str(node_id))
+
+    def leaveEvent(self, event):
+        self.setHoverPipe(None)
+        super().leaveEvent(event)
+
+    def scrollContentsBy(self, dx, dy):
+        # Qt also resets the scroll bars while the view is being destroyed
+        if sip.isdeleted(self):
+            return
+        # covers scroll bars, keyboard scrolling and middle-button panning
+        self.beginInteraction()
+        super().scrollContentsBy(dx, dy)
+
+    # --------------------------
+    # Pipe hover
+    # --------------------------
+
+    def pipeAt(self, viewPos):
+        """
+        The pipe nearest to viewPos within HOVER_PIXELS, skipping the nodes at
+        either end of it.
+        Returns:
+            PipeItem / LayerPipe, or None
+        """
+        if self.pipeIndex is None or self.currentScale() <= 0:
+            return None
+        point = self.mapToScene(viewPos)
+        pipe = self.pipeIndex.nearest(point.x(), point.y(), SchematicView.HOVER_PIXELS / self.currentScale())
+        if pipe is None:
+            return None
+        for node in (pipe.upstream_item, pipe.downstream_item):
+            if node.contains(node.mapFromScene(point)):
+                return None
+        return pipe
+
+    def setHoverPipe(self, pipe):
+        if pipe is self._hoverPipe:
+            return
+        if self._hoverPipe is not None:
+            self._hoverPipe.setHovered(False)
+        self._hoverPipe = pipe
+        if pipe is not None:
+            pipe.setHovered(True)
+
+    def hoverPipeAt(self, viewPos):
+        """Highlight the pipe under viewPos and show its tooltip."""
+        pipe = self.pipeAt(viewPos)
+        self.setHoverPipe(pipe)
+        if pipe is not None:
+            QToolTip.showText(self.viewport().mapToGlobal(viewPos) + QPoint(6, 6), pipe.tooltipText(), self.viewport())
+        elif QToolTip.isVisible():
+            QToolTip.hideText()
+
+    # --------------------------
+    # Interaction quality
+    # --------------------------
+
+    def beginInteraction(self):
+        """Drop to aliased drawing until the view has been idle for SETTLE_MS."""
+        if self._settleTimer is None:
+            return
+        if self.renderHints() & QPainter.RenderHint.Antialiasing:
+            self.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        self._settleTimer.start()
+
+    def endInteraction(self):
+        self._settleTimer.stop()
+        if not self.renderHints() & QPainter.RenderHint.Antialiasing:
+            self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+            self.viewport().update()
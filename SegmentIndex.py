@@ -0,0 +1,211 @@
+import math
+
+import numpy as np
+
+
+class SegmentIndex:
+    """
+    Uniform grid over line segments, for finding the pipe under the cursor.
+
+    Each segment is registered in the cells its line passes through, so a
+    lookup only measures the segments in the few cells around the query point,
+    however many pipes the scene holds. Keys are arbitrary hashable objects
+    (PipeItem, LayerPipe); setSegment() inserts or moves one.
+
+    The grid is built on the first lookup (or build()), in one array pass
+    over every segment registered so far. Cells are sized from the segments:
+    the median segment length, or smaller where pipes are dense enough that
+    such cells would hold more than one each on average. Until then
+    setSegment() and remove() only record the end points, so building a
+    scene pays nothing for the index; after it they update the grid in place.
+    """
+
+    # grid cell size in scene units when there are no segments to size it from
+    CELL_SIZE = 100.0
+
+    def __init__(self, cellSize=None):
+        """cellSize: fixed grid cell size; None sizes cells from the segments when the grid is built"""
+        self.cellSize = float(cellSize) if cellSize else None
+        self._segments = {}  # key -> (x1, y1, x2, y2)
+        # (cx, cy) -> set of keys once built; cells unchanged since build() are
+        # instead a range of _members, indices into _built (the keys as built)
+        self._cells = None
+        self._built = []
+        self._members = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._segments)
+
+    def __contains__(self, key):
+        return key in self._segments
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cellSize), math.floor(y / self.cellSize))
+
+    def _lineCells(self, x1, y1, x2, y2):
+        """Cells containing points sampled every half cell along the segment."""
+        dx = x2 - x1
+        dy = y2 - y1
+        # same arithmetic as build(), so both find the same cells
+        steps = max(1, math.ceil(math.sqrt(dx * dx + dy * dy) / (self.cellSize / 2.0)))
+        return {self._cell(x1 + dx * i / steps, y1 + dy * i / steps) for i in range(steps + 1)}
+
+    def _bucket(self, cell):
+        """The set of keys in cell for changing, or None; turns a cell still as build() left it into a set."""
+        bucket = self._cells.get(cell)
+        if isinstance(bucket, range):
+            bucket = self._cells[cell] = {self._built[i] for i in self._members[bucket.start:bucket.stop].tolist()}
+        return bucket
+
+    def _unlink(self, key, cells):
+        for cell in cells:
+            bucket = self._bucket(cell)
+            if bucket is None:
+                continue
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def setSegment(self, key, x1, y1, x2, y2):
+        """Insert the segment for key, or move it if already present."""
+        segment = (x1, y1, x2, y2)
+        old = self._segments.get(key)
+        self._segments[key] = segment
+        if self._cells is None or old == segment:
+            return
+        cells = self._lineCells(x1, y1, x2, y2)
+        if old is not None:
+            old_cells = self._lineCells(*old)
+            self._unlink(key, old_cells - cells)
+            cells = cells - old_cells
+        for cell in cells:
+            bucket = self._bucket(cell)
+            if bucket is None:
+                bucket = self._cells[cell] = set()
+            bucket.add(key)
+
+    def setSegments(self, keys, starts, ends):
+        """
+        setSegment for many keys at once.
+        starts, ends: (len(keys), 2) arrays of end points
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        segments = zip(starts[:, 0].tolist(), starts[:, 1].tolist(), ends[:, 0].tolist(), ends[:, 1].tolist())
+        if self._cells is None:
+            self._segments.update(zip(keys, segments))
+            return
+        for key, segment in zip(keys, segments):
+            self.setSegment(key, *segment)
+
+    def remove(self, key):
+        old = self._segments.pop(key, None)
+        if old is not None and self._cells is not None:
+            self._unlink(key, self._lineCells(*old))
+
+    def clear(self):
+        self._segments.clear()
+        self._cells = None
+        self._built = []
+        self._members = np.zeros(0, dtype=np.int64)
+
+    def build(self):
+        """Fill the grid from every segment registered so far (the first lookup does this otherwise)."""
+        keys = list(self._segments)
+        coords = np.array(list(self._segments.values()), dtype=np.float64).reshape(-1, 4)
+        x1, y1 = coords[:, 0], coords[:, 1]
+        dx = coords[:, 2] - x1
+        dy = coords[:, 3] - y1
+        lengths = np.sqrt(dx * dx + dy * dy)
+
+        if self.cellSize is None:
+            positive = lengths[lengths > 0]
+            if positive.size:
+                # about one segment per cell over the area they cover
+                xs, ys = coords[:, 0::2], coords[:, 1::2]
+                spacing = math.sqrt((xs.max() - xs.min()) * (ys.max() - ys.min()) / len(keys))
+                self.cellSize = float(np.median(positive))
+                if spacing > 0:
+                    self.cellSize = min(self.cellSize, spacing)
+            else:
+                self.cellSize = SegmentIndex.CELL_SIZE
+
+        if not keys:
+            self._cells = {}
+            self._built = []
+            self._members = np.zeros(0, dtype=np.int64)
+            return
+
+        # every sample point of every segment, as _lineCells takes them
+        steps = np.maximum(1, np.ceil(lengths / (self.cellSize / 2.0))).astype(np.int64)
+        counts = steps + 1
+        segment = np.repeat(np.arange(len(keys)), counts)
+        i = np.arange(segment.size) - np.repeat(np.cumsum(counts) - counts, counts)
+        sample_steps = steps[segment]
+
+        def sampleCells(origin, delta):
+            # origin + delta * i / steps, in place: the sample arrays are large
+            at = delta[segment]
+            at *= i
+            at /= sample_steps
+            at += origin[segment]
+            at /= self.cellSize
+            return np.floor(at, out=at).astype(np.int64)
+
+        cx = sampleCells(x1, dx)
+        cy = sampleCells(y1, dy)
+        del i, sample_steps
+
+        # group by cell, one entry per segment in it: sort (cell, segment) codes
+        x0, y0 = cx.min(), cy.min()
+        rows = int(cy.max() - y0) + 1
+        code = np.sort(((cx - x0) * rows + (cy - y0)) * len(keys) + segment)
+        code = code[np.r_[True, code[1:] != code[:-1]]]
+        cell, segment = np.divmod(code, len(keys))
+        starts = np.flatnonzero(np.r_[True, cell[1:] != cell[:-1]])
+        bounds = np.r_[starts, cell.size].tolist()
+        cx, cy = np.divmod(cell[starts], rows)
+        cx += x0
+        cy += y0
+
+        self._built = keys
+        self._members = segment
+        self._cells = {c: range(a, b) for c, a, b in zip(zip(cx.tolist(), cy.tolist()), bounds[:-1], bounds[1:])}
+
+    @staticmethod
+    def distance(x, y, x1, y1, x2, y2):
+        """Distance from (x, y) to the segment (x1, y1)-(x2, y2)."""
+        dx = x2 - x1
+        dy = y2 - y1
+        length2 = dx * dx + dy * dy
+        t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length2))
+        return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+    def nearest(self, x, y, tolerance):
+        """
+        Returns:
+            the key of the segment nearest to (x, y) within tolerance, or None
+        """
+        if self._cells is None:
+            self.build()
+        # sampled points lie within a quarter cell of the line
+        reach = math.ceil((tolerance + self.cellSize / 4.0) / self.cellSize)
+        cx, cy = self._cell(x, y)
+
+        best = None
+        best_distance = tolerance
+        seen = set()
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                bucket = self._cells.get((i, j), ())
+                if isinstance(bucket, range):
+                    bucket = [self._built[k] for k in self._members[bucket.start:bucket.stop].tolist()]
+                for key in bucket:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    d = SegmentIndex.distance(x, y, *self._segments[key])
+                    if d <= best_distance:
+                        best = key
+                        best_distance = d
+        return best
@@ -0,0 +1,214 @@
+import numpy as np
+
+
+class SourceLayout:
+    """
+    Lays a network out at the x/y coordinates of its nodes table, for the
+    "source" layout engines (see NetworkDrawer.layoutNetwork). No graph layout
+    runs, so a geo-referenced network of millions of nodes is placed in about
+    the time it takes to read it.
+
+        1. rescale so the shortest conduits (SHORT_EDGE_PERCENTILE) come out
+           SHORT_EDGE_LENGTH long, which keeps most connected symbols clear of
+           each other whatever the units
+        2. place nodes without coordinates at the mean of their placed
+           neighbours, spreading outwards along the conduits
+        3. optionally push apart symbols closer than SEPARATION, with a few
+           rounds of pairwise repulsion over a uniform grid (see separate)
+
+    Coordinates are y-up, like every other layout engine.
+    """
+
+    # this percentile of conduit lengths is SHORT_EDGE_LENGTH layout units after rescaling
+    SHORT_EDGE_PERCENTILE = 10.0
+    SHORT_EDGE_LENGTH = 48.0
+    # spacing of nodes placed in a row, in layout units (see LayeredLayout.NODE_SEP)
+    ROW_SPACING = 72.0
+    # closest two symbols may sit once separated, in layout units (node symbols are
+    # 50 scene units wide, see SvgNodeFactory.create, and NetworkDrawer.LAYOUT_SCALE)
+    SEPARATION = 40.0
+    SEPARATION_ROUNDS = 10
+    # closePairs compares this many points' neighbourhoods at a time, and gives up
+    # when that is more than MAX_CANDIDATES comparisons (thousands of stacked points)
+    QUERY_BLOCK = 100000
+    MAX_CANDIDATES = 20000000
+
+    # golden angle, for deterministic spreading directions
+    _SPREAD_ANGLE = np.pi * (3.0 - np.sqrt(5.0))
+
+    @staticmethod
+    def layout(sourcePositions, src, dst, separate=False):
+        """
+        sourcePositions: float array (n, 2), NaN rows for nodes without coordinates
+        src, dst: conduit end node indices
+        separate: push overlapping symbols apart (see separate)
+        Returns:
+            float64 array (n, 2) of (x, y)
+        """
+        coords = np.array(sourcePositions, dtype=np.float64).reshape(-1, 2)
+        n = coords.shape[0]
+        known = np.isfinite(coords).all(axis=1)
+        if not known.any():
+            raise ValueError("No node has x/y coordinates to lay out from")
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+
+        # --------------------------
+        # Rescale
+        # --------------------------
+        both = known[src] & known[dst]
+        lengths = np.hypot(*(coords[dst[both]] - coords[src[both]]).T)
+        lengths = lengths[lengths > 0]
+        factor = (SourceLayout.SHORT_EDGE_LENGTH / np.percentile(lengths, SourceLayout.SHORT_EDGE_PERCENTILE)
+                  if lengths.size else 1.0)
+        coords[known] = (coords[known] - coords[known].min(axis=0)) * factor
+
+        # --------------------------
+        # Nodes without coordinates
+        # --------------------------
+        placed = known.copy()
+        while not placed.all():
+            from_src = placed[src] & ~placed[dst]
+            from_dst = placed[dst] & ~placed[src]
+            targets = np.concatenate([dst[from_src], src[from_dst]])
+            if not targets.size:
+                break
+            neighbours = np.concatenate([src[from_src], dst[from_dst]])
+
+            counts = np.bincount(targets, minlength=n)
+            new = np.flatnonzero(counts)
+            for axis in (0, 1):
+                sums = np.bincount(targets, weights=coords[neighbours, axis], minlength=n)
+                coords[new, axis] = sums[new] / counts[new]
+            # a step off the neighbours' mean, so siblings don't stack exactly
+            angle = new * SourceLayout._SPREAD_ANGLE
+            coords[new] += SourceLayout.SEPARATION * np.column_stack([np.cos(angle), np.sin(angle)])
+            placed[new] = True
+
+        # anything unreachable from a placed node: one row under the network
+        rest = np.flatnonzero(~placed)
+        if rest.size:
+            bottom = coords[placed, 1].min() - 2 * SourceLayout.ROW_SPACING
+            coords[rest, 0] = coords[placed, 0].min() + np.arange(rest.size) * SourceLayout.ROW_SPACING
+            coords[rest, 1] = bottom
+
+        if separate:
+            coords = SourceLayout.separate(coords)
+        return coords
+
+    @staticmethod
+    def separate(coords, distance=SEPARATION, rounds=SEPARATION_ROUNDS):
+        """
+        Push apart every pair of points closer than distance, each by half the
+        shortfall along the line between them, for up to rounds rounds (or
+        until nothing overlaps). Only overlapping points move.
+        Returns:
+            new float64 array (n, 2)
+        """
+        coords = np.array(coords, dtype=np.float64).reshape(-1, 2)
+        n = coords.shape[0]
+        if n < 2:
+            return coords
+
+        # after the first round only pairs involving a point that moved can be new
+        moved = None
+        for _ in range(rounds):
+            pairs = SourceLayout.closePairs(coords, distance, moved)
+            if pairs is None:
+                print("Overlap separation stopped: too many symbols on top of each other")
+                break
+            i, j = pairs
+            if not i.size:
+                break
+
+            delta = coords[j] - coords[i]
+            length = np.hypot(delta[:, 0], delta[:, 1])
+            # aim a little past distance, or pairs settle a rounding error short of it
+            push = (distance * 1.05 - length) / 2.0
+            unit = delta / np.maximum(length, 1e-9)[:, None]
+            # points on top of each other: fan out in golden-angle steps
+            stacked = length < 1e-9
+            if stacked.any():
+                angle = (i[stacked] + j[stacked]) * SourceLayout._SPREAD_ANGLE
+                unit[stacked] = np.column_stack([np.cos(angle), np.sin(angle)])
+
+            for axis in (0, 1):
+                step = unit[:, axis] * push
+                coords[:, axis] += np.bincount(j, weights=step, minlength=n) - np.bincount(i, weights=step, minlength=n)
+            moved = np.unique(np.concatenate([i, j]))
+        return coords
+
+    @staticmethod
+    def closePairs(coords, distance, subset=None):
+        """
+        Pairs of points less than distance apart, found over a grid of
+        distance-sized cells: each point is only compared with the points in
+        its own cell and the neighbouring ones.
+        subset: only pairs with at least one point from these indices
+        Returns:
+            (i, j) index arrays with i != j, each pair once; None past MAX_CANDIDATES
+        """
+        cells = np.floor(coords / distance).astype(np.int64)
+        cells -= cells.min(axis=0)
+        # a spare row keeps the diagonal neighbours of the top row from wrapping
+        height = int(cells[:, 1].max()) + 2
+        keys = cells[:, 0] * height + cells[:, 1]
+
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+
+        if subset is None:
+            # every point: its own cell (later points only), then the four
+            # neighbours that follow it, so each pair is seen once
+            queries = np.arange(order.size)
+            offsets = (0, 1, height - 1, height, height + 1)
+        else:
+            rank = np.empty(order.size, dtype=np.int64)
+            rank[order] = np.arange(order.size)
+            queries = rank[np.asarray(subset, dtype=np.int64)]
+            offsets = (0, 1, -1, height - 1, height, height + 1, -height - 1, -height, -height + 1)
+
+        in_subset = None
+        if subset is not None:
+            in_subset = np.zeros(order.size, dtype=bool)
+            in_subset[subset] = True
+
+        found_i = []
+        found_j = []
+        for block in range(0, queries.size, SourceLayout.QUERY_BLOCK):
+            block_queries = queries[block:block + SourceLayout.QUERY_BLOCK]
+            query_keys = sorted_keys[block_queries]
+            candidates = 0
+            for offset in offsets:
+                if offset == 0 and subset is None:
+                    lo = block_queries + 1
+                    hi = np.searchsorted(sorted_keys, query_keys, side="right")
+                else:
+                    lo = np.searchsorted(sorted_keys, query_keys + offset, side="left")
+                    hi = np.searchsorted(sorted_keys, query_keys + offset, side="right")
+                counts = hi - lo
+                candidates += int(counts.sum())
+                if candidates > SourceLayout.MAX_CANDIDATES:
+                    return None
+                if not counts.any():
+                    continue
+
+                start = np.cumsum(counts) - counts
+                i = order[np.repeat(block_queries, counts)]
+                j = order[np.repeat(lo, counts) + (np.arange(i.size) - np.repeat(start, counts))]
+                keep = i != j
+                if in_subset is not None:
+                    # a pair of two subset points is found from both ends
+                    keep &= ~(in_subset[j] & (j < i))
+                i, j = i[keep], j[keep]
+
+                delta = coords[j] - coords[i]
+                close = (delta[:, 0] ** 2 + delta[:, 1] ** 2) < distance * distance
+                found_i.append(i[close])
+                found_j.append(j[close])
+
+        if not found_i:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(found_i), np.concatenate(found_j)
@@ -0,0 +1,101 @@
+import os
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+
+class SourceWatcher(QObject):
+    """
+    Watches the CSV files a schematic was built from and reports which of them
+    changed, once a burst of writes has been quiet for DEBOUNCE_MS.
+
+    Tools that save by writing a new file and renaming it over the old one
+    drop the file from QFileSystemWatcher, so each file's directory is watched
+    too and the file is picked up again when it reappears. A file that is
+    missing when the burst settles is held back until it is back.
+    """
+
+    DEBOUNCE_MS = 500
+
+    # sorted AppManager path keys ("pipePath", ...) whose files changed
+    changed = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = {}    # key -> absolute path
+        self._stats = {}    # key -> (mtime_ns, size) when last reported, or None
+        self._pending = set()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._onFileChanged)
+        self._watcher.directoryChanged.connect(self._onDirectoryChanged)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SourceWatcher.DEBOUNCE_MS)
+        self._timer.timeout.connect(self._settle)
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def setPaths(self, paths):
+        """paths: {"nodePath": str, ...} as held on AppManager; None entries are ignored"""
+        self._timer.stop()
+        self._pending.clear()
+        for watched in (self._watcher.files(), self._watcher.directories()):
+            if watched:
+                self._watcher.removePaths(watched)
+
+        self._paths = {key: os.path.abspath(path) for key, path in paths.items() if path}
+        self._stats = {key: SourceWatcher._stat(path) for key, path in self._paths.items()}
+
+        directories = {os.path.dirname(path) for path in self._paths.values()}
+        files = [path for path in self._paths.values() if os.path.isfile(path)]
+        for watched in (files, [d for d in directories if os.path.isdir(d)]):
+            if watched:
+                self._watcher.addPaths(watched)
+
+    def stop(self):
+        self.setPaths({})
+
+    def paths(self):
+        return dict(self._paths)
+
+    def _markChanged(self, path):
+        for key, watched in self._paths.items():
+            if watched == path:
+                self._pending.add(key)
+        # restart the quiet period
+        self._timer.start()
+
+    def _onFileChanged(self, path):
+        # a replaced file is no longer watched; follow the new one
+        if path not in self._watcher.files() and os.path.isfile(path):
+            self._watcher.addPath(path)
+        self._markChanged(path)
+
+    def _onDirectoryChanged(self, directory):
+        watched = set(self._watcher.files())
+        for path in self._paths.values():
+            if os.path.dirname(path) != directory or path in watched:
+                continue
+            if os.path.isfile(path):
+                self._watcher.addPath(path)
+                self._markChanged(path)
+
+    def _settle(self):
+        keys = []
+        for key in sorted(self._pending):
+            stat = SourceWatcher._stat(self._paths[key])
+            if stat is None:
+                continue  # mid-save; reported once it reappears
+            if stat != self._stats.get(key):
+                self._stats[key] = stat
+                keys.append(key)
+            self._pending.discard(key)
+        if keys:
+            self.changed.emit(keys)
@@ -1,12 +1,40 @@
+import math
 import os
+from PyQt6.QtSvg import QSvgRenderer
 from PyQt6.QtSvgWidgets import QGraphicsSvgItem
-from PyQt6.QtWidgets import QGraphicsSimpleTextItem
-from PyQt6.QtGui import QFont, QGuiApplication, QPalette
+from PyQt6.QtGui import QFont, QFontMetricsF, QGuiApplication, QPalette, QPainter, QPainterPath, QPixmap
+from PyQt6.QtCore import Qt, QRectF, QPointF
 
 
 class SvgNodeItem(QGraphicsSvgItem):
-    def __init__(self, path, node_id, node_type, tooltip_text=None):
-        super().__init__(path)
+    # Level of detail by on-screen symbol width: full vector SVG above
+    # PIXMAP_PIXELS, a cached pixmap down to DOT_PIXELS, then a plain dot
+    LEVEL_OF_DETAIL = True
+    PIXMAP_PIXELS = 24.0
+    DOT_PIXELS = 4.0
+
+    # The ID label is painted by the node at a fixed screen size, and not at
+    # all below LABEL_MIN_SCALE (screen pixels per scene unit). A child item
+    # with ItemIgnoresTransformations would do the same, but Qt can't index
+    # such items, so every repaint would test all of them.
+    LABEL_MIN_SCALE = 0.5
+    LABEL_GAP = 4.0
+
+    def __init__(self, renderer, node_id, node_type, tooltip_text=None, symbol=None):
+        # The renderer is shared across every node of the same symbol, see
+        # SvgNodeFactory.getSymbol()
+        super().__init__()
+        self.setSharedRenderer(renderer)
+        self.symbol = symbol
+        self.label = None
+        self.labelFont = None
+        self.labelColour = None
+        self._labelSize = None
+        self._labelMetrics = None
+        # second line under the label (see setAnnotation), and the width kept for it
+        self.annotation = None
+        self._annotationWidth = 0.0
+        self._bounds = None
         self.node_id = node_id
         self.node_type = node_type
         self.base_scale = 1.0
@@ -28,11 +56,113 @@ class SvgNodeItem(QGraphicsSvgItem):
         super().hoverLeaveEvent(event)
 
 
+    def setLabel(self, text, font, colour):
+        """Show `text` centred under the symbol (see LABEL_MIN_SCALE)."""
+        self.prepareGeometryChange()
+        self.label = text
+        self.labelFont = font
+        self.labelColour = colour
+        metrics = QFontMetricsF(font)
+        self._labelMetrics = metrics
+        self._labelSize = (metrics.horizontalAdvance(text), metrics.ascent(), metrics.height())
+        self._bounds = None
+
+    def setAnnotation(self, text):
+        """
+        Show text under the label, e.g. a monitor reading (see
+        TimeSeriesOverlay); None removes it. The bounds only grow when text is
+        wider than any annotation before it, so most changes just repaint
+        this item.
+        """
+        if text == self.annotation or self.label is None:
+            return
+        if text is None:
+            self.prepareGeometryChange()
+            self._annotationWidth = 0.0
+            self._bounds = None
+        else:
+            width = self._labelMetrics.horizontalAdvance(text)
+            if self.annotation is None or width > self._annotationWidth:
+                self.prepareGeometryChange()
+                self._annotationWidth = max(width, self._annotationWidth)
+                self._bounds = None
+        self.annotation = text
+        self.update()
+
+    def symbolRect(self):
+        return super().boundingRect()
+
+    def sceneCentre(self):
+        """Centre of the symbol in scene coordinates (where pipes attach)."""
+        return self.mapToScene(self.symbolRect().center())
+
+    def boundingRect(self):
+        if self._bounds is None:
+            symbol = super().boundingRect()
+            self._bounds = symbol
+            if self.label is not None and self.scale() > 0:
+                # the label is largest in item units at the smallest scale it is drawn at
+                units = 1.0 / (self.scale() * SvgNodeItem.LABEL_MIN_SCALE)
+                width, _, height = self._labelSize
+                if self.annotation is not None:
+                    width = max(width, self._annotationWidth)
+                    height *= 2
+                label = QRectF(
+                    symbol.center().x() - width * units / 2.0,
+                    symbol.bottom(),
+                    width * units,
+                    (SvgNodeItem.LABEL_GAP + height) * units,
+                )
+                self._bounds = symbol.united(label)
+        return self._bounds
+
+    def shape(self):
+        # hover/click on the symbol only, not the label area
+        path = QPainterPath()
+        path.addRect(self.symbolRect())
+        return path
+
+    def paint(self, painter, option, widget=None):
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        symbol = self.symbolRect()
+        pixels = symbol.width() * lod
+
+        if (not SvgNodeItem.LEVEL_OF_DETAIL or self.symbol is None or self.isSelected()
+                or pixels >= SvgNodeItem.PIXMAP_PIXELS):
+            super().paint(painter, option, widget)
+        elif pixels >= SvgNodeItem.DOT_PIXELS:
+            painter.drawPixmap(symbol, SvgNodeFactory.symbolPixmap(self.symbol, pixels), QRectF())
+        else:
+            painter.fillRect(symbol, SvgNodeFactory.textColour())
+
+        if self.label is None or lod <= 0:
+            return
+        if SvgNodeItem.LEVEL_OF_DETAIL and lod < SvgNodeItem.LABEL_MIN_SCALE * self.scale():
+            return
+
+        # draw in screen pixels, anchored at the middle of the symbol's bottom edge
+        width, ascent, _ = self._labelSize
+        painter.save()
+        painter.translate(symbol.center().x(), symbol.bottom())
+        painter.scale(1.0 / lod, 1.0 / lod)
+        painter.setFont(self.labelFont)
+        painter.setPen(self.labelColour)
+        painter.drawText(QPointF(-width / 2.0, SvgNodeItem.LABEL_GAP + ascent), self.label)
+        if self.annotation is not None:
+            painter.drawText(QPointF(-self._labelMetrics.horizontalAdvance(self.annotation) / 2.0,
+                                     SvgNodeItem.LABEL_GAP + ascent + self._labelSize[2]), self.annotation)
+        painter.restore()
+
     def itemChange(self, change, value):
-        # When this node moves, update any connected pipes
+        # When this node moves, queue its pipes for the next batched update
         if change == self.GraphicsItemChange.ItemPositionHasChanged:
             for pipe in self.connectedPipes:
-                pipe.updatePosition()
+                pipe.markDirty()
+        elif change == self.GraphicsItemChange.ItemScaleChange:
+            # label bounds are sized by the item scale
+            self.prepareGeometryChange()
+        elif change == self.GraphicsItemChange.ItemScaleHasChanged:
+            self._bounds = None
         return super().itemChange(change, value)
 
 
@@ -47,11 +177,22 @@ class SvgNodeFactory:
         "storage": "storage.svg",
     }
 
-    # folder containing the SVG files
-    SVG_DIR = os.path.join("shapes")
+    # folder containing the SVG files, next to this module so any working directory finds them
+    SVG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shapes")
+
+    # Process-wide symbol cache, keyed by SVG filename:
+    #   { svg_file: {"renderer": QSvgRenderer, "bounds": QRectF, "metrics": {width: (scale, w, h)},
+    #                "pixmaps": {pixel_width: QPixmap}} }
+    # Each SVG is parsed once and its renderer shared by every SvgNodeItem using it.
+    _symbols = {}
+    _textColour = None
+    _labelFont = None
+    cacheHits = 0
+    cacheMisses = 0
 
     @staticmethod
-    def create(node_id, node_type, x, y, width=50, tooltip_text=None):
+    def symbolFile(node_type):
+        """Return the SVG filename used to draw a node of the given type."""
         key = node_type
         if isinstance(key, str):
             key = key.strip().lower()
@@ -66,45 +207,118 @@ class SvgNodeFactory:
         if svg_file is None:
             # Fallback to manhole symbol if unknown
             svg_file = SvgNodeFactory.SVG_MAP.get("manhole", "flowMonitor.svg")
+        return svg_file
+
+    @staticmethod
+    def getSymbol(svg_file):
+        """Return the cached symbol entry for an SVG file, parsing it on first use."""
+        symbol = SvgNodeFactory._symbols.get(svg_file)
+        if symbol is not None:
+            SvgNodeFactory.cacheHits += 1
+            return symbol
+
+        SvgNodeFactory.cacheMisses += 1
+        renderer = QSvgRenderer(os.path.join(SvgNodeFactory.SVG_DIR, svg_file))
+        symbol = {
+            "renderer": renderer,
+            "bounds": renderer.viewBoxF(),
+            "metrics": {},
+            "pixmaps": {},
+        }
+        SvgNodeFactory._symbols[svg_file] = symbol
+        return symbol
 
-        path = os.path.join(SvgNodeFactory.SVG_DIR, svg_file)
-        item = SvgNodeItem(path, node_id=node_id, node_type=node_type, tooltip_text=tooltip_text)
+    @staticmethod
+    def symbolMetrics(symbol, width):
+        """Return (scale, scaled_width, scaled_height) for a symbol drawn at `width`."""
+        metrics = symbol["metrics"].get(width)
+        if metrics is None:
+            bounds = symbol["bounds"]
+            scale = 1.0 if bounds.width() == 0 else (float(width) / bounds.width())
+            metrics = (scale, bounds.width() * scale, bounds.height() * scale)
+            symbol["metrics"][width] = metrics
+        return metrics
+
+    @staticmethod
+    def symbolPixmap(symbol, pixels):
+        """
+        Return the symbol pre-rendered at roughly `pixels` wide, for the
+        zoomed out level of detail. Widths are rounded up to a power of two so
+        a handful of pixmaps serve every zoom level.
+        """
+        size = 1 << max(3, math.ceil(math.log2(max(pixels, 1.0))))
+        pixmap = symbol["pixmaps"].get(size)
+        if pixmap is None:
+            bounds = symbol["bounds"]
+            height = max(1, round(size * bounds.height() / bounds.width())) if bounds.width() else size
+            pixmap = QPixmap(size, height)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+            symbol["renderer"].render(painter, QRectF(0, 0, size, height))
+            painter.end()
+            symbol["pixmaps"][size] = pixmap
+        return pixmap
+
+    @staticmethod
+    def labelFont():
+        if SvgNodeFactory._labelFont is None:
+            font = QFont("Fira Code", 12)
+            font.setBold(True)
+            SvgNodeFactory._labelFont = font
+        return SvgNodeFactory._labelFont
+
+    @staticmethod
+    def textColour():
+        # theme-aware; used for labels and zoomed out dots
+        if SvgNodeFactory._textColour is None:
+            SvgNodeFactory._textColour = QGuiApplication.palette().color(QPalette.ColorRole.WindowText)
+        return SvgNodeFactory._textColour
 
-        bounds = item.renderer().viewBoxF()
-        scale = 1.0 if bounds.width() == 0 else (float(width) / bounds.width())
+    @staticmethod
+    def cacheStats():
+        """
+        Returns:
+            {"hits": int, "misses": int, "symbols": int}
+        """
+        return {
+            "hits": SvgNodeFactory.cacheHits,
+            "misses": SvgNodeFactory.cacheMisses,
+            "symbols": len(SvgNodeFactory._symbols),
+        }
+
+    @staticmethod
+    def clearCache():
+        """Drop every cached renderer (e.g. after the SVG files change on disk)."""
+        SvgNodeFactory._symbols.clear()
+        SvgNodeFactory._textColour = None
+        SvgNodeFactory._labelFont = None
+        SvgNodeFactory.cacheHits = 0
+        SvgNodeFactory.cacheMisses = 0
+
+    @staticmethod
+    def create(node_id, node_type, x, y, width=50, tooltip_text=None):
+        symbol = SvgNodeFactory.getSymbol(SvgNodeFactory.symbolFile(node_type))
+        scale, scaled_width, scaled_height = SvgNodeFactory.symbolMetrics(symbol, width)
+
+        item = SvgNodeItem(symbol["renderer"], node_id=node_id, node_type=node_type, tooltip_text=tooltip_text,
+                           symbol=symbol)
         item.setScale(scale)
         item.base_scale = scale
+        # repaints (pans, drags of other items) blit a cached pixmap instead of
+        # re-rendering the SVG; the cache is redrawn when the zoom changes
+        item.setCacheMode(item.CacheMode.DeviceCoordinateCache)
 
         # --------------------------
-        # Attach ID label under symbol (child of SVG)
+        # ID label under the symbol, in the theme-aware text colour
+        # (follows OS light/dark mode)
         # --------------------------
-        label = QGraphicsSimpleTextItem(str(node_id), item)
-        label.setFlag(label.GraphicsItemFlag.ItemIgnoresTransformations, True)
-
-        font = QFont("Fira Code", 12)
-        font.setBold(True)
-        label.setFont(font)
-
-        # Theme-aware label colour (follows OS light/dark mode)
-        try:
-            label_colour = QGuiApplication.palette().color(QPalette.ColorRole.WindowText)
-            label.setBrush(label_colour)
-        except Exception:
-            pass
-
-        # centre label horizontally under the SVG
-        svg_bounds = item.boundingRect()
-        text_bounds = label.boundingRect()
-
-        label.setPos(
-            svg_bounds.width() / 2.0 - text_bounds.width() / 2.0,
-            svg_bounds.height() + 4.0,
-        )
+        item.setLabel(str(node_id), SvgNodeFactory.labelFont(), SvgNodeFactory.textColour())
 
         # centre the SVG at (x, y)
         item.setPos(
-            float(x) - (bounds.width() * scale) / 2.0,
-            float(y) - (bounds.height() * scale) / 2.0,
+            float(x) - scaled_width / 2.0,
+            float(y) - scaled_height / 2.0,
         )
 
-        return item
\ No newline at end of file
+        return item
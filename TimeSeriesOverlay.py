@@ -0,0 +1,155 @@
+import numpy as np
+from PyQt6 import sip
+from PyQt6.QtGui import QColor
+
+
+class TimeSeriesOverlay:
+    """
+    Shows one quantity of a TimeSeriesStore on a SchematicView at one row
+    (time) at a time: each monitor's reading is written under its node (see
+    SvgNodeItem.setAnnotation), and the conduits leaving it are coloured on a
+    blue (low) to red (high) ramp over the quantity's range.
+
+    Only a window of rows around the current one is decoded from the store,
+    for just the monitors drawn in the view; moving outside it decodes the
+    next window. Monitors logging out of step with each other keep their
+    last reading on the rows between theirs (see TimeSeriesStore.window),
+    so nothing blinks off between readings. Items are only touched when
+    what they show changes: readings are compared at the precision they are
+    written with, colours by ramp step.
+    """
+
+    # rows decoded at a time: a day of 2-minute readings
+    WINDOW_ROWS = 720
+    # distinct colours on the ramp
+    RAMP_STEPS = 16
+    # significant figures readings are shown (and compared) at
+    DIGITS = 3
+
+    def __init__(self, store, quantity=None):
+        """quantity: one of store.quantities (default: the first)"""
+        self.store = store
+        self.quantity = quantity or store.quantities[0]
+        self.row = 0
+        self.view = None
+        self.ramp = [QColor.fromHsvF(0.66 * (1.0 - step / (TimeSeriesOverlay.RAMP_STEPS - 1)), 0.9, 0.85)
+                     for step in range(TimeSeriesOverlay.RAMP_STEPS)]
+
+        # drawn monitors: store column, node item, conduits leaving it
+        self.columns = np.zeros(0, dtype=np.int64)
+        self.items = []
+        self.pipes = []
+        self._window = None  # (first row, decoded rows)
+        self._shown = None   # readings on screen, rounded to DIGITS
+        self._steps = None   # ramp step of each, -1 for none
+
+    # --------------------------
+    # Attaching to a view
+    # --------------------------
+
+    def attach(self, view):
+        """Show the current row on view (built by NetworkDrawer.buildScene), leaving any view before it."""
+        self.detach()
+        columns = []
+        for node_id, column in self.store.monitorIndex.items():
+            item = view.nodeItems.get(node_id)
+            if item is None:
+                continue
+            columns.append(column)
+            self.items.append(item)
+            self.pipes.append([pipe for pipe in item.connectedPipes if pipe.upstream_item is item])
+        self.view = view
+        self.columns = np.asarray(columns, dtype=np.int64)
+        self.setRow(self.row)
+
+    def detach(self):
+        """Put every item back as it was drawn."""
+        for item, pipes in zip(self.items, self.pipes):
+            # the scene may have been rebuilt or torn down since
+            if sip.isdeleted(item):
+                continue
+            item.setAnnotation(None)
+            for pipe in pipes:
+                if not sip.isdeleted(getattr(pipe, "layer", pipe)):
+                    pipe.setOverlayColour(None)
+        self.view = None
+        self.items = []
+        self.pipes = []
+        self.columns = np.zeros(0, dtype=np.int64)
+        self._window = None
+        self._shown = None
+        self._steps = None
+
+    # --------------------------
+    # Playback
+    # --------------------------
+
+    def setQuantity(self, quantity):
+        if quantity == self.quantity:
+            return
+        self.quantity = quantity
+        self._window = None
+        self._shown = None
+        self._steps = None
+        if self.view is not None:
+            self.setRow(self.row)
+
+    def readings(self, row):
+        """The drawn monitors' readings at row, decoding a new window when row is outside the current one."""
+        window = self._window
+        if window is None or not window[0] <= row < window[0] + len(window[1]):
+            start = max(0, row - TimeSeriesOverlay.WINDOW_ROWS // 4)
+            window = (start, self.store.window(self.quantity, start, start + TimeSeriesOverlay.WINDOW_ROWS,
+                                               self.columns))
+            self._window = window
+        return window[1][row - window[0]]
+
+    def setRow(self, row):
+        """
+        Show the readings at row.
+        Returns:
+            number of monitors whose reading changed on screen
+        """
+        self.row = min(max(int(row), 0), max(self.store.rowCount - 1, 0))
+        if self.view is None or not self.items or not self.store.rowCount:
+            return 0
+
+        values = self.readings(self.row).astype(np.float64)
+        shown = TimeSeriesOverlay.rounded(values)
+        steps = self.rampSteps(values)
+        if self._shown is None:
+            changed = np.arange(len(self.items))
+        else:
+            same = (shown == self._shown) | (np.isnan(shown) & np.isnan(self._shown))
+            changed = np.flatnonzero(~same | (steps != self._steps))
+        self._shown = shown
+        self._steps = steps
+
+        quantity = self.quantity
+        for i, value, step in zip(changed.tolist(), shown[changed].tolist(), steps[changed].tolist()):
+            text = f"{quantity}: {value:.{TimeSeriesOverlay.DIGITS}g}" if not np.isnan(value) else None
+            self.items[i].setAnnotation(text)
+            colour = self.ramp[step] if step >= 0 else None
+            for pipe in self.pipes[i]:
+                pipe.setOverlayColour(colour)
+        return changed.size
+
+    @staticmethod
+    def rounded(values):
+        """values rounded to DIGITS significant figures; NaN stays NaN."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = 10.0 ** (TimeSeriesOverlay.DIGITS - 1 - np.floor(np.log10(np.abs(values))))
+            return np.where(values == 0, 0.0, np.round(values * scale) / scale)
+
+    def rampSteps(self, values):
+        """Ramp step of each value over the quantity's range; -1 for NaN."""
+        steps = np.full(values.size, -1, dtype=np.int64)
+        value_range = self.store.ranges.get(self.quantity)
+        if value_range is None:
+            return steps
+        low, high = value_range
+        known = ~np.isnan(values)
+        fraction = (values[known] - low) / (high - low) if high > low else np.zeros(int(known.sum()))
+        steps[known] = np.clip(np.round(fraction * (TimeSeriesOverlay.RAMP_STEPS - 1)),
+                               0, TimeSeriesOverlay.RAMP_STEPS - 1).astype(np.int64)
+        return steps
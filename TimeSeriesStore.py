@@ -0,0 +1,317 @@
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime
+
+import numpy as np
+
+from ColumnarCsv import ColumnarCsv
+from NetworkSnapshot import NetworkSnapshot
+
+
+class TimeSeriesStore:
+    """
+    Monitor time series (flow, depth, ...) in a single memory-mapped file,
+    for animating the schematic over time (see TimeSeriesOverlay).
+
+    Layout, as NetworkSnapshot:
+        MAGIC (8 bytes) | version, header length (2 x uint32 LE) | JSON header |
+        array blobs, each starting on an ALIGN-byte boundary
+
+    Every monitor shares one time axis ("times", int64 seconds since the
+    epoch, ascending). Each quantity is a float32 (time, monitor) matrix with
+    NaN where a monitor has no reading, stored time-major: a window of time
+    is one contiguous run of the file, so only the pages under it are read.
+    The header also holds each quantity's range, so opening a store reads
+    no values at all.
+
+    Loggers are rarely in step, so the shared axis has rows where only some
+    monitors read; window carries each monitor's last reading forward over
+    them, for up to HOLD_SECONDS.
+
+    Built from a long-format CSV with columns "Node ID", "Time" and one
+    column per quantity. Times are ISO 8601 or day-first (see TIME_FORMATS).
+    """
+
+    MAGIC = b"FMSERIES"
+    VERSION = 1
+    ALIGN = 64
+    EXTENSION = ".fmseries"
+
+    STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fm-schematic-automation", "series")
+
+    ID_COLUMN = "Node ID"
+    TIME_COLUMN = "Time"
+    # tried in order for times that aren't ISO 8601
+    TIME_FORMATS = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+
+    # how long a reading stands for its monitor when later rows have none
+    HOLD_SECONDS = 15 * 60
+
+    # rows of NaN written per step when a new store is cleared
+    CLEAR_ROWS = 4096
+    # header bytes kept free for the ranges, written once every value is in
+    HEADER_SLACK = 256
+
+    def __init__(self, path, header, mapped, dataStart):
+        self.path = path
+        self.header = header
+        self.monitorIds = header["monitorIds"]
+        self.monitorIndex = {node_id: i for i, node_id in enumerate(self.monitorIds)}
+        self.quantities = header["quantities"]
+        # quantity -> (min, max) over every reading, or None if it has none
+        self.ranges = {q: tuple(r) if r is not None else None for q, r in header["ranges"].items()}
+
+        def array(name):
+            spec = header["arrays"][name]
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            return np.frombuffer(mapped, dtype=np.dtype(spec["dtype"]), count=count,
+                                 offset=dataStart + spec["offset"]).reshape(spec["shape"])
+
+        self.times = array("times")
+        self.values = {q: array(q) for q in self.quantities}
+
+    # --------------------------
+    # Sizes and lookups
+    # --------------------------
+
+    @property
+    def rowCount(self):
+        return self.times.size
+
+    @property
+    def monitorCount(self):
+        return len(self.monitorIds)
+
+    def rowAt(self, timestamp):
+        """Row of the last reading at or before timestamp (seconds), clamped to the series."""
+        row = int(np.searchsorted(self.times, timestamp, side="right")) - 1
+        return min(max(row, 0), max(self.rowCount - 1, 0))
+
+    def timeText(self, row):
+        return str(self.times[row].astype("datetime64[s]")).replace("T", " ")
+
+    def window(self, quantity, start, stop, columns=None, hold=HOLD_SECONDS):
+        """
+        Decode rows start:stop of quantity, only for the given monitors. Each
+        row holds every monitor's last reading at or before its time, NaN if
+        that is more than hold seconds old.
+        columns: monitor indices (see monitorIndex); None for every monitor
+        hold: seconds a reading is carried forward; 0 for the raw readings
+        Returns:
+            float32 array (rows, monitors), a copy independent of the file
+        """
+        start = max(0, start)
+        stop = min(self.rowCount, stop)
+        if start >= stop or hold <= 0:
+            block = self.values[quantity][start:stop]
+            return block[:, columns] if columns is not None else np.array(block)
+
+        # the readings that can still stand at start are decoded with the window
+        first = int(np.searchsorted(self.times, self.times[start] - hold, side="left"))
+        block = self.values[quantity][first:stop]
+        block = block[:, columns] if columns is not None else np.array(block)
+
+        # row of each monitor's last reading so far, -1 before its first
+        latest = np.where(np.isfinite(block), np.arange(block.shape[0])[:, None], -1)
+        np.maximum.accumulate(latest, axis=0, out=latest)
+        latest = latest[start - first:]
+        times = self.times[first:stop]
+        held = (latest >= 0) & (times[start - first:, None] - times[latest] <= hold)
+        filled = np.take_along_axis(block, np.maximum(latest, 0), axis=0)
+        return np.where(held, filled, np.float32(np.nan)).astype(np.float32, copy=False)
+
+    # --------------------------
+    # Open / build
+    # --------------------------
+
+    @staticmethod
+    def autoPath(csvPath):
+        """Default store location for a time series CSV."""
+        digest = hashlib.sha256(os.path.abspath(csvPath).encode()).hexdigest()[:32]
+        return os.path.join(TimeSeriesStore.STORE_DIR, digest + TimeSeriesStore.EXTENSION)
+
+    @staticmethod
+    def readHeader(path):
+        """Returns (header dict, byte offset of the array data)."""
+        with open(path, "rb") as f:
+            if f.read(len(TimeSeriesStore.MAGIC)) != TimeSeriesStore.MAGIC:
+                raise ValueError(f"{path} is not a time series store")
+            version, header_len = struct.unpack("<II", f.read(8))
+            if version != TimeSeriesStore.VERSION:
+                raise ValueError(f"{path}: unsupported time series store version {version}")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+
+        prefix_len = len(TimeSeriesStore.MAGIC) + 8 + header_len
+        return header, -(-prefix_len // TimeSeriesStore.ALIGN) * TimeSeriesStore.ALIGN
+
+    @staticmethod
+    def open(path):
+        """Map a store written by build; nothing is read until it is used."""
+        header, data_start = TimeSeriesStore.readHeader(path)
+        return TimeSeriesStore(path, header, np.memmap(path, dtype=np.uint8, mode="r"), data_start)
+
+    @staticmethod
+    def openOrBuild(csvPath, progress=None, isCancelled=None):
+        """
+        Open the store built from csvPath (see autoPath), building it first if
+        there is none or the CSV has changed since.
+        Returns:
+            TimeSeriesStore, or None if cancelled
+        """
+        path = TimeSeriesStore.autoPath(csvPath)
+        if os.path.isfile(path):
+            try:
+                header, _ = TimeSeriesStore.readHeader(path)
+                if not NetworkSnapshot.sourcesChanged(header["sources"], {"series": csvPath}):
+                    return TimeSeriesStore.open(path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Rebuilding unreadable time series store {path}: {e}")
+        if not TimeSeriesStore.build(csvPath, path, progress, isCancelled):
+            return None
+        return TimeSeriesStore.open(path)
+
+    @staticmethod
+    def parseTimes(values):
+        """Time strings -> int64 seconds since the epoch."""
+        try:
+            return np.array(values, dtype="datetime64[s]").astype(np.int64)
+        except ValueError:
+            pass
+        for fmt in TimeSeriesStore.TIME_FORMATS:
+            try:
+                parsed = [datetime.strptime(value.strip(), fmt) for value in values]
+            except ValueError:
+                continue
+            return np.array(parsed, dtype="datetime64[s]").astype(np.int64)
+        raise ValueError(f"Unrecognised time format, e.g. '{values[0] if values else ''}'")
+
+    @staticmethod
+    def parseValues(values):
+        """Number strings -> float32, NaN for blanks."""
+        return np.array([value if value.strip() else "nan" for value in values], dtype=np.float32)
+
+    @staticmethod
+    def build(csvPath, path, progress=None, isCancelled=None):
+        """
+        Write the store for csvPath to path, reading the CSV twice a block at
+        a time (see ColumnarCsv.iterColumns), so neither it nor the store has
+        to fit in memory: once for the monitors and time axis, once for the
+        values.
+        progress: optional callback receiving the completed fraction (0.0 - 1.0)
+        isCancelled: optional callable; when it returns True the build stops
+        Returns:
+            True, or False if cancelled
+        """
+        columns = [name.strip() for name in ColumnarCsv.readHeader(csvPath) if name and name.strip()]
+        for column in (TimeSeriesStore.ID_COLUMN, TimeSeriesStore.TIME_COLUMN):
+            if column not in columns:
+                raise KeyError(column)
+        quantities = [c for c in columns if c not in (TimeSeriesStore.ID_COLUMN, TimeSeriesStore.TIME_COLUMN)]
+        if not quantities:
+            raise ValueError(f"{csvPath} has no value columns besides {TimeSeriesStore.ID_COLUMN} and "
+                             f"{TimeSeriesStore.TIME_COLUMN}")
+        size = max(1, os.path.getsize(csvPath))
+        sources = NetworkSnapshot.fingerprint({"series": csvPath})
+
+        def report(fraction):
+            if isCancelled is not None and isCancelled():
+                return False
+            if progress is not None:
+                progress(fraction)
+            return True
+
+        # --------------------------
+        # Pass 1: monitors and the time axis
+        # --------------------------
+        monitor_index = {}
+        times = np.zeros(0, dtype=np.int64)
+        rows = 0
+        for block in ColumnarCsv.iterColumns(csvPath, [TimeSeriesStore.ID_COLUMN, TimeSeriesStore.TIME_COLUMN]):
+            for node_id in block[TimeSeriesStore.ID_COLUMN]:
+                node_id = node_id.strip()
+                if node_id not in monitor_index:
+                    monitor_index[node_id] = len(monitor_index)
+            times = np.union1d(times, TimeSeriesStore.parseTimes(block[TimeSeriesStore.TIME_COLUMN]))
+            rows += len(block[TimeSeriesStore.TIME_COLUMN])
+            # the second pass reads the whole file again; count this one as a tenth
+            if not report(0.1 * min(1.0, rows * 32 / size)):
+                return False
+
+        # --------------------------
+        # Layout: times, then one (time, monitor) matrix per quantity
+        # --------------------------
+        shape = [int(times.size), len(monitor_index)]
+        arrays = {"times": {"dtype": np.dtype(np.int64).str, "shape": [shape[0]], "offset": 0}}
+        offset = times.nbytes
+        for q in quantities:
+            offset = -(-offset // TimeSeriesStore.ALIGN) * TimeSeriesStore.ALIGN
+            arrays[q] = {"dtype": np.dtype(np.float32).str, "shape": shape, "offset": offset}
+            offset += shape[0] * shape[1] * 4
+
+        header = {
+            "version": TimeSeriesStore.VERSION,
+            "sources": sources,
+            "monitorIds": list(monitor_index),
+            "quantities": quantities,
+            "ranges": {q: None for q in quantities},
+            "arrays": arrays,
+        }
+        header_len = len(json.dumps(header).encode("utf-8")) + TimeSeriesStore.HEADER_SLACK * len(quantities)
+        prefix_len = len(TimeSeriesStore.MAGIC) + 8 + header_len
+        data_start = -(-prefix_len // TimeSeriesStore.ALIGN) * TimeSeriesStore.ALIGN
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.truncate(data_start + offset)
+
+            mapped = np.memmap(tmp_path, dtype=np.uint8, mode="r+")
+            np.frombuffer(mapped, dtype=np.int64, count=times.size, offset=data_start)[:] = times
+            values = {}
+            for q in quantities:
+                values[q] = np.frombuffer(mapped, dtype=np.float32, count=shape[0] * shape[1],
+                                          offset=data_start + arrays[q]["offset"]).reshape(shape)
+                for start in range(0, shape[0], TimeSeriesStore.CLEAR_ROWS):
+                    values[q][start:start + TimeSeriesStore.CLEAR_ROWS] = np.nan
+
+            # --------------------------
+            # Pass 2: values
+            # --------------------------
+            low = {q: np.inf for q in quantities}
+            high = {q: -np.inf for q in quantities}
+            done = 0
+            for block in ColumnarCsv.iterColumns(csvPath, [TimeSeriesStore.ID_COLUMN, TimeSeriesStore.TIME_COLUMN]
+                                                 + quantities):
+                row = np.searchsorted(times, TimeSeriesStore.parseTimes(block[TimeSeriesStore.TIME_COLUMN]))
+                column = np.fromiter((monitor_index[node_id.strip()] for node_id in block[TimeSeriesStore.ID_COLUMN]),
+                                     dtype=np.int64, count=row.size)
+                for q in quantities:
+                    parsed = TimeSeriesStore.parseValues(block[q])
+                    values[q][row, column] = parsed
+                    finite = parsed[np.isfinite(parsed)]
+                    if finite.size:
+                        low[q] = min(low[q], float(finite.min()))
+                        high[q] = max(high[q], float(finite.max()))
+                done += row.size
+                if not report(0.1 + 0.9 * min(1.0, done / max(rows, 1))):
+                    return False
+            mapped.flush()
+            del values, mapped
+
+            header["ranges"] = {q: [low[q], high[q]] if low[q] <= high[q] else None for q in quantities}
+            encoded = json.dumps(header).encode("utf-8")
+            if len(encoded) > header_len:
+                raise ValueError(f"{path}: time series header outgrew the space kept for it")
+            with open(tmp_path, "r+b") as f:
+                f.write(TimeSeriesStore.MAGIC + struct.pack("<II", TimeSeriesStore.VERSION, header_len))
+                # JSON ignores the trailing blanks
+                f.write(encoded.ljust(header_len))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        report(1.0)
+        return True
@@ -0,0 +1,79 @@
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QSlider, QLabel, QPushButton, QComboBox
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+
+
+class TimeSlider(QWidget):
+    """
+    Time slider for a TimeSeriesStore: scrub or play through its rows,
+    pick the quantity shown. Emits rowChanged for every row it lands on,
+    including each step of playback.
+    """
+
+    # time between playback steps
+    PLAY_INTERVAL_MS = 100
+    # (rows per playback step, speed menu entry)
+    SPEEDS = ((1, "1 step"), (5, "5 steps"), (30, "30 steps"), (180, "180 steps"))
+
+    rowChanged = pyqtSignal(int)
+    quantityChanged = pyqtSignal(str)
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+        self.quantityBox = QComboBox()
+        self.quantityBox.addItems(store.quantities)
+        self.quantityBox.currentTextChanged.connect(self.quantityChanged)
+
+        self.playButton = QPushButton("Play")
+        self.playButton.setCheckable(True)
+        self.playButton.toggled.connect(self.setPlaying)
+
+        self.speedBox = QComboBox()
+        for rows, label in TimeSlider.SPEEDS:
+            self.speedBox.addItem(label, rows)
+
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(0, max(store.rowCount - 1, 0))
+        self.slider.valueChanged.connect(self.onSliderMoved)
+
+        self.timeLabel = QLabel()
+        self.timeLabel.setMinimumWidth(self.timeLabel.fontMetrics().horizontalAdvance("0000-00-00 00:00:00 "))
+
+        layout = QHBoxLayout(self)
+        layout.addWidget(self.quantityBox)
+        layout.addWidget(self.playButton)
+        layout.addWidget(self.speedBox)
+        layout.addWidget(self.slider, 1)
+        layout.addWidget(self.timeLabel)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(TimeSlider.PLAY_INTERVAL_MS)
+        self.timer.timeout.connect(self.step)
+        self.updateLabel(0)
+
+    @property
+    def row(self):
+        return self.slider.value()
+
+    def updateLabel(self, row):
+        self.timeLabel.setText(self.store.timeText(row) if self.store.rowCount else "")
+
+    def onSliderMoved(self, row):
+        self.updateLabel(row)
+        self.rowChanged.emit(row)
+
+    def setPlaying(self, playing):
+        if playing:
+            if self.row >= self.slider.maximum():
+                self.slider.setValue(0)
+            self.timer.start()
+        else:
+            self.timer.stop()
+        self.playButton.setText("Pause" if playing else "Play")
+
+    def step(self):
+        row = min(self.row + self.speedBox.currentData(), self.slider.maximum())
+        self.slider.setValue(row)
+        if row >= self.slider.maximum():
+            self.playButton.setChecked(False)
@@ -1,7 +1,10 @@
 import sys
 from PyQt6.QtWidgets import QApplication, QMainWindow
+from PyQt6.QtCore import QThread
 from mainwindow.MainWindow import MainWindow
-from NetworkGenerator import NetworkGenerator
+from GraphBuildWorker import GraphBuildWorker
+from NetworkSnapshot import NetworkSnapshot
+from SourceWatcher import SourceWatcher
 import os
 
 class AppManager:
@@ -16,30 +19,181 @@ class AppManager:
     sluicePath = None
     weirPath = None
 
+    PATH_KEYS = ("nodePath", "monitorsPath", "pipePath", "userControlPath", "flumePath",
+                 "flapValvePath", "orficePath", "pumpPath", "sluicePath", "weirPath")
 
-    def createGraph(self):
-        nodes = NetworkGenerator.loadNodes(appManager.nodePath)
-        monitors = NetworkGenerator.loadMonitors(appManager.monitorsPath)
+    buildThread = None
+    buildWorker = None
+    # True while the running build is a background refresh (no progress dialog)
+    buildQuiet = False
 
-        #load in conduits:
-        links = NetworkGenerator.loadEdges(appManager.pipePath)
-        userControls = NetworkGenerator.loadEdges(appManager.userControlPath)
-        flumes = NetworkGenerator.loadEdges(appManager.flumePath)
-        flapValves = NetworkGenerator.loadEdges(appManager.flapValvePath)
-        orfices = NetworkGenerator.loadEdges(appManager.orficePath)
-        pumps = NetworkGenerator.loadEdges(appManager.pumpPath)
-        sluices = NetworkGenerator.loadEdges(appManager.sluicePath)
-        weirs = NetworkGenerator.loadEdges(appManager.weirPath)
+    # Live refresh: rebuild in place when a source CSV changes on disk. The
+    # parsed datasets are kept so only the changed file is read again, which
+    # costs their memory for the whole session; with it off (the default)
+    # builds stream the CSVs into the model instead (see NetworkGenerator.streamModel).
+    liveRefresh = False
+    sourceWatcher = None
+    datasets = None
+    pendingRefresh = None
 
-        conduits = NetworkGenerator.generateConduits(links,userControls,flumes,flapValves,orfices,pumps,sluices,weirs)
+    # one of NetworkDrawer.LAYOUT_ENGINES
+    layoutEngine = "layered"
+    # show one monitor sub-catchment at a time, each built when first shown (see CatchmentView)
+    partitioned = False
+    # contract runs of plain manholes into single conduits, expanded on click (see ChainCollapse)
+    collapseChains = False
 
-        window.drawGraph(conduits, nodes, monitors)
 
+    def paths(self):
+        return {key: getattr(self, key) for key in AppManager.PATH_KEYS}
 
-appManager = AppManager()
-app = QApplication(sys.argv)
+    def createGraph(self, previous=None, reloadKeys=None):
+        # Load, merge and layout run on a worker thread; the scene is built on
+        # the GUI thread once the worker hands the result back.
+        # previous: the model on screen, to update its scene in place (see reloadGraph)
+        # reloadKeys: background refresh of just these files (see refreshGraph)
+        if self.buildThread is not None:
+            return
 
-#Instantiates a window
-window = MainWindow(appManager)
-window.show()
-sys.exit(app.exec())
\ No newline at end of file
+        quiet = reloadKeys is not None
+        paths = self.paths()
+        worker = GraphBuildWorker(
+            paths,
+            engine=self.layoutEngine,
+            # a partitioned build lays nothing out, so there is nothing to snapshot, and a
+            # collapsed one would snapshot a model the chains can't be expanded from
+            snapshotPath=None if quiet or self.partitioned or self.collapseChains
+            else NetworkSnapshot.autoPath(paths, self.layoutEngine),
+            previous=previous,
+            datasets=self.datasets if quiet else None,
+            reloadKeys=reloadKeys,
+            keepDatasets=self.liveRefresh,
+            partitioned=self.partitioned,
+            collapseChains=self.collapseChains,
+        )
+        thread = QThread()
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        worker.progress.connect(window.showBuildProgress)
+        worker.finished.connect(self.onGraphBuilt)
+        worker.failed.connect(self.onGraphFailed)
+        worker.cancelled.connect(self.onGraphCancelled)
+        for signal in (worker.finished, worker.failed, worker.cancelled):
+            signal.connect(thread.quit)
+        thread.finished.connect(self.onBuildThreadFinished)
+
+        self.buildThread = thread
+        self.buildWorker = worker
+        self.buildQuiet = quiet
+        if not quiet:
+            window.startBuildProgress(self.cancelGraph)
+        thread.start()
+
+    def reloadGraph(self):
+        # Re-read the CSVs and apply only what changed to the schematic on screen
+        self.createGraph(previous=window.currentModel)
+
+    def refreshGraph(self, keys):
+        # SourceWatcher.changed: re-parse only these files and update the schematic in place
+        if window.currentModel is None:
+            return
+        if self.buildThread is not None:
+            # picked up when the running build finishes
+            self.pendingRefresh = (self.pendingRefresh or set()) | set(keys)
+            return
+        window.statusBar().showMessage(f"Refreshing {', '.join(keys)}...")
+        self.createGraph(previous=window.currentModel, reloadKeys=list(keys))
+
+    def setLiveRefresh(self, enabled):
+        self.liveRefresh = enabled
+        if enabled:
+            self.watchSources()
+        else:
+            if self.sourceWatcher is not None:
+                self.sourceWatcher.stop()
+            self.datasets = None
+            self.pendingRefresh = None
+
+    def setLayoutEngine(self, engine):
+        # positions from one engine mean nothing to another: lay out from scratch
+        if engine == self.layoutEngine:
+            return
+        self.layoutEngine = engine
+        # cached datasets may lack the coordinates the source engines need
+        self.datasets = None
+        if window.currentModel is not None:
+            self.createGraph()
+
+    def setPartitioned(self, partitioned):
+        if partitioned == self.partitioned:
+            return
+        self.partitioned = partitioned
+        if window.currentModel is not None:
+            self.createGraph()
+
+    def setCollapseChains(self, collapse):
+        if collapse == self.collapseChains:
+            return
+        self.collapseChains = collapse
+        if window.currentModel is not None:
+            self.createGraph()
+
+    def watchSources(self):
+        if not self.liveRefresh or window.currentModel is None:
+            return
+        if self.sourceWatcher is None:
+            self.sourceWatcher = SourceWatcher()
+            self.sourceWatcher.changed.connect(self.refreshGraph)
+        paths = self.paths()
+        if self.sourceWatcher.paths() != {key: os.path.abspath(path) for key, path in paths.items() if path}:
+            self.sourceWatcher.setPaths(paths)
+
+    def cancelGraph(self):
+        if self.buildWorker is not None:
+            self.buildWorker.cancel()
+
+    def onGraphBuilt(self, result):
+        self.datasets = result["datasets"]
+        if result["diff"] is not None:
+            window.updateGraph(result["model"], result["previous"], result["diff"], sources=result["sources"],
+                               chains=result["chains"])
+        else:
+            window.drawGraph(result["model"], laidOut=True, sources=result["sources"], partition=result["partition"],
+                             chains=result["chains"])
+        self.watchSources()
+
+    def onGraphFailed(self, message):
+        if self.buildQuiet:
+            # e.g. a file caught half written; the next change triggers another refresh
+            window.statusBar().showMessage(f"Refresh failed: {message}", 10000)
+            return
+        window.finishBuildProgress()
+        window.showBuildError(message)
+
+    def onGraphCancelled(self):
+        window.finishBuildProgress()
+
+    def onBuildThreadFinished(self):
+        self.buildThread.wait()
+        self.buildWorker.deleteLater()
+        self.buildThread.deleteLater()
+        self.buildWorker = None
+        self.buildThread = None
+        self.buildQuiet = False
+
+        if self.pendingRefresh:
+            keys, self.pendingRefresh = self.pendingRefresh, None
+            self.refreshGraph(sorted(keys))
+
+
+# Guarded so layout worker processes (which re-import this module when
+# spawned) don't start a second GUI
+if __name__ == "__main__":
+    appManager = AppManager()
+    app = QApplication(sys.argv)
+
+    #Instantiates a window
+    window = MainWindow(appManager)
+    window.show()
+    sys.exit(app.exec())
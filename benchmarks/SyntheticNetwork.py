@@ -0,0 +1,231 @@
+import csv
+import math
+import random
+
+
+class SyntheticNetwork:
+    """
+    Generates synthetic dendritic drainage networks for benchmarking.
+
+    Nodes are numbered so that node 0 is the outfall; every other node drains
+    towards a lower-numbered node, biased towards its immediate predecessor so
+    the network is made of long manhole runs joined at junctions.
+    """
+
+    # share of conduits of each specialised type, as (conduit type, share); the rest are plain links
+    CONDUIT_MIX = (
+        ("pump", 0.004),
+        ("weir", 0.006),
+        ("orifice", 0.004),
+        ("flume", 0.002),
+        ("sluice", 0.002),
+        ("flap_valve", 0.002),
+        ("user_control", 0.001),
+    )
+
+    # file written by writeNetwork for each AppManager path attribute
+    TABLE_FILES = {
+        "nodePath": "Nodes.csv",
+        "monitorsPath": "Monitors.csv",
+        "pipePath": "Links.csv",
+        "userControlPath": "UC.csv",
+        "flumePath": "Flumes.csv",
+        "flapValvePath": "Flap.csv",
+        "orficePath": "Orifices.csv",
+        "pumpPath": "Pumps.csv",
+        "sluicePath": "Sluice.csv",
+        "weirPath": "Weirs.csv",
+    }
+
+    @staticmethod
+    def edges(size, seed=0, branching=0.15, loops=0.005):
+        """
+        Returns:
+            [(upstream_id, downstream_id), ...] over node IDs "N000000".."N<size-1>"
+        """
+        rng = random.Random(seed)
+        ids = [f"N{i:06d}" for i in range(size)]
+
+        edges = []
+        for i in range(1, size):
+            if rng.random() < branching:
+                # start a new tributary joining somewhere further downstream
+                ds = rng.randrange(0, i)
+            else:
+                ds = i - 1
+            edges.append((ids[i], ids[ds]))
+
+        # a few overflow / pumped-return links, which introduce splits and loops
+        for _ in range(int(size * loops)):
+            a = rng.randrange(1, size)
+            b = rng.randrange(1, size)
+            if a != b:
+                edges.append((ids[a], ids[b]))
+
+        return edges
+
+    @staticmethod
+    def catchments(count, size, seed=0):
+        """
+        `count` disconnected networks of `size` nodes each, as one edge list.
+        Node IDs are prefixed "C<k>_" per catchment.
+        """
+        edges = []
+        for k in range(count):
+            prefix = f"C{k}_"
+            edges.extend((prefix + up, prefix + ds) for up, ds in SyntheticNetwork.edges(size, seed=seed + k))
+        return edges
+
+    @staticmethod
+    def model(size, seed=0, nodeTypes=("manhole", "flowmonitor", "outfall", "storage"), branching=0.15):
+        """
+        A NetworkModel of edges(size, seed, branching) with every node in the
+        nodes table, mostly manholes like a real network.
+        """
+        from NetworkModel import NetworkModelBuilder
+
+        rng = random.Random(seed)
+        builder = NetworkModelBuilder()
+        for i in range(size):
+            builder.addNode(f"N{i:06d}", nodeTypes[0] if rng.random() < 0.9 else rng.choice(nodeTypes))
+
+        suffixes = {}
+        for up, ds in SyntheticNetwork.edges(size, seed=seed, branching=branching):
+            suffix = suffixes.get(up, 0) + 1
+            suffixes[up] = suffix
+            builder.addConduit(f"{up}.{suffix}", up, ds, "link")
+        return builder.build()
+
+    @staticmethod
+    def writeLinks(path, edges):
+        """Write edges as a link table (US node ID, Link suffix, DS node ID)."""
+        suffixes = {}
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["US node ID", "Link suffix", "DS node ID"])
+            for up, ds in edges:
+                suffix = suffixes.get(up, 0) + 1
+                suffixes[up] = suffix
+                writer.writerow([up, suffix, ds])
+
+    @staticmethod
+    def geoNetwork(size, seed=0, spacing=40.0, jitter=0.3):
+        """
+        A network with made-up geographic x/y, like a surveyed sewer under a
+        street grid: nodes sit on a square grid spacing metres apart, each
+        nudged by up to jitter * spacing, and drain along a random spanning
+        tree of the grid towards an outfall at node 0.
+        Returns:
+            ([(upstream_id, downstream_id), ...], float array (size, 2))
+            over node IDs "N000000".."N<size-1>", numbered in drainage order
+        """
+        import heapq
+        import numpy as np
+
+        rng = random.Random(seed)
+        side = max(1, math.isqrt(size - 1) + 1)
+        cells = [None] * (side * side)   # grid cell -> node number
+        cell_of = []                     # node number -> grid cell
+        edges = []
+
+        # Prim's algorithm over random weights grows a branching, tree-shaped network
+        start = rng.randrange(side * side)
+        frontier = [(0.0, start, -1)]
+        while frontier and len(cell_of) < size:
+            _, cell, downstream = heapq.heappop(frontier)
+            if cells[cell] is not None:
+                continue
+            node = len(cell_of)
+            cells[cell] = node
+            cell_of.append(cell)
+            if downstream >= 0:
+                edges.append((f"N{node:06d}", f"N{downstream:06d}"))
+            row, col = divmod(cell, side)
+            for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if 0 <= r < side and 0 <= c < side and cells[r * side + c] is None:
+                    heapq.heappush(frontier, (rng.random(), r * side + c, node))
+
+        grid = np.array(cell_of, dtype=np.int64)
+        coords = np.column_stack([grid % side, grid // side]).astype(np.float64) * spacing
+        coords += np.random.default_rng(seed).uniform(-jitter, jitter, size=coords.shape) * spacing
+        # somewhere in British National Grid
+        return edges, coords + (450000.0, 250000.0)
+
+    @staticmethod
+    def writeNodes(path, size, seed=0, nodeTypes=("manhole", "flowmonitor", "outfall", "storage"), coordinates=None):
+        """
+        Write a nodes table (Node ID, Node type) for nodes "N000000".."N<size-1>", with the node types of model().
+        coordinates: optional (size, 2) array written as X and Y columns
+        """
+        rng = random.Random(seed)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Node ID", "Node type"] + (["X", "Y"] if coordinates is not None else []))
+            xy = coordinates.tolist() if coordinates is not None else None
+            for i in range(size):
+                row = [f"N{i:06d}", nodeTypes[0] if rng.random() < 0.9 else rng.choice(nodeTypes)]
+                if xy is not None:
+                    row.extend(f"{v:.2f}" for v in xy[i])
+                writer.writerow(row)
+
+    @staticmethod
+    def writeNetwork(directory, size, seed=0, branching=0.15, conduitMix=CONDUIT_MIX, monitorShare=0.02):
+        """
+        Write a whole network as the CSV tables the app loads, in
+        NetworkGenerator's schemas: nodes and monitors (Node ID, Node type)
+        and one conduit table per type (US node ID, Link suffix, DS node ID).
+
+        The conduits are edges(size, seed, branching). Overflow links (the
+        ones that make loops) are weirs, like combined sewer overflows; the
+        rest get a specialised type at the shares in conduitMix. A pump's
+        upstream node is a storage wet well, node 0 is the outfall and
+        everything else is a manhole, monitorShare of them monitored.
+        Returns:
+            {AppManager path attribute: path}, see TABLE_FILES
+        """
+        import os
+        from NetworkGenerator import NetworkGenerator
+
+        rng = random.Random(seed)
+        edges = SyntheticNetwork.edges(size, seed=seed, branching=branching)
+        # edges() adds the overflow links after the size - 1 tree links
+        tree_count = size - 1
+
+        table_of = {conduit_type: key for key, conduit_type in NetworkGenerator.CONDUIT_PRIORITY}
+        rows = {key: [] for key in NetworkGenerator.EDGE_PATH_KEYS}
+        node_types = ["Manhole"] * size
+        node_types[0] = "Outfall"
+        suffixes = {}
+        for i, (up, ds) in enumerate(edges):
+            conduit_type = "link" if i < tree_count else "weir"
+            if conduit_type == "link":
+                draw = rng.random()
+                for mix_type, share in conduitMix:
+                    if draw < share:
+                        conduit_type = mix_type
+                        break
+                    draw -= share
+            if conduit_type == "pump":
+                node_types[int(up[1:])] = "Storage"
+            suffix = suffixes.get(up, 0) + 1
+            suffixes[up] = suffix
+            rows[table_of[conduit_type]].append((up, suffix, ds))
+
+        monitors = sorted(rng.sample(range(1, size), min(size - 1, int(size * monitorShare))))
+
+        os.makedirs(directory, exist_ok=True)
+        paths = {key: os.path.join(directory, name) for key, name in SyntheticNetwork.TABLE_FILES.items()}
+        with open(paths["nodePath"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Node ID", "Node type"])
+            writer.writerows((f"N{i:06d}", node_type) for i, node_type in enumerate(node_types))
+        with open(paths["monitorsPath"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Node ID", "Node type"])
+            writer.writerows((f"N{i:06d}", node_types[i]) for i in monitors)
+        for key in NetworkGenerator.EDGE_PATH_KEYS:
+            with open(paths[key], "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["US node ID", "Link suffix", "DS node ID"])
+                writer.writerows(rows[key])
+        return paths
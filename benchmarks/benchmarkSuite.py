@@ -0,0 +1,220 @@
+"""
+End-to-end benchmark of opening a network, stage by stage, on synthetic
+networks written as the app's CSV tables (see SyntheticNetwork.writeNetwork):
+
+    stream            NetworkGenerator.streamModel, load and merge in one pass, as the
+                      app builds by default
+    load              NetworkGenerator.loadAll, every table parsed into datasets, as
+                      the app builds with live refresh on (followed by graph)
+    generateConduits  NetworkGenerator.generateConduits over those datasets
+    graph             NetworkGenerator.generateModel, the NetworkModel build
+    layout            NetworkDrawer.layoutNetwork, without the layout cache
+    scene             NetworkDrawer.buildScene
+    paint             first paint of the view, fitted to the schematic
+
+Qt runs offscreen, and the run stops if any node symbol fails to load, as
+the scene and paint times would mean nothing. Each stage is run --repeat
+times and the best time is kept. Results are written as JSON along with
+the commit and environment, so runs on different commits can be compared
+with --compare.
+
+Usage (from the repository root):
+    python benchmarks/benchmarkSuite.py
+    python benchmarks/benchmarkSuite.py --nodes 5000 20000 100000 --output before.json
+    python benchmarks/benchmarkSuite.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt6.QtWidgets import QApplication
+
+from ColumnarCsv import ColumnarCsv
+from NetworkDrawer import NetworkDrawer
+from NetworkGenerator import NetworkGenerator
+from SvgNodeFactory import SvgNodeFactory
+from SyntheticNetwork import SyntheticNetwork
+
+STAGES = ("stream", "load", "generateConduits", "graph", "layout", "scene", "paint")
+
+# size of the view painted in the paint stage
+VIEW_SIZE = (1280, 800)
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "numpy": np.__version__,
+        "csv": ColumnarCsv.backend(),
+    }
+
+
+def firstPaint(app, view):
+    view.resize(*VIEW_SIZE)
+    view.show()
+    view.zoomToFit()
+    # grab() paints the whole viewport now, rather than whenever the event loop gets to it
+    view.viewport().grab()
+    app.processEvents()
+
+
+def brokenSymbols(model):
+    """SVG files of the node symbols model is drawn with that don't load."""
+    node_types = {name for name in model.nodeTypeNames if isinstance(name, str)} | {"flowmonitor"}
+    files = {SvgNodeFactory.symbolFile(node_type) for node_type in node_types}
+    return sorted(svg_file for svg_file in files if not SvgNodeFactory.getSymbol(svg_file)["renderer"].isValid())
+
+
+def run(app, paths, args):
+    """Returns ({stage: best seconds}, laid out NetworkModel)."""
+    timings = {}
+    timings["stream"], _ = best_of(args.repeat, lambda: NetworkGenerator.streamModel(paths, columnar=args.columnar))
+    timings["load"], datasets = best_of(args.repeat, lambda: NetworkGenerator.loadAll(paths, columnar=args.columnar))
+    timings["generateConduits"], _ = best_of(args.repeat, lambda: NetworkGenerator.generateConduits(
+        *[datasets.get(key) for key in NetworkGenerator.EDGE_PATH_KEYS]
+    ))
+    timings["graph"], model = best_of(args.repeat, lambda: NetworkGenerator.generateModel(datasets))
+    del datasets
+    broken = brokenSymbols(model)
+    if broken:
+        sys.exit(f"Cannot load node symbols {', '.join(broken)} from {SvgNodeFactory.SVG_DIR}")
+    timings["layout"], _ = best_of(args.repeat, lambda: NetworkDrawer.layoutNetwork(
+        model, engine=args.engine, useCache=False, workers=args.workers
+    ))
+
+    # the first paint is only first once per view, so each repeat builds its own
+    timings["scene"] = timings["paint"] = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        view = NetworkDrawer.buildScene(model)
+        scene = time.perf_counter()
+        firstPaint(app, view)
+        end = time.perf_counter()
+        timings["scene"] = min(timings["scene"], scene - start)
+        timings["paint"] = min(timings["paint"], end - scene)
+        view.hide()
+        view.setScene(None)
+        view.deleteLater()
+        app.processEvents()
+    return timings, model
+
+
+def compare(results, previousPath):
+    """Print each stage's time against the run in previousPath, for the sizes both have."""
+    with open(previousPath, encoding="utf-8") as f:
+        previous = json.load(f)
+    before = {run["nodes"]: run["stages"] for run in previous["runs"]}
+    commit = (previous["environment"].get("commit") or "?")[:10]
+    print(f"\nagainst {previousPath} ({commit}): time now / time then")
+    print(f"{'nodes':>8} " + " ".join(f"{stage:>16}" for stage in STAGES))
+    for run in results["runs"]:
+        then = before.get(run["nodes"])
+        if then is None:
+            continue
+        ratios = [run["stages"][stage] / then[stage] if then.get(stage) else float("nan") for stage in STAGES]
+        print(f"{run['nodes']:>8} " + " ".join(f"{ratio:>16.2f}" for ratio in ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--branching", type=float, default=0.15,
+                        help="share of nodes starting a new tributary (see SyntheticNetwork.edges)")
+    parser.add_argument("--monitors", type=float, default=0.02, help="share of nodes monitored")
+    parser.add_argument("--engine", default="layered",
+                        choices=[e for e in NetworkDrawer.LAYOUT_ENGINES if e not in NetworkDrawer.SOURCE_ENGINES],
+                        help="layout engine (the synthetic tables have no coordinates for the source engines)")
+    parser.add_argument("--workers", type=int, default=None, help="layout processes (default: NetworkDrawer's)")
+    parser.add_argument("--csv-reader", dest="columnar", choices=("columnar", "dict"), default="columnar",
+                        help="columnar: ColumnarCsv, as the app reads; dict: csv.DictReader")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage (best is reported)")
+    parser.add_argument("--keep", metavar="DIR", help="write the CSV tables here and keep them, e.g. to open in the app")
+    parser.add_argument("--output", "-o", metavar="JSON", help="results file (default: benchmark-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="an earlier results file to compare against")
+    args = parser.parse_args()
+    args.columnar = args.columnar == "columnar"
+
+    app = QApplication.instance() or QApplication([])
+    results = {
+        "environment": environment(),
+        "config": {
+            "seed": args.seed,
+            "branching": args.branching,
+            "monitors": args.monitors,
+            "engine": args.engine,
+            "workers": args.workers,
+            "columnar": args.columnar,
+            "repeat": args.repeat,
+            "view": list(VIEW_SIZE),
+            "conduitMix": dict(SyntheticNetwork.CONDUIT_MIX),
+        },
+        "runs": [],
+    }
+
+    print(f"{'nodes':>8} {'conduits':>8} " + " ".join(f"{stage:>16}" for stage in STAGES) + f" {'total (s)':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.nodes:
+            directory = os.path.join(args.keep or tmp_dir, f"n{size}")
+            paths = SyntheticNetwork.writeNetwork(directory, size, seed=args.seed, branching=args.branching,
+                                                  monitorShare=args.monitors)
+            timings, model = run(app, paths, args)
+            results["runs"].append({
+                "nodes": size,
+                "conduits": model.edgeCount,
+                "monitors": int(model.isMonitor.sum()),
+                "csvBytes": sum(os.path.getsize(path) for path in paths.values()),
+                "stages": timings,
+            })
+            print(f"{size:>8} {model.edgeCount:>8} " + " ".join(f"{timings[stage]:>16.3f}" for stage in STAGES)
+                  + f" {sum(timings.values()):>10.2f}", flush=True)
+
+    output = args.output or f"benchmark-{(results['environment']['commit'] or 'unknown')[:10]}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Time and peak memory (RSS) to first show a schematic: laying out and building
+the whole network up front, versus splitting it into monitor sub-catchments
+(CatchmentPartition) and building only the largest one (CatchmentView), as
+with Layout > "Split into monitor sub-catchments".
+
+The network is SyntheticNetwork.model(--nodes), with monitors placed so
+that each sub-catchment has roughly --part-size nodes (see placeMonitors).
+Each mode runs in its own process with an empty layout cache, since peak RSS
+can only be read for a whole process.
+
+Usage (from the repository root):
+    python benchmarks/catchmentBenchmark.py
+    python benchmarks/catchmentBenchmark.py --nodes 20000 100000 --part-size 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+MODES = ("whole", "partitioned")
+
+
+def placeMonitors(model, partSize):
+    """
+    Walk the network upstream to downstream, counting the nodes gathered
+    since the last monitors upstream, and put a monitor wherever that count
+    reaches partSize. Flow that splits is counted down its first conduit only.
+    """
+    indptr = model.indptr.tolist()
+    dst = model.edgeDst.tolist()
+    gathered = [1] * model.nodeCount
+    for node in model.trace().order().tolist():
+        carried = gathered[node]
+        if carried >= partSize:
+            model.isMonitor[node] = True
+            carried = 0
+        if indptr[node] < indptr[node + 1]:
+            gathered[dst[indptr[node]]] += carried
+
+
+def build(mode, size, partSize):
+    """Runs one mode in this process; returns {"seconds", "base_mb", "peak_mb", "items", "parts"}."""
+    from PyQt6.QtWidgets import QApplication
+
+    import numpy as np
+    from CatchmentPartition import CatchmentPartition
+    from CatchmentView import CatchmentView
+    from NetworkDrawer import NetworkDrawer
+    from SyntheticNetwork import SyntheticNetwork
+    from streamBenchmark import peakRss
+
+    app = QApplication.instance() or QApplication([])
+    model = SyntheticNetwork.model(size)
+    placeMonitors(model, partSize)
+
+    base = peakRss()
+    start = time.perf_counter()
+    # the layered engine's diagnostics print is not part of the result
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            if mode == "whole":
+                NetworkDrawer.layoutNetwork(model)
+                view = NetworkDrawer.buildScene(model)
+                parts = 1
+            else:
+                model.trace().precompute(np.flatnonzero(model.isMonitor))
+                partition = CatchmentPartition(model)
+                catchments = CatchmentView(model, partition)
+                view = catchments.showPart(partition.largest())
+                parts = partition.partCount
+        finally:
+            sys.stdout = stdout
+    app.processEvents()
+    return {"seconds": time.perf_counter() - start, "base_mb": base, "peak_mb": peakRss(),
+            "items": len(view.scene().items()), "parts": parts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--part-size", type=int, default=2000, help="nodes per monitor, roughly")
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(build(args.run, args.nodes[0], args.part_size)))
+        return
+
+    print(f"{'nodes':>8} {'mode':<12} {'parts':>6} {'scene items':>12} {'time (s)':>9} {'RSS added (MB)':>15}")
+    for size in args.nodes:
+        for mode in MODES:
+            with tempfile.TemporaryDirectory() as home:
+                # an empty LayoutCache, so every layout is really computed
+                env = dict(os.environ, HOME=home)
+                command = [sys.executable, os.path.abspath(__file__), "--run", mode, "--nodes", str(size),
+                           "--part-size", str(args.part_size)]
+                result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True,
+                                                   env=env).stdout.splitlines()[-1])
+            print(f"{size:>8} {mode:<12} {result['parts']:>6} {result['items']:>12} {result['seconds']:>9.2f}"
+                  f" {result['peak_mb'] - result['base_mb']:>15.1f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
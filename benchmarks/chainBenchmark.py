@@ -0,0 +1,81 @@
+"""
+Layout, scene build and render time of synthetic networks drawn whole versus
+with their manhole runs collapsed (ChainCollapse), as with Layout > "Collapse
+manhole chains" or BatchRender --collapse-chains.
+
+How much collapsing saves depends on how long the runs are: lower --branching
+gives longer runs between junctions, as in most real sewer models.
+
+Usage (from the repository root):
+    python benchmarks/chainBenchmark.py
+    python benchmarks/chainBenchmark.py --nodes 20000 100000 --branching 0.15 0.03
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from BatchRender import BatchRender
+from ChainCollapse import ChainCollapse
+from NetworkDrawer import NetworkDrawer
+from SyntheticNetwork import SyntheticNetwork
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def draw(model, outDir, scale):
+    """Lays out (no cache), builds and renders model; returns {stage: seconds}."""
+    # the layered engine's diagnostics print is not part of the result
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            _, layout = timed(NetworkDrawer.layoutNetwork, model, useCache=False, workers=1)
+        finally:
+            sys.stdout = stdout
+    view, scene = timed(NetworkDrawer.buildScene, model)
+    _, render = timed(BatchRender.renderPng, view.scene(), os.path.join(outDir, "schematic.png"), scale)
+    return {"layout": layout, "scene": scene, "render": render}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--branching", type=float, nargs="+", default=[0.15, 0.03],
+                        help="share of nodes starting a new tributary (see SyntheticNetwork.edges)")
+    parser.add_argument("--scale", type=float, default=0.25, help="PNG pixels per scene unit")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    stages = ("layout", "scene", "render")
+    print(f"{'nodes':>8} {'branching':>9} {'mode':<10} {'drawn':>8} {'conduits':>8} {'collapse (s)':>12} "
+          + " ".join(f"{stage + ' (s)':>10}" for stage in stages) + f" {'total (s)':>10}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        for size in args.nodes:
+            for branching in args.branching:
+                for mode in ("whole", "collapsed"):
+                    model = SyntheticNetwork.model(size, branching=branching)
+                    collapse = 0.0
+                    if mode == "collapsed":
+                        chains, collapse = timed(ChainCollapse, model)
+                        model = chains.collapsed
+                    timings = draw(model, out_dir, args.scale)
+                    app.processEvents()
+                    print(f"{size:>8} {branching:>9.2f} {mode:<10} {model.nodeCount:>8} {model.edgeCount:>8} "
+                          f"{collapse:>12.3f} " + " ".join(f"{timings[stage]:>10.2f}" for stage in stages)
+                          + f" {collapse + sum(timings.values()):>10.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Frame rate of dragging a large selection of nodes, with pipe geometry updated
+immediately on every node move versus batched into one deferred pass per
+frame (see PipeItem.BATCH_UPDATES).
+
+Each frame moves every selected node, the way QGraphicsItem's own drag
+handling does, then lets Qt process the resulting events and repaint. The
+view is fitted to the selection first.
+
+Usage (from the repository root):
+    python benchmarks/dragBenchmark.py
+    python benchmarks/dragBenchmark.py --nodes 20000 --selected 100 500 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt
+
+from NetworkDrawer import NetworkDrawer
+from PipeItem import PipeItem
+from SyntheticNetwork import SyntheticNetwork
+
+
+def drag(app, items, frames, step=5.0):
+    """Returns (frames per second, updatePosition calls per frame)."""
+    calls = [0]
+    update = PipeItem.updatePosition
+
+    def counted(pipe):
+        calls[0] += 1
+        update(pipe)
+
+    PipeItem.updatePosition = counted
+    try:
+        start = time.perf_counter()
+        for frame in range(frames):
+            dx = step if frame % 2 == 0 else -step
+            for item in items:
+                item.moveBy(dx, 0.0)
+            app.processEvents()
+        elapsed = time.perf_counter() - start
+    finally:
+        PipeItem.updatePosition = update
+    return frames / elapsed, calls[0] / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--selected", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--pipes", choices=NetworkDrawer.PIPE_MODES, default="items", help="pipe rendering mode")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    model = SyntheticNetwork.model(args.nodes)
+    NetworkDrawer.layoutNetwork(model, useCache=False)
+    view = NetworkDrawer.buildScene(model, pipeMode=args.pipes)
+    view.resize(1280, 800)
+    view.show()
+    app.processEvents()
+
+    # nodes in drawing order, so a prefix is a connected stretch of the network
+    node_items = [item for item in view.scene().items() if hasattr(item, "connectedPipes")]
+    node_items.sort(key=lambda item: item.node_id)
+
+    print(f"{'selected':>9} {'updates':>9} {'fps':>8} {'pipe updates/frame':>19}")
+    for count in args.selected:
+        items = node_items[:count]
+
+        # frame the selection, as a user dragging it would
+        selection = items[0].sceneBoundingRect()
+        for item in items:
+            selection = selection.united(item.sceneBoundingRect())
+        view.fitInView(selection, Qt.AspectRatioMode.KeepAspectRatio)
+        app.processEvents()
+
+        for batched in (False, True):
+            PipeItem.BATCH_UPDATES = batched
+            fps, calls = drag(app, items, args.frames)
+            print(f"{len(items):>9} {'batched' if batched else 'immediate':>9} {fps:>8.1f} {calls:>19.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures repaint time of the schematic view with and without level of detail
+(see SvgNodeItem.LEVEL_OF_DETAIL and PipeItem.LEVEL_OF_DETAIL), on a
+synthetic network at full zoom-out and at 1:1 zoom.
+
+Usage (from the repository root):
+    python benchmarks/frameBenchmark.py
+    python benchmarks/frameBenchmark.py --nodes 50000 --frames 10 --size 1600 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt
+
+from NetworkDrawer import NetworkDrawer
+from PipeItem import PipeItem
+from SvgNodeFactory import SvgNodeItem
+from SyntheticNetwork import SyntheticNetwork
+
+
+def frameTime(view, frames):
+    """Best and mean wall time of a full synchronous viewport repaint."""
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        view.viewport().repaint()
+        times.append(time.perf_counter() - start)
+    return min(times), sum(times) / len(times)
+
+
+def setLevelOfDetail(enabled):
+    SvgNodeItem.LEVEL_OF_DETAIL = enabled
+    PipeItem.LEVEL_OF_DETAIL = enabled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=50000)
+    parser.add_argument("--frames", type=int, default=5, help="repaints per measurement")
+    parser.add_argument("--size", type=int, nargs=2, default=[1280, 800], metavar=("WIDTH", "HEIGHT"))
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    start = time.perf_counter()
+    model = SyntheticNetwork.model(args.nodes)
+    NetworkDrawer.layoutNetwork(model, useCache=False)
+    view = NetworkDrawer.buildScene(model)
+    print(f"Built {model.nodeCount} nodes / {model.edgeCount} conduits in {time.perf_counter() - start:.1f}s")
+
+    view.resize(*args.size)
+    view.show()
+    app.processEvents()
+
+    zooms = {
+        "zoomed out": lambda: view.fitInView(view.scene().itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio),
+        "1:1": lambda: (view.resetTransform(), view.centerOn(view.scene().itemsBoundingRect().center())),
+    }
+
+    print(f"{'view':<12} {'level of detail':>16} {'best (ms)':>10} {'mean (ms)':>10}")
+    for name, zoom in zooms.items():
+        zoom()
+        app.processEvents()
+        for enabled in (False, True):
+            setLevelOfDetail(enabled)
+            frameTime(view, 1)  # warm up (fills the pixmap cache)
+            best, mean = frameTime(view, args.frames)
+            print(f"{name:<12} {'on' if enabled else 'off':>16} {best * 1000:>10.1f} {mean * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Cost of one mouse move over the schematic with pipe hover resolved by Qt
+(hover events dispatched through every pipe's shape) versus through the
+view's SegmentIndex (NetworkDrawer.buildScene's indexPipes).
+
+For each sample the view is centred on a random point of the network, then a
+single mouse move event is sent to the viewport and timed (hover dispatch and
+tooltip, not repainting). The pipe lookup on its own is timed separately:
+scene.items() at the cursor for item shapes, SchematicView.pipeAt for the index.
+
+What the index costs up front is reported next to that: the time to build
+the scene with and without it, and the time to fill its grid, which the
+first hover pays (SegmentIndex.build).
+
+Usage (from the repository root):
+    python benchmarks/hoverBenchmark.py
+    python benchmarks/hoverBenchmark.py --nodes 10000 100000 --zoom 0.1
+    python benchmarks/hoverBenchmark.py --pipe-mode layers
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtCore import Qt, QEvent, QPointF
+
+from NetworkDrawer import NetworkDrawer
+from PipeItem import PipeItem
+from SyntheticNetwork import SyntheticNetwork
+
+
+def hover(app, view, samples, zoom, seed=0):
+    """Returns (milliseconds per mouse move, milliseconds per lookup, fraction of moves over a pipe)."""
+    view.resize(1280, 800)
+    view.show()
+    view.resetTransform()
+    view.scale(zoom, zoom)
+
+    rect = view.scene().itemsBoundingRect()
+    viewport = view.viewport()
+    rng = random.Random(seed)
+
+    elapsed = 0.0
+    lookup = 0.0
+    hits = 0
+    for _ in range(samples):
+        view.centerOn(QPointF(rng.uniform(rect.left(), rect.right()), rng.uniform(rect.top(), rect.bottom())))
+        app.processEvents()
+
+        pos = QPointF(rng.uniform(0, viewport.width()), rng.uniform(0, viewport.height()))
+        event = QMouseEvent(
+            QEvent.Type.MouseMove, pos, viewport.mapToGlobal(pos),
+            Qt.MouseButton.NoButton, Qt.MouseButton.NoButton, Qt.KeyboardModifier.NoModifier,
+        )
+        start = time.perf_counter()
+        app.sendEvent(viewport, event)
+        elapsed += time.perf_counter() - start
+
+        start = time.perf_counter()
+        if view.pipeIndex is not None:
+            pipe = view.pipeAt(pos.toPoint())
+        else:
+            pipe = next((item for item in view.items(pos.toPoint()) if isinstance(item, PipeItem)), None)
+        lookup += time.perf_counter() - start
+        hits += pipe is not None
+    view.hide()
+    return elapsed * 1000.0 / samples, lookup * 1000.0 / samples, hits / samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--zoom", type=float, default=0.5, help="view scale")
+    parser.add_argument("--samples", type=int, default=200, help="mouse moves timed")
+    parser.add_argument("--pipe-mode", choices=NetworkDrawer.PIPE_MODES, default="items",
+                        help="how pipes are drawn (item shapes only apply to items)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    print(f"{'hover':<13} {'conduits':>9} {'scene (s)':>10} {'grid (ms)':>10} "
+          f"{'move (ms)':>10} {'lookup (ms)':>12} {'on a pipe':>10}")
+    for nodes in args.nodes:
+        model = SyntheticNetwork.model(nodes)
+        NetworkDrawer.layoutNetwork(model, useCache=False)
+        for indexed in (False, True):
+            start = time.perf_counter()
+            view = NetworkDrawer.buildScene(model, pipeMode=args.pipe_mode, indexPipes=indexed)
+            scene_s = time.perf_counter() - start
+            grid_ms = 0.0
+            if indexed:
+                start = time.perf_counter()
+                view.pipeIndex.build()
+                grid_ms = (time.perf_counter() - start) * 1000.0
+            move_ms, lookup_ms, hit = hover(app, view, args.samples, args.zoom)
+            name = "SegmentIndex" if indexed else "item shapes"
+            print(f"{name:<13} {model.edgeCount:>9} {scene_s:>10.2f} {grid_ms:>10.1f} "
+                  f"{move_ms:>10.3f} {lookup_ms:>12.3f} {hit:>10.0%}")
+            view.setScene(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares the layout backends of NetworkDrawer on synthetic drainage networks.
+
+Usage (from the repository root):
+    python benchmarks/layoutBenchmark.py
+    python benchmarks/layoutBenchmark.py --sizes 1000 10000 --engines layered
+    python benchmarks/layoutBenchmark.py --catchments 40 --workers 1 2 4 8
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import networkx as nx
+
+from NetworkDrawer import NetworkDrawer
+from SyntheticNetwork import SyntheticNetwork
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    # the source engines lay out from a nodes table's coordinates, which a bare graph has none of
+    engines = [e for e in NetworkDrawer.LAYOUT_ENGINES if e not in NetworkDrawer.SOURCE_ENGINES]
+    parser.add_argument("--engines", nargs="+", default=engines, choices=engines)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is reported)")
+    parser.add_argument("--catchments", type=int, default=1,
+                        help="split each size over this many disconnected catchments")
+    parser.add_argument("--workers", type=int, nargs="+", default=[None],
+                        help="process pool sizes to compare (default: one per CPU)")
+    args = parser.parse_args()
+
+    engines = list(args.engines)
+    if "graphviz" in engines and shutil.which("dot") is None:
+        print("Graphviz `dot` not found on PATH, skipping the graphviz backend")
+        engines.remove("graphviz")
+
+    columns = [(engine, workers) for engine in engines for workers in args.workers]
+    headers = [engine if workers is None else f"{engine} x{workers}" for engine, workers in columns]
+
+    print(f"{'nodes':>8} {'edges':>8} " + " ".join(f"{header + ' (s)':>16}" for header in headers))
+    for size in args.sizes:
+        G = nx.DiGraph()
+        if args.catchments > 1:
+            G.add_edges_from(SyntheticNetwork.catchments(args.catchments, size // args.catchments))
+        else:
+            G.add_edges_from(SyntheticNetwork.edges(size))
+
+        timings = []
+        for engine, workers in columns:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                NetworkDrawer.computeLayout(G, engine, workers)
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+
+        print(f"{G.number_of_nodes():>8} {G.number_of_edges():>8} " + " ".join(f"{t:>16.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Reports the memory held by the network representation before and after the
+move to NetworkModel, for synthetic networks with one link per node.
+
+"before" is what the old pipeline kept alive: the loadEdges adjacency dict,
+the generateConduits list of per-conduit dicts, the loadNodes dict and the
+networkx.DiGraph built for layout. "after" is the single NetworkModel.
+
+Usage (from the repository root):
+    python benchmarks/memoryBenchmark.py
+    python benchmarks/memoryBenchmark.py --links 100000 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import networkx as nx
+
+from NetworkGenerator import NetworkGenerator
+from NetworkModel import NetworkModel
+from SyntheticNetwork import SyntheticNetwork
+
+
+def measure(build):
+    """Bytes still allocated by build()'s result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, nargs="+", default=[1000000])
+    args = parser.parse_args()
+
+    print(f"{'links':>9} {'before (MB)':>12} {'after (MB)':>12} {'ratio':>7}")
+    for links in args.links:
+        edges = SyntheticNetwork.edges(links + 1, loops=0)
+
+        # loader output shared by both representations; not counted for either
+        adjacency = {}
+        suffixes = {}
+        for up, ds in edges:
+            suffix = suffixes.get(up, 0) + 1
+            suffixes[up] = suffix
+            adjacency.setdefault(up, []).append((ds, f"{up}.{suffix}"))
+        node_ids = sorted({up for up, _ in edges} | {ds for _, ds in edges})
+        del edges, suffixes
+
+        def old_representation():
+            graph = {up: list(outs) for up, outs in adjacency.items()}
+            nodes = {node_id: {"type": "Manhole"} for node_id in node_ids}
+            conduits = NetworkGenerator.generateConduits(graph, {}, {}, {}, {}, {}, {}, {})
+            G = nx.DiGraph()
+            for c in conduits:
+                G.add_edge(c["upstream"], c["downstream"])
+            return graph, nodes, conduits, G
+
+        def new_representation():
+            nodes = {node_id: {"type": "Manhole"} for node_id in node_ids}
+            model = NetworkModel.fromDatasets(nodes, {}, [("link", adjacency)])
+            del nodes
+            return model
+
+        before = measure(old_representation)
+        after = measure(new_representation)
+        print(f"{links:>9} {before / 1e6:>12.1f} {after / 1e6:>12.1f} {before / after:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Times NetworkGenerator.loadEdges on large synthetic link tables, comparing the
+csv.DictReader path with the columnar reader (pyarrow when installed, otherwise
+the csv.reader fallback).
+
+Usage (from the repository root):
+    python benchmarks/parseBenchmark.py
+    python benchmarks/parseBenchmark.py --rows 100000 1000000 --repeat 1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ColumnarCsv as columnarCsvModule
+from ColumnarCsv import ColumnarCsv
+from NetworkGenerator import NetworkGenerator
+from SyntheticNetwork import SyntheticNetwork
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    modes = [("dictreader", False)]
+    if ColumnarCsv.backend() == "pyarrow":
+        modes.append(("columnar/pyarrow", True))
+    modes.append(("columnar/csv", "csv"))
+
+    print(f"{'rows':>9} " + " ".join(f"{name + ' (s)':>20}" for name, _ in modes))
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = os.path.join(tmp, f"links_{rows}.csv")
+            SyntheticNetwork.writeLinks(path, SyntheticNetwork.edges(rows + 1, loops=0))
+
+            timings = []
+            reference = None
+            for name, mode in modes:
+                saved = columnarCsvModule.pacsv
+                if mode == "csv":
+                    # force the fallback even when pyarrow is installed
+                    columnarCsvModule.pacsv = None
+                try:
+                    elapsed, graph = best_of(args.repeat, lambda: NetworkGenerator.loadEdges(path, columnar=bool(mode)))
+                finally:
+                    columnarCsvModule.pacsv = saved
+
+                if reference is None:
+                    reference = graph
+                elif graph != reference:
+                    raise AssertionError(f"{name} produced a different adjacency list")
+                timings.append(elapsed)
+
+            print(f"{rows:>9} " + " ".join(f"{t:>20.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
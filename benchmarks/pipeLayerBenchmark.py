@@ -0,0 +1,81 @@
+"""
+Scene build time, pan/zoom frame rate and hover lookup cost with one PipeItem
+per conduit versus one PipeLayerItem per conduit type (NetworkDrawer's
+pipeMode "items" / "layers").
+
+Pan and zoom are scripted the same way as in viewBenchmark.py. Hover is timed
+as scene.items(point) plus, for layers, the segment lookup behind the tooltip.
+
+Usage (from the repository root):
+    python benchmarks/pipeLayerBenchmark.py
+    python benchmarks/pipeLayerBenchmark.py --nodes 100000 --zoom 0.1
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QPointF
+
+from NetworkDrawer import NetworkDrawer
+from PipeLayerItem import PipeLayerItem
+from SyntheticNetwork import SyntheticNetwork
+from viewBenchmark import run
+
+
+def hover(scene, points):
+    """Returns milliseconds per hovered point."""
+    start = time.perf_counter()
+    for point in points:
+        for item in scene.items(point):
+            if isinstance(item, PipeLayerItem):
+                item.segmentAt(point)
+    return (time.perf_counter() - start) * 1000.0 / len(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--zoom", type=float, default=0.1, help="view scale the script starts at")
+    parser.add_argument("--frames", type=int, default=20, help="frames per pan direction / zoom phase")
+    parser.add_argument("--step", type=int, default=25, help="pixels scrolled per pan frame")
+    parser.add_argument("--points", type=int, default=200, help="hover positions sampled")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    model = SyntheticNetwork.model(args.nodes)
+    NetworkDrawer.layoutNetwork(model, useCache=False)
+
+    print(f"{'pipes':<7} {'conduits':>9} {'items':>8} {'build (s)':>10} {'pan (fps)':>10} {'zoom (fps)':>11} {'hover (ms)':>11}")
+    for mode in NetworkDrawer.PIPE_MODES:
+        start = time.perf_counter()
+        view = NetworkDrawer.buildScene(model, pipeMode=mode)
+        build = time.perf_counter() - start
+
+        scene = view.scene()
+        rect = scene.itemsBoundingRect()
+        rng = random.Random(0)
+        points = [
+            QPointF(rng.uniform(rect.left(), rect.right()), rng.uniform(rect.top(), rect.bottom()))
+            for _ in range(args.points)
+        ]
+        hover_ms = hover(scene, points)
+
+        fps = run(app, view, args.zoom, args.frames, args.step)
+        print(
+            f"{mode:<7} {model.edgeCount:>9} {len(scene.items()):>8} {build:>10.2f}"
+            f" {fps['pan']:>10.1f} {fps['zoom']:>11.1f} {hover_ms:>11.2f}"
+        )
+        view.setScene(None)
+
+
+if __name__ == "__main__":
+    main()
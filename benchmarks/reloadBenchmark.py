@@ -0,0 +1,95 @@
+"""
+Reload after a one-row edit: rebuilding the schematic from scratch (layout +
+buildScene) versus diffing against the model on screen and patching the scene
+(NetworkDiff.compare + NetworkDrawer.layoutIncremental + updateScene).
+
+The network is split into catchments (disconnected components), as real
+models are, so a structural edit only lays out one of them again. CSV parsing
+and merging cost the same either way and are left out.
+
+Usage (from the repository root):
+    python benchmarks/reloadBenchmark.py
+    python benchmarks/reloadBenchmark.py --nodes 100000 --catchments 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from NetworkDiff import NetworkDiff
+from NetworkDrawer import NetworkDrawer
+from NetworkModel import NetworkModelBuilder
+from SyntheticNetwork import SyntheticNetwork
+
+
+def model(edges, edit=None):
+    """
+    NetworkModel of edges with every node drawn as a manhole, after one edit:
+    "restyle" turns the first conduit into a pump, "add" adds a conduit,
+    "remove" drops the last one.
+    """
+    builder = NetworkModelBuilder()
+    for up, ds in edges:
+        builder.addNode(up, "manhole")
+        builder.addNode(ds, "manhole")
+
+    if edit == "add":
+        builder.addConduit("extra.1", edges[-1][0], edges[0][1], "link")
+    if edit == "remove":
+        edges = edges[:-1]
+    for e, (up, ds) in enumerate(edges):
+        builder.addConduit(f"{up}.{e}", up, ds, "pump" if edit == "restyle" and e == 0 else "link")
+    return builder.build()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--catchments", type=int, default=20)
+    parser.add_argument("--pipes", choices=NetworkDrawer.PIPE_MODES, default=None, help="pipe rendering mode")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    edges = SyntheticNetwork.catchments(args.catchments, args.nodes // args.catchments)
+    base = model(edges)
+    NetworkDrawer.layoutNetwork(base, useCache=False)
+
+    print(f"{'edit':<8} {'full (s)':>9} {'diff (ms)':>10} {'layout (ms)':>12} {'scene (ms)':>11} {'relaid':>7}")
+    for edit in ("restyle", "add", "remove"):
+        # incremental, against a scene built from base
+        view = NetworkDrawer.buildScene(base, pipeMode=args.pipes)
+        edited = model(edges, edit)
+        # let Qt index the new scene first
+        view.scene().itemsBoundingRect()
+        app.processEvents()
+        start = time.perf_counter()
+        diff = NetworkDiff.compare(base, edited)
+        compared = time.perf_counter()
+        NetworkDrawer.layoutIncremental(edited, base, diff)
+        laid_out = time.perf_counter()
+        NetworkDrawer.updateScene(view, edited, base, diff)
+        app.processEvents()
+        done = time.perf_counter()
+        del view
+
+        # full rebuild
+        edited = model(edges, edit)
+        start_full = time.perf_counter()
+        NetworkDrawer.layoutNetwork(edited, useCache=False)
+        view = NetworkDrawer.buildScene(edited, pipeMode=args.pipes)
+        full = time.perf_counter() - start_full
+        del view
+
+        print(f"{edit:<8} {full:>9.2f} {(compared - start) * 1000:>10.1f} {(laid_out - compared) * 1000:>12.1f}"
+              f" {(done - laid_out) * 1000:>11.1f} {diff.relaidNodes.size:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Monitor time series on the schematic (TimeSeriesStore, TimeSeriesOverlay):
+building the store from a long-format CSV, opening it again, and the time
+per row of playback, stepping through time and jumping about it, against
+redrawing every monitor on every row.
+
+Usage (from the repository root):
+    python benchmarks/seriesBenchmark.py
+    python benchmarks/seriesBenchmark.py --nodes 20000 --monitors 500 --rows 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from NetworkDrawer import NetworkDrawer
+from SyntheticNetwork import SyntheticNetwork
+from TimeSeriesOverlay import TimeSeriesOverlay
+from TimeSeriesStore import TimeSeriesStore
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def writeSeries(path, nodeIds, rows, seed=0):
+    """Two-minute readings of every node in nodeIds: noisy Flow with a few missing, smooth Depth."""
+    rng = np.random.default_rng(seed)
+    times = np.datetime64("2024-01-01T00:00:00") + np.arange(rows) * np.timedelta64(120, "s")
+    ids = np.array(nodeIds, dtype=object)
+    phase = rng.random(len(nodeIds)) * 2 * np.pi
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{TimeSeriesStore.ID_COLUMN},{TimeSeriesStore.TIME_COLUMN},Flow,Depth\n")
+        for row in range(rows):
+            flow = 5.0 + 4.0 * np.sin(row / 180.0 + phase) + rng.normal(0, 0.05, len(nodeIds))
+            depth = 0.5 + 0.4 * np.sin(row / 240.0 + phase)
+            flow_text = np.char.mod("%.3f", flow).astype(object)
+            flow_text[rng.random(len(nodeIds)) < 0.01] = ""
+            stamp = str(times[row]).replace("T", " ")
+            f.writelines(f"{node_id},{stamp},{q},{d:.3f}\n" for node_id, q, d in zip(ids, flow_text, depth))
+
+
+def perRow(overlay, rows, full):
+    """Mean seconds per setRow over rows; full redraws every monitor each time."""
+    start = time.perf_counter()
+    for row in rows:
+        if full:
+            overlay._shown = None
+        overlay.setRow(row)
+    return (time.perf_counter() - start) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=20000)
+    parser.add_argument("--monitors", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=20000, help="readings per monitor")
+    parser.add_argument("--steps", type=int, default=500, help="rows played per measurement")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    model = SyntheticNetwork.model(args.nodes)
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            NetworkDrawer.layoutNetwork(model, useCache=False, workers=1)
+        finally:
+            sys.stdout = stdout
+    view = NetworkDrawer.buildScene(model)
+    monitors = np.random.default_rng(0).choice(model.nodeCount, min(args.monitors, model.nodeCount), replace=False)
+    node_ids = [model.nodeIds[i] for i in sorted(monitors.tolist())]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        csv_path = os.path.join(out_dir, "series.csv")
+        store_path = os.path.join(out_dir, "series" + TimeSeriesStore.EXTENSION)
+        _, write = timed(writeSeries, csv_path, node_ids, args.rows)
+        _, build = timed(TimeSeriesStore.build, csv_path, store_path)
+        store, opened = timed(TimeSeriesStore.open, store_path)
+        print(f"{len(node_ids)} monitors x {args.rows} rows: CSV {os.path.getsize(csv_path) / 1e6:.0f} MB "
+              f"(written in {write:.1f} s), store {os.path.getsize(store_path) / 1e6:.0f} MB")
+        print(f"build {build:.2f} s, open {opened * 1000:.2f} ms")
+
+        overlay = TimeSeriesOverlay(store)
+        _, attach = timed(overlay.attach, view)
+        print(f"attach {attach * 1000:.1f} ms ({len(overlay.items)} monitors drawn)")
+
+        steps = min(args.steps, store.rowCount)
+        played = np.arange(steps)
+        jumps = np.random.default_rng(1).integers(0, store.rowCount, steps)
+        print(f"{'quantity':<8} {'rows':<8} {'changed only (ms)':>17} {'every monitor (ms)':>18}")
+        for quantity in store.quantities:
+            overlay.setQuantity(quantity)
+            for label, rows in (("played", played), ("jumping", jumps)):
+                changed = perRow(overlay, rows.tolist(), False)
+                full = perRow(overlay, rows.tolist(), True)
+                app.processEvents()
+                print(f"{quantity:<8} {label:<8} {changed * 1000:>17.3f} {full * 1000:>18.3f}", flush=True)
+        overlay.detach()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Layout time with the layered engine versus placing nodes at their source
+coordinates (NetworkDrawer's "source" and "source-separated" engines), on
+synthetic networks with made-up geographic x/y (SyntheticNetwork.geoNetwork).
+
+"overlaps" counts pairs of node symbols closer than SourceLayout.SEPARATION
+once laid out.
+
+Usage (from the repository root):
+    python benchmarks/sourceLayoutBenchmark.py
+    python benchmarks/sourceLayoutBenchmark.py --nodes 100000 1000000 --layered-max 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from NetworkDrawer import NetworkDrawer
+from NetworkModel import NetworkModelBuilder
+from SourceLayout import SourceLayout
+from SyntheticNetwork import SyntheticNetwork
+
+
+def model(size, seed=0):
+    """The network of SyntheticNetwork.geoNetwork(size, seed), with its coordinates as source positions."""
+    edges, coords = SyntheticNetwork.geoNetwork(size, seed)
+    coords = coords.tolist()
+    rng = random.Random(seed)
+    builder = NetworkModelBuilder()
+    for i in range(size):
+        builder.addNode(f"N{i:06d}", "manhole" if rng.random() < 0.9 else "outfall", position=coords[i])
+    for up, ds in edges:
+        builder.addConduit(f"{up}.1", up, ds, "link")
+    return builder.build()
+
+
+def overlaps(model):
+    pairs = SourceLayout.closePairs(model.positions / NetworkDrawer.LAYOUT_SCALE, SourceLayout.SEPARATION)
+    return "-" if pairs is None else str(pairs[0].size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--layered-max", type=int, default=100000, help="skip the layered engine above this size")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>9} {'engine':<17} {'layout (s)':>11} {'overlaps':>9}")
+    for size in args.nodes:
+        network = model(size)
+        for engine in ("layered", "source", "source-separated"):
+            if engine == "layered" and size > args.layered_max:
+                continue
+            start = time.perf_counter()
+            if engine == "layered":
+                # the diagnostics print is part of the layered path; keep it out of the table
+                with open(os.devnull, "w") as devnull:
+                    stdout, sys.stdout = sys.stdout, devnull
+                    try:
+                        NetworkDrawer.layoutNetwork(network, engine, useCache=False)
+                    finally:
+                        sys.stdout = stdout
+            else:
+                NetworkDrawer.layoutNetwork(network, engine, useCache=False)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>9} {engine:<17} {elapsed:>11.2f} {overlaps(network):>9}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
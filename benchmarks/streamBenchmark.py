@@ -0,0 +1,97 @@
+"""
+Peak memory (RSS) and time to turn a large set of CSVs into a NetworkModel,
+loading every conduit table first (NetworkGenerator.loadAll + generateModel)
+versus streaming them into the builder (NetworkGenerator.streamModel).
+
+The input is a link table of --conduits rows plus a pump table re-typing the
+first --pumps of those links, so the link ID dedup is exercised. Each mode
+runs in its own process, since peak RSS can only be read for a whole process.
+
+Usage (from the repository root):
+    python benchmarks/streamBenchmark.py
+    python benchmarks/streamBenchmark.py --conduits 2000000 --columnar
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from NetworkGenerator import NetworkGenerator
+from SyntheticNetwork import SyntheticNetwork
+
+MODES = ("loaded", "streamed")
+
+
+def peakRss():
+    """
+    Peak resident set size of this process so far, in MB. Linux's VmHWM starts
+    afresh at exec; ru_maxrss (the fallback elsewhere) can carry over the
+    parent's peak.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KB elsewhere
+    return maxrss / (1024.0 * 1024.0) if sys.platform == "darwin" else maxrss / 1024.0
+
+
+def build(mode, paths, columnar):
+    """Runs one mode in this process; returns {"seconds", "base_mb", "peak_mb", "conduits"}."""
+    base = peakRss()
+    start = time.perf_counter()
+    if mode == "loaded":
+        datasets = NetworkGenerator.loadAll(paths, columnar=columnar)
+        model = NetworkGenerator.generateModel(datasets)
+        del datasets
+    else:
+        model = NetworkGenerator.streamModel(paths, columnar=columnar)
+    return {"seconds": time.perf_counter() - start, "base_mb": base, "peak_mb": peakRss(),
+            "conduits": model.edgeCount}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conduits", type=int, default=2000000)
+    parser.add_argument("--pumps", type=int, default=10000)
+    parser.add_argument("--columnar", action="store_true", help="use the columnar reader (see ColumnarCsv)")
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--paths", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(build(args.run, json.loads(args.paths), args.columnar)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {key: os.path.join(tmp, name) for key, name in
+                 (("nodePath", "Nodes.csv"), ("pipePath", "Links.csv"), ("pumpPath", "Pumps.csv"))}
+        edges = SyntheticNetwork.edges(args.conduits + 1, loops=0)
+        SyntheticNetwork.writeNodes(paths["nodePath"], args.conduits + 1)
+        SyntheticNetwork.writeLinks(paths["pipePath"], edges)
+        SyntheticNetwork.writeLinks(paths["pumpPath"], edges[:args.pumps])
+        del edges
+
+        print(f"{'mode':<9} {'conduits':>9} {'time (s)':>9} {'base RSS (MB)':>14} {'peak RSS (MB)':>14}")
+        for mode in MODES:
+            command = [sys.executable, os.path.abspath(__file__), "--run", mode, "--paths", json.dumps(paths)]
+            if args.columnar:
+                command.append("--columnar")
+            result = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+            print(f"{mode:<9} {result['conduits']:>9} {result['seconds']:>9.2f}"
+                  f" {result['base_mb']:>14.1f} {result['peak_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Upstream/downstream trace latency (NetworkTrace) on synthetic networks, against
+a plain breadth-first search over the model's Node views.
+
+Reports the one-off cost of the topological order and the monitor catchments
+(NetworkTrace.precompute, run during the build), then the median and worst
+time of traces from random nodes, first and memoised, and of the largest
+trace there is: everything upstream of the outfall.
+
+Usage (from the repository root):
+    python benchmarks/traceBenchmark.py
+    python benchmarks/traceBenchmark.py --nodes 500000 --monitors 500 --queries 50
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from NetworkModel import NetworkModelBuilder
+from SyntheticNetwork import SyntheticNetwork
+
+
+def model(size, monitors, seed=0):
+    """SyntheticNetwork.edges(size, seed) with `monitors` monitors at random nodes."""
+    rng = random.Random(seed)
+    builder = NetworkModelBuilder()
+    for i in range(size):
+        builder.addNode(f"N{i:06d}", "manhole")
+    builder.addMonitors(f"N{i:06d}" for i in rng.sample(range(size), monitors))
+    suffixes = {}
+    for up, ds in SyntheticNetwork.edges(size, seed=seed):
+        suffix = suffixes.get(up, 0) + 1
+        suffixes[up] = suffix
+        builder.addConduit(f"{up}.{suffix}", up, ds, "link")
+    return builder.build()
+
+
+def naiveTrace(network, index, direction):
+    """Breadth-first search over Node.upstream / Node.downstream."""
+    seen = {network.nodeIds[index]}
+    queue = deque([index])
+    while queue:
+        node = network.node(queue.popleft())
+        for node_id, _ in (node.upstream if direction == "upstream" else node.downstream):
+            if node_id not in seen:
+                seen.add(node_id)
+                queue.append(network.nodeIndex[node_id])
+    return seen
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100000, 500000])
+    parser.add_argument("--monitors", type=int, default=None, help="monitors per network (default: one per 1000 nodes)")
+    parser.add_argument("--queries", type=int, default=20, help="random trace origins per direction")
+    parser.add_argument("--naive-queries", type=int, default=5, help="of those, how many to repeat with the plain search")
+    args = parser.parse_args()
+
+    for size in args.nodes:
+        network = model(size, args.monitors or max(1, size // 1000))
+        trace = network.trace()
+        _, order_ms = timed(trace.order)
+        _, precompute_ms = timed(trace.precompute, np.flatnonzero(network.isMonitor))
+        print(f"{size} nodes, {int(network.isMonitor.sum())} monitors: "
+              f"order {order_ms:.0f} ms, catchments {precompute_ms:.0f} ms", flush=True)
+
+        print(f"  {'direction':<11} {'mean nodes':>11} {'trace ms (median/max)':>22} {'memoised ms':>12} "
+              f"{'plain BFS ms':>13}")
+        rng = random.Random(1)
+        origins = [rng.randrange(size) for _ in range(args.queries)]
+        for direction in ("upstream", "downstream"):
+            sizes, first, again, naive = [], [], [], []
+            for n, origin in enumerate(origins):
+                (nodes, _), ms = timed(trace.trace, origin, direction)
+                sizes.append(nodes.size)
+                first.append(ms)
+                again.append(timed(trace.trace, origin, direction)[1])
+                if n < args.naive_queries:
+                    reached, ms = timed(naiveTrace, network, origin, direction)
+                    assert reached == {network.nodeIds[i] for i in nodes.tolist()}
+                    naive.append(ms)
+            print(f"  {direction:<11} {statistics.mean(sizes):>11.0f} "
+                  f"{statistics.median(first):>12.1f} / {max(first):>7.1f} {statistics.median(again):>12.3f} "
+                  f"{statistics.median(naive) if naive else float('nan'):>13.1f}", flush=True)
+
+        # node 0 is the outfall (see SyntheticNetwork.edges)
+        (nodes, _), ms = timed(trace.trace, 0, "upstream")
+        _, naive_ms = timed(naiveTrace, network, 0, "upstream")
+        print(f"  upstream of the outfall: {nodes.size} nodes in {ms:.0f} ms (plain BFS {naive_ms:.0f} ms)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Cost of turning layout coordinates into node positions, before and after the
+post-layout transform became array operations:
+
+  normalise   shift to (0, 0) and scale: Python min() over the coordinates and
+              a per-node dict, versus NetworkDrawer.normalise into model.positions
+  cache hit   applying { node_id: (x, y) } from LayoutCache: a per-node
+              assignment, versus one fancy-indexed write
+  centres     scene coordinates (y flipped): NetworkDrawer.sceneCentre per node,
+              versus NetworkDrawer.sceneCentres for all of them
+  items       creating --items node items with per-node versus bulk centres
+
+The layout itself is not run; random coordinates stand in for its output.
+
+Usage (from the repository root):
+    python benchmarks/transformBenchmark.py
+    python benchmarks/transformBenchmark.py --nodes 100000 1000000 --items 0
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import chain
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from NetworkDrawer import NetworkDrawer
+from SyntheticNetwork import SyntheticNetwork
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def loopNormalise(model, active, coords):
+    """The per-node transform layoutNetwork used to run."""
+    scale = NetworkDrawer.LAYOUT_SCALE
+    node_ids = model.nodeIds
+    min_x = min(x for x, y in coords.tolist())
+    min_y = min(y for x, y in coords.tolist())
+
+    positions = {}
+    for n, (x, y) in zip(active.tolist(), coords.tolist()):
+        positions[node_ids[n]] = ((x - min_x) * scale, (y - min_y) * scale)
+    for node_id, (x, y) in positions.items():
+        index = model.nodeIndex.get(node_id)
+        if index is not None:
+            model.positions[index] = (x, y)
+
+
+def loopApply(model, positions):
+    for node_id, (x, y) in positions.items():
+        index = model.nodeIndex.get(node_id)
+        if index is not None:
+            model.positions[index] = (x, y)
+
+
+def arrayApply(model, positions):
+    indices = np.fromiter((model.nodeIndex.get(node_id, -1) for node_id in positions),
+                          dtype=np.int64, count=len(positions))
+    coords = np.fromiter(chain.from_iterable(positions.values()), dtype=np.float64,
+                             count=2 * len(positions)).reshape(-1, 2)
+    known = indices >= 0
+    model.positions[indices[known]] = coords[known]
+
+
+def centreColumns(centres):
+    """(x, y) tuples the way buildScene reads them out of sceneCentres."""
+    return list(zip(centres[:, 0].tolist(), centres[:, 1].tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000000])
+    parser.add_argument("--items", type=int, default=20000, help="node items created per mode (0 to skip)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    print(f"{'nodes':>9} {'step':<10} {'loop (ms)':>10} {'array (ms)':>11} {'speedup':>8}")
+    for nodes in args.nodes:
+        model = SyntheticNetwork.model(nodes)
+        active = np.flatnonzero(model.connected())
+        coords = np.random.default_rng(0).uniform(-5000.0, 5000.0, size=(active.size, 2))
+
+        def report(step, loop, vectorised):
+            print(f"{nodes:>9} {step:<10} {loop * 1000:>10.1f} {vectorised * 1000:>11.1f} {loop / vectorised:>7.1f}x")
+
+        loop = timed(lambda: loopNormalise(model, active, coords))
+        expected = model.positions.copy()
+        model.positions[:] = 0.0
+
+        def vectorised():
+            model.positions[active] = NetworkDrawer.normalise(coords)
+        array = timed(vectorised)
+        assert np.allclose(model.positions, expected)
+        report("normalise", loop, array)
+
+        cached = dict(zip((model.nodeIds[n] for n in active.tolist()), model.positions[active].tolist()))
+        report("cache hit", timed(lambda: loopApply(model, cached)), timed(lambda: arrayApply(model, cached)))
+        del cached
+
+        drawn = np.flatnonzero(model.inTable()).tolist()
+        report("centres",
+               timed(lambda: [NetworkDrawer.sceneCentre(model, index) for index in drawn]),
+               timed(lambda: centreColumns(NetworkDrawer.sceneCentres(model, drawn))))
+
+        if args.items:
+            subset = drawn[:args.items]
+
+            def perNode():
+                return [NetworkDrawer.createNode(model, index) for index in subset]
+
+            def bulk():
+                return [NetworkDrawer.createNode(model, index, centre)
+                        for index, centre in zip(subset, centreColumns(NetworkDrawer.sceneCentres(model, subset)))]
+            report("items", timed(perNode), timed(bulk))
+
+
+if __name__ == "__main__":
+    main()
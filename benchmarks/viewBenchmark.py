@@ -0,0 +1,116 @@
+"""
+Scripted pan/zoom frame rate of SchematicView against the plain QGraphicsView
+the schematic used to be shown in (default index, growing scene rect, no item
+caching, antialiasing always on, ID labels as ItemIgnoresTransformations
+child items).
+
+Each frame applies one step (a scroll, or a 10% zoom) and then lets Qt process
+the resulting paint events, so only what the view really repaints is timed.
+
+Usage (from the repository root):
+    python benchmarks/viewBenchmark.py
+    python benchmarks/viewBenchmark.py --nodes 50000 --zoom 0.5 --frames 60
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QGraphicsView, QGraphicsItem, QGraphicsSimpleTextItem
+from PyQt6.QtGui import QPainter
+from PyQt6.QtCore import QRectF
+
+from NetworkDrawer import NetworkDrawer
+from SvgNodeFactory import SvgNodeItem
+from SyntheticNetwork import SyntheticNetwork
+
+
+def plainView(model):
+    """The schematic as NetworkDrawer used to return it."""
+    scene = NetworkDrawer.buildScene(model).scene()
+    scene.setSceneRect(QRectF())
+    scene.setBspTreeDepth(0)
+    for item in scene.items():
+        if isinstance(item, SvgNodeItem):
+            item.setCacheMode(QGraphicsItem.CacheMode.NoCache)
+            text = item.label
+            item.prepareGeometryChange()
+            item.label = None
+            item._bounds = None
+
+            label = QGraphicsSimpleTextItem(text, item)
+            label.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations, True)
+            label.setFont(item.labelFont)
+            label.setBrush(item.labelColour)
+            symbol = item.symbolRect()
+            label.setPos(symbol.width() / 2.0 - label.boundingRect().width() / 2.0, symbol.height() + 4.0)
+    view = QGraphicsView(scene)
+    view.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+    return view
+
+
+def zoomBy(view, factor):
+    if hasattr(view, "zoomBy"):
+        view.zoomBy(factor)
+    else:
+        view.scale(factor, factor)
+
+
+def phases(view, frames, step):
+    """{phase: [one callable per frame]}: pan right then down, zoom out then back in."""
+    h = view.horizontalScrollBar()
+    v = view.verticalScrollBar()
+    return {
+        "pan": [lambda: h.setValue(h.value() + step)] * frames + [lambda: v.setValue(v.value() + step)] * frames,
+        "zoom": [lambda: zoomBy(view, 1 / 1.1)] * (frames // 2) + [lambda: zoomBy(view, 1.1)] * (frames // 2),
+    }
+
+
+def run(app, view, zoom, frames, step):
+    """Returns {phase: frames per second}."""
+    view.resize(1280, 800)
+    view.show()
+    view.resetTransform()
+    view.scale(zoom, zoom)
+    view.centerOn(view.scene().itemsBoundingRect().center())
+    app.processEvents()
+
+    fps = {}
+    for phase, steps in phases(view, frames, step).items():
+        start = time.perf_counter()
+        for apply in steps:
+            apply()
+            app.processEvents()
+        fps[phase] = len(steps) / (time.perf_counter() - start)
+    view.hide()
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=50000)
+    parser.add_argument("--zoom", type=float, default=0.5, help="view scale the script starts at")
+    parser.add_argument("--frames", type=int, default=20, help="frames per pan direction / zoom phase")
+    parser.add_argument("--step", type=int, default=25, help="pixels scrolled per pan frame")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    model = SyntheticNetwork.model(args.nodes)
+    NetworkDrawer.layoutNetwork(model, useCache=False)
+
+    print(f"{'view':<16} {'nodes':>8} {'pan (fps)':>10} {'zoom (fps)':>11}")
+    for name, build in (("QGraphicsView", plainView), ("SchematicView", NetworkDrawer.buildScene)):
+        view = build(model)
+        fps = run(app, view, args.zoom, args.frames, args.step)
+        print(f"{name:<16} {model.nodeCount:>8} {fps['pan']:>10.1f} {fps['zoom']:>11.1f}")
+        view.setScene(None)
+
+
+if __name__ == "__main__":
+    main()
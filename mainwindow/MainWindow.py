@@ -1,19 +1,489 @@
-from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QMainWindow
+import time
+
+from PyQt6.QtWidgets import (QGraphicsScene, QGraphicsView, QMainWindow, QProgressDialog, QMessageBox, QFileDialog,
+                             QDockWidget, QTreeWidget, QTreeWidgetItem)
+from PyQt6.QtGui import QActionGroup, QKeySequence
+from PyQt6.QtCore import Qt
 from SvgNodeFactory import SvgNodeFactory
 from NetworkDrawer import NetworkDrawer
 from InitialisationScreen import InitialisationScreen
+from LayoutCache import LayoutCache
+from GraphBuildWorker import GraphBuildWorker
+from NetworkSnapshot import NetworkSnapshot
+from SchematicView import SchematicView
+from CatchmentView import CatchmentView
+from TimeSeriesStore import TimeSeriesStore
+from TimeSeriesOverlay import TimeSeriesOverlay
+from TimeSlider import TimeSlider
 
 class MainWindow(QMainWindow):
+    # (NetworkDrawer engine, Layout menu entry); graphviz needs an external install, so it isn't offered
+    LAYOUT_ENGINE_LABELS = (
+        ("layered", "Layered"),
+        ("source", "Source coordinates"),
+        ("source-separated", "Source coordinates, separate overlaps"),
+    )
+    # (NetworkTrace direction, Trace menu entry); clicking a node traces from it
+    TRACE_MODE_LABELS = (
+        (None, "Off"),
+        ("upstream", "Upstream"),
+        ("downstream", "Downstream"),
+    )
+
     def __init__(self, appManager):
         super().__init__()
         self.setWindowTitle("fm-schematic-automation")
         self.resize(1000, 700)
         self.appManager = appManager
+        self.buildProgress = None
+        # model on screen, the fingerprints of the CSVs it came from and the
+        # layout engine that placed it
+        self.currentModel = None
+        self.currentSources = None
+        self.currentEngine = None
+        # ChainCollapse currentModel is the collapsed model of, or None
+        self.currentChains = None
+        # NetworkTrace direction traced from a clicked node, or None
+        self.traceMode = None
+        # sub-catchment navigator, shown while the network is partitioned (see CatchmentView)
+        self.catchmentDock = None
+        self.catchmentItems = None  # part -> QTreeWidgetItem
+        # monitor time series shown over the schematic, and its time slider (see TimeSeriesOverlay)
+        self.timeSeries = None
+        self.timeDock = None
+        self.createMenus()
         self.initialiseParameters()
 
-    def drawGraph(self, conduits, nodes, monitors):
-        view = NetworkDrawer.drawNetwork(conduits, nodes, monitors)
+    def createMenus(self):
+        fileMenu = self.menuBar().addMenu("File")
+        reloadAction = fileMenu.addAction("Reload")
+        reloadAction.setShortcut(QKeySequence.StandardKey.Refresh)
+        reloadAction.triggered.connect(self.appManager.reloadGraph)
+        liveRefreshAction = fileMenu.addAction("Live refresh")
+        liveRefreshAction.setCheckable(True)
+        liveRefreshAction.setChecked(self.appManager.liveRefresh)
+        liveRefreshAction.toggled.connect(self.appManager.setLiveRefresh)
+        fileMenu.addSeparator()
+        openSnapshotAction = fileMenu.addAction("Open snapshot...")
+        openSnapshotAction.triggered.connect(self.openSnapshot)
+        saveSnapshotAction = fileMenu.addAction("Save snapshot...")
+        saveSnapshotAction.triggered.connect(self.saveSnapshot)
+        fileMenu.addSeparator()
+        openSeriesAction = fileMenu.addAction("Open monitor data...")
+        openSeriesAction.triggered.connect(self.openTimeSeries)
+        closeSeriesAction = fileMenu.addAction("Close monitor data")
+        closeSeriesAction.triggered.connect(self.closeTimeSeries)
+
+        layoutMenu = self.menuBar().addMenu("Layout")
+        engineGroup = QActionGroup(self)
+        for engine, label in MainWindow.LAYOUT_ENGINE_LABELS:
+            engineAction = layoutMenu.addAction(label)
+            engineAction.setCheckable(True)
+            engineAction.setChecked(engine == self.appManager.layoutEngine)
+            engineAction.triggered.connect(lambda checked, engine=engine: self.appManager.setLayoutEngine(engine))
+            engineGroup.addAction(engineAction)
+        layoutMenu.addSeparator()
+        partitionAction = layoutMenu.addAction("Split into monitor sub-catchments")
+        partitionAction.setCheckable(True)
+        partitionAction.setChecked(self.appManager.partitioned)
+        partitionAction.toggled.connect(self.appManager.setPartitioned)
+        collapseAction = layoutMenu.addAction("Collapse manhole chains")
+        collapseAction.setCheckable(True)
+        collapseAction.setChecked(self.appManager.collapseChains)
+        collapseAction.toggled.connect(self.appManager.setCollapseChains)
+        recollapseAction = layoutMenu.addAction("Collapse expanded chains")
+        recollapseAction.triggered.connect(self.collapseExpandedChains)
+        clearCacheAction = layoutMenu.addAction("Clear layout cache")
+        clearCacheAction.triggered.connect(self.clearLayoutCache)
+
+        traceMenu = self.menuBar().addMenu("Trace")
+        traceGroup = QActionGroup(self)
+        for mode, label in MainWindow.TRACE_MODE_LABELS:
+            traceAction = traceMenu.addAction(label)
+            traceAction.setCheckable(True)
+            traceAction.setChecked(mode == self.traceMode)
+            traceAction.triggered.connect(lambda checked, mode=mode: self.setTraceMode(mode))
+            traceGroup.addAction(traceAction)
+        traceMenu.addSeparator()
+        clearTraceAction = traceMenu.addAction("Clear trace")
+        clearTraceAction.setShortcut(QKeySequence(Qt.Key.Key_Escape))
+        clearTraceAction.triggered.connect(self.clearTrace)
+
+    def clearLayoutCache(self):
+        LayoutCache.invalidate()
+        self.statusBar().showMessage("Layout cache cleared", 3000)
+
+    def schematicView(self):
+        """The SchematicView on screen (the current part's when partitioned), or None."""
+        view = self.centralWidget()
+        if isinstance(view, CatchmentView):
+            view = view.currentView()
+        return view if isinstance(view, SchematicView) else None
+
+    # --------------------------
+    # Tracing (see NetworkTrace)
+    # --------------------------
+
+    def setTraceMode(self, mode):
+        self.traceMode = mode
+        if mode is None:
+            self.clearTrace()
+
+    def clearTrace(self):
+        view = self.schematicView()
+        if view is not None and view.trace is not None:
+            NetworkDrawer.clearTrace(view)
+            self.statusBar().clearMessage()
+
+    def traceFrom(self, node_id):
+        # SchematicView.nodeClicked
+        view = self.schematicView()
+        if self.traceMode is None or self.currentModel is None or view is None:
+            return
+        self.showTrace(view, self.currentModel, node_id, self.traceMode)
+
+    def showTrace(self, view, model, node_id, direction):
+        """Highlight everything upstream or downstream of node_id, and say how much that is."""
+        index = model.nodeIndex.get(node_id)
+        if index is None:
+            NetworkDrawer.clearTrace(view)
+            return
+        start = time.perf_counter()
+        nodes, edges = model.trace().trace(index, direction)
+        NetworkDrawer.showTrace(view, model, edges)
+        view.trace = (node_id, direction)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.statusBar().showMessage(
+            f"{node_id}: {nodes.size - 1} nodes and {edges.size} conduits {direction} ({elapsed:.0f} ms)"
+        )
+
+    # --------------------------
+    # Collapsed chains (see ChainCollapse)
+    # --------------------------
+
+    def expandChain(self, edge_id):
+        # SchematicView.pipeClicked
+        view = self.schematicView()
+        if self.currentChains is None or view is None:
+            return
+        if not NetworkDrawer.expandChain(view, self.currentChains, edge_id):
+            return
+        if view.trace is not None:
+            self.showTrace(view, self.currentModel, *view.trace)
+        self.attachTimeSeries()
+        node_ids = view.expandedChains[edge_id][0]
+        self.statusBar().showMessage(f"Expanded {edge_id}: {len(node_ids)} manholes", 5000)
+
+    def collapseExpandedChains(self):
+        view = self.schematicView()
+        if view is not None and view.expandedChains:
+            NetworkDrawer.collapseChains(view)
+            if view.trace is not None:
+                self.showTrace(view, self.currentModel, *view.trace)
+            self.attachTimeSeries()
+
+    # --------------------------
+    # Monitor time series (see TimeSeriesStore)
+    # --------------------------
+
+    def openTimeSeries(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open Monitor Data",
+            "",
+            f"Monitor Data (*.csv *{TimeSeriesStore.EXTENSION});;All Files (*)"
+        )
+        if not file_path:
+            return
+
+        try:
+            if file_path.endswith(TimeSeriesStore.EXTENSION):
+                store = TimeSeriesStore.open(file_path)
+            else:
+                store = self.buildTimeSeries(file_path)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.critical(self, "Open Monitor Data", f"Could not open the monitor data:\n{e}")
+            return
+        if store is not None:
+            self.showTimeSeries(store)
+
+    def buildTimeSeries(self, file_path):
+        """TimeSeriesStore.openOrBuild with a progress dialog; None if cancelled."""
+        progress = QProgressDialog("Reading monitor data...", "Cancel", 0, 100, self)
+        progress.setWindowTitle("Open Monitor Data")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(500)
+        try:
+            return TimeSeriesStore.openOrBuild(file_path, progress=lambda fraction: progress.setValue(int(fraction * 100)),
+                                               isCancelled=progress.wasCanceled)
+        finally:
+            progress.close()
+            progress.deleteLater()
+
+    def showTimeSeries(self, store):
+        self.closeTimeSeries()
+        self.timeSeries = TimeSeriesOverlay(store)
+        slider = TimeSlider(store)
+        slider.rowChanged.connect(self.timeSeries.setRow)
+        slider.quantityChanged.connect(self.timeSeries.setQuantity)
+        if self.timeDock is None:
+            self.timeDock = QDockWidget("Monitor data", self)
+            self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.timeDock)
+        self.timeDock.setWidget(slider)
+        self.timeDock.show()
+        self.attachTimeSeries()
+        self.statusBar().showMessage(
+            f"Monitor data: {store.monitorCount} monitors, {store.rowCount} times, {', '.join(store.quantities)}", 5000
+        )
+
+    def closeTimeSeries(self):
+        if self.timeSeries is not None:
+            self.timeSeries.detach()
+            self.timeSeries = None
+        if self.timeDock is not None:
+            slider = self.timeDock.widget()
+            if slider is not None:
+                slider.setPlaying(False)
+                slider.deleteLater()
+            self.timeDock.setWidget(None)
+            self.timeDock.hide()
+
+    def attachTimeSeries(self):
+        """Show the monitor data on the schematic on screen, e.g. after it was redrawn."""
+        view = self.schematicView()
+        if self.timeSeries is not None and view is not None and view.nodeItems is not None:
+            self.timeSeries.attach(view)
+
+    # --------------------------
+    # Snapshots (see NetworkSnapshot)
+    # --------------------------
+
+    def openSnapshot(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open Snapshot",
+            "",
+            f"Network Snapshots (*{NetworkSnapshot.EXTENSION});;All Files (*)"
+        )
+        if not file_path:
+            return
+
+        try:
+            header, _ = NetworkSnapshot.readHeader(file_path)
+            if NetworkSnapshot.sourcesChanged(header["sources"]):
+                # Stale: rebuild from the CSVs it was made from
+                self.statusBar().showMessage("Snapshot is out of date, rebuilding from its source files", 5000)
+                for key, source in header["sources"].items():
+                    setattr(self.appManager, key, source["path"])
+                self.appManager.createGraph()
+                return
+            model, header = NetworkSnapshot.load(file_path)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.critical(self, "Open Snapshot", f"Could not open the snapshot:\n{e}")
+            return
+
+        self.drawGraph(model, laidOut=True, sources=header["sources"], engine=header.get("engine", "layered"))
+
+    def saveSnapshot(self):
+        if self.currentModel is None:
+            QMessageBox.information(self, "Save Snapshot", "There is no schematic to save yet.")
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Snapshot",
+            "",
+            f"Network Snapshots (*{NetworkSnapshot.EXTENSION})"
+        )
+        if not file_path:
+            return
+        if not file_path.endswith(NetworkSnapshot.EXTENSION):
+            file_path += NetworkSnapshot.EXTENSION
+
+        # the whole network, with the collapsed manholes placed along their chains
+        model = self.currentChains.fullPositions() if self.currentChains is not None else self.currentModel
+        try:
+            NetworkSnapshot.save(file_path, model, self.currentSources or {}, self.currentEngine or "layered")
+        except OSError as e:
+            QMessageBox.critical(self, "Save Snapshot", f"Could not save the snapshot:\n{e}")
+            return
+        self.statusBar().showMessage(f"Saved {file_path}", 3000)
+
+    # --------------------------
+    # Build progress (see GraphBuildWorker)
+    # --------------------------
+
+    def startBuildProgress(self, onCancel):
+        self.finishBuildProgress()
+        progress = QProgressDialog(GraphBuildWorker.STAGES["load"][2], "Cancel", 0, 100, self)
+        progress.setWindowTitle("Create Graph")
+        # Window-modal: setValue() keeps processing events while the scene is built
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(onCancel)
+        progress.setValue(0)
+        self.buildProgress = progress
+
+    def showBuildProgress(self, stage, percent, message):
+        if self.buildProgress is None:
+            return
+        self.buildProgress.setLabelText(message)
+        self.buildProgress.setValue(percent)
+
+    def finishBuildProgress(self):
+        if self.buildProgress is not None:
+            self.buildProgress.close()
+            self.buildProgress.deleteLater()
+            self.buildProgress = None
+
+    def showBuildError(self, message):
+        QMessageBox.critical(self, "Create Graph", f"Could not build the schematic:\n{message}")
+
+    def drawGraph(self, model, laidOut=False, sources=None, partition=None, chains=None, engine=None):
+        """
+        laidOut: model.positions already filled by NetworkDrawer.layoutNetwork
+        sources: fingerprints of the model's CSVs, kept for "Save snapshot"
+        engine: layout engine of model.positions, also kept for it; None for the app's current one
+        partition: CatchmentPartition to show one part at a time instead (see drawPartitioned)
+        chains: ChainCollapse when model is its collapsed model, for expanding chains on click
+        """
+        if engine is None:
+            engine = self.appManager.layoutEngine
+        if partition is not None:
+            self.drawPartitioned(model, partition, sources, chains, engine)
+            return
+        if not laidOut:
+            NetworkDrawer.layoutNetwork(model, engine)
+
+        progress = self.buildProgress
+
+        def onProgress(fraction):
+            self.showBuildProgress("scene", GraphBuildWorker.stageProgress("scene", fraction),
+                                   GraphBuildWorker.STAGES["scene"][2])
+
+        def isCancelled():
+            return progress is not None and progress.wasCanceled()
+
+        view = NetworkDrawer.buildScene(model, progress=onProgress, isCancelled=isCancelled)
+        self.finishBuildProgress()
+        if view is not None:
+            self.currentModel = model
+            self.currentSources = sources
+            self.currentEngine = engine
+            self.currentChains = chains
+            view.nodeClicked.connect(self.traceFrom)
+            view.pipeClicked.connect(self.expandChain)
+            self.setCentralWidget(view)
+            if self.catchmentDock is not None:
+                self.catchmentDock.hide()
+            self.attachTimeSeries()
+
+    # --------------------------
+    # Sub-catchments (see CatchmentView)
+    # --------------------------
+
+    def drawPartitioned(self, model, partition, sources=None, chains=None, engine=None):
+        """
+        Show the network a sub-catchment at a time, starting from the one on
+        screen before (after a reload) or the largest.
+        """
+        start = None
+        previous = self.centralWidget()
+        if isinstance(previous, CatchmentView) and previous.currentPart is not None:
+            head = int(previous.partition.heads[previous.currentPart])
+            start = model.nodeIndex.get(previous.model.nodeIds[head]) if head >= 0 else None
+        part = int(partition.labels[start]) if start is not None else partition.largest()
+
+        if engine is None:
+            engine = self.appManager.layoutEngine
+        view = CatchmentView(model, partition, engine=engine)
+        view.nodeClicked.connect(self.traceFrom)
+        view.pipeClicked.connect(self.expandChain)
+        view.partShown.connect(self.selectCatchment)
+        self.currentModel = model
+        self.currentSources = sources
+        self.currentEngine = engine
+        self.currentChains = chains
         self.setCentralWidget(view)
+        self.showCatchmentDock(partition)
+        self.finishBuildProgress()
+        self.showCatchment(part)
+
+    def showCatchmentDock(self, partition):
+        if self.catchmentDock is None:
+            tree = QTreeWidget()
+            tree.setHeaderLabels(["Sub-catchment", "Nodes"])
+            tree.itemActivated.connect(lambda item, column: self.showCatchment(item.data(0, Qt.ItemDataRole.UserRole)))
+            tree.itemClicked.connect(lambda item, column: self.showCatchment(item.data(0, Qt.ItemDataRole.UserRole)))
+            self.catchmentDock = QDockWidget("Sub-catchments", self)
+            self.catchmentDock.setWidget(tree)
+            self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.catchmentDock)
+
+        # one entry per part, under the part it drains into
+        tree = self.catchmentDock.widget()
+        tree.clear()
+        items = []
+        for part in range(partition.partCount):
+            item = QTreeWidgetItem([partition.names[part], str(partition.size(part))])
+            item.setData(0, Qt.ItemDataRole.UserRole, part)
+            items.append(item)
+        for part, parent in enumerate(partition.parents.tolist()):
+            if parent >= 0:
+                items[parent].addChild(items[part])
+        tree.addTopLevelItems([items[part] for part in partition.roots().tolist()])
+        self.catchmentItems = items
+        self.catchmentDock.show()
+
+    def showCatchment(self, part):
+        view = self.centralWidget()
+        if not isinstance(view, CatchmentView) or part is None or part < 0:
+            return
+        try:
+            view.showPart(int(part))
+        except ValueError as e:
+            self.showBuildError(str(e))
+
+    def selectCatchment(self, part):
+        # CatchmentView.partShown: follow it in the navigator
+        view = self.centralWidget()
+        if self.catchmentItems is not None and part < len(self.catchmentItems):
+            tree = self.catchmentDock.widget()
+            tree.blockSignals(True)
+            tree.setCurrentItem(self.catchmentItems[part])
+            tree.blockSignals(False)
+        if isinstance(view, CatchmentView):
+            self.statusBar().showMessage(
+                f"Sub-catchment {view.partition.names[part]}: {view.partition.size(part)} nodes", 5000
+            )
+        self.attachTimeSeries()
+
+    def updateGraph(self, model, previous, diff, sources=None, chains=None):
+        """
+        Apply an incremental reload (see GraphBuildWorker) to the schematic on
+        screen; falls back to drawGraph if that is no longer `previous`.
+        chains: as for drawGraph
+        """
+        view = self.centralWidget()
+        if previous is None or previous is not self.currentModel or not isinstance(view, SchematicView) \
+                or view.nodeItems is None:
+            self.drawGraph(model, laidOut=True, sources=sources, chains=chains)
+            return
+
+        # the diff is between collapsed models, so only knows chains as single conduits
+        NetworkDrawer.collapseChains(view)
+        NetworkDrawer.updateScene(view, model, previous, diff)
+        if view.trace is not None:
+            # the conduits under it may have changed
+            self.showTrace(view, model, *view.trace)
+        self.finishBuildProgress()
+        self.currentModel = model
+        self.currentSources = sources
+        self.currentEngine = self.appManager.layoutEngine
+        self.currentChains = chains
+        self.attachTimeSeries()
+        self.statusBar().showMessage(f"Reloaded: {diff.summary()}", 5000)
 
     def initialiseParameters(self):
         self.setCentralWidget(InitialisationScreen(self.appManager))
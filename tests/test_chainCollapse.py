@@ -0,0 +1,171 @@
+import contextlib
+import io
+import random
+
+import numpy as np
+
+from ChainCollapse import ChainCollapse
+from NetworkDrawer import NetworkDrawer
+from NetworkModel import NetworkModelBuilder
+
+
+def model(nodes, conduits, monitors=()):
+    """
+    nodes: { node_id: type }
+    conduits: [(upstream, downstream)] or [(upstream, downstream, type)], named "up-ds"
+    """
+    builder = NetworkModelBuilder()
+    for node_id, node_type in nodes.items():
+        builder.addNode(node_id, node_type)
+    builder.addMonitors(monitors)
+    for conduit in conduits:
+        up, ds = conduit[:2]
+        builder.addConduit(f"{up}-{ds}", up, ds, conduit[2] if len(conduit) > 2 else "link")
+    return builder.build()
+
+
+def assertContiguous(chains):
+    """Every chain's conduits run from its source end through its manholes, in order, to its sink end."""
+    model = chains.model
+    for c in range(chains.chainCount):
+        edges = chains.edges(c)
+        path = [int(chains.sourceEnds[c])] + chains.nodes(c).tolist() + [int(chains.sinkEnds[c])]
+        assert edges.size == len(path) - 1
+        assert model.edgeSrc[edges].tolist() == path[:-1]
+        assert model.edgeDst[edges].tolist() == path[1:]
+
+
+def names(chains, indices):
+    return [chains.model.nodeIds[i] for i in np.asarray(indices).tolist()]
+
+
+def layout(network):
+    # layoutNetwork prints graph diagnostics
+    with contextlib.redirect_stdout(io.StringIO()):
+        NetworkDrawer.layoutNetwork(network, useCache=False, workers=1)
+
+
+def test_plain_chain():
+    chains = ChainCollapse(model(
+        {"S": "storage", "m1": "manhole", "m2": "manhole", "m3": "manhole", "J": "junction"},
+        [("S", "m1"), ("m1", "m2"), ("m2", "m3"), ("m3", "J")],
+    ))
+
+    assert chains.chainCount == 1
+    assert chains.hiddenCount == 3
+    assert names(chains, chains.nodes(0)) == ["m1", "m2", "m3"]
+    assert chains.chainIds == ["S-m1..m3-J"]
+    assert chains.chain("S-m1..m3-J") == 0
+    assert chains.chain("S-m1") is None
+    assertContiguous(chains)
+
+    collapsed = chains.collapsed
+    assert collapsed.nodeIds == ["S", "J"]
+    assert collapsed.edgeIds == ["S-m1..m3-J"]
+    assert collapsed.conduitType(0) == "chain"
+
+
+def test_closed_loop_is_kept():
+    network = model(
+        {"m1": "manhole", "m2": "manhole", "m3": "manhole"},
+        [("m1", "m2"), ("m2", "m3"), ("m3", "m1")],
+    )
+    chains = ChainCollapse(network)
+
+    assert chains.chainCount == 0
+    assert chains.hiddenCount == 0
+    assert chains.collapsed.nodeIds == network.nodeIds
+    assert sorted(chains.collapsed.edgeIds) == sorted(network.edgeIds)
+
+
+def test_run_rejoining_its_start_is_kept():
+    network = model(
+        {"S": "storage", "m1": "manhole", "m2": "manhole"},
+        [("S", "m1"), ("m1", "m2"), ("m2", "S")],
+    )
+    chains = ChainCollapse(network)
+
+    assert chains.chainCount == 0
+    assert chains.hiddenCount == 0
+    assert chains.collapsed.nodeCount == 3
+    assert chains.collapsed.edgeCount == 3
+    # laying it out used to fail on the chain from S to itself
+    layout(chains.collapsed)
+    assert np.isfinite(chains.fullPositions().positions).all()
+
+
+def test_rejoining_run_next_to_a_chain():
+    chains = ChainCollapse(model(
+        {"S": "storage", "a": "manhole", "b": "manhole", "c": "manhole", "J": "junction"},
+        [("S", "a"), ("a", "b"), ("b", "S"), ("S", "c"), ("c", "J")],
+    ))
+
+    # only the run from S to J collapses; the ring's manholes stay
+    assert chains.chainCount == 1
+    assert names(chains, chains.nodes(0)) == ["c"]
+    assert names(chains, [chains.sourceEnds[0], chains.sinkEnds[0]]) == ["S", "J"]
+    assert sorted(chains.collapsed.nodeIds) == ["J", "S", "a", "b"]
+    assertContiguous(chains)
+
+
+def test_monitored_manhole_splits_a_run():
+    chains = ChainCollapse(model(
+        {"S": "storage", "m1": "manhole", "m2": "manhole", "m3": "manhole", "J": "junction"},
+        [("S", "m1"), ("m1", "m2"), ("m2", "m3"), ("m3", "J")],
+        monitors=["m2"],
+    ))
+
+    assert chains.chainCount == 2
+    ends = sorted(names(chains, [chains.sourceEnds[c], chains.sinkEnds[c]]) for c in range(2))
+    assert ends == [["S", "m2"], ["m2", "J"]]
+    assert sorted(names(chains, chains.keptNodes)) == ["J", "S", "m2"]
+    assertContiguous(chains)
+
+
+def test_non_link_conduit_splits_a_run():
+    network = model(
+        {"S": "storage", "m1": "manhole", "m2": "manhole", "m3": "manhole", "m4": "manhole", "J": "junction"},
+        [("S", "m1"), ("m1", "m2"), ("m2", "m3", "pump"), ("m3", "m4"), ("m4", "J")],
+    )
+    chains = ChainCollapse(network)
+
+    # the manholes either side of the pump stay, so the pump does too
+    assert sorted(names(chains, chains.keptNodes)) == ["J", "S", "m2", "m3"]
+    assert chains.chainCount == 2
+    hidden = sorted(names(chains, np.concatenate([chains.nodes(c) for c in range(2)])))
+    assert hidden == ["m1", "m4"]
+    pump = chains.collapsed.edgeIds.index("m2-m3")
+    assert chains.collapsed.conduitType(pump) == "pump"
+    assertContiguous(chains)
+
+
+def test_full_positions_space_manholes_along_their_chain():
+    chains = ChainCollapse(model(
+        {"S": "storage", "m1": "manhole", "m2": "manhole", "m3": "manhole", "J": "junction"},
+        [("S", "m1"), ("m1", "m2"), ("m2", "m3"), ("m3", "J")],
+    ))
+    chains.collapsed.positions[:] = [[0.0, 0.0], [8.0, 4.0]]
+    positions = chains.fullPositions().positions
+
+    np.testing.assert_allclose(positions[chains.nodes(0)], [[2.0, 1.0], [4.0, 2.0], [6.0, 3.0]])
+
+
+def test_random_networks_give_contiguous_chains():
+    rng = random.Random(0)
+    for _ in range(20):
+        count = 300
+        nodes = {f"n{i}": rng.choice(["manhole"] * 8 + ["junction", "storage", "outfall"]) for i in range(count)}
+        conduits = []
+        for i in range(1, count):
+            # mostly a tree flowing towards n0, with the odd extra conduit and special type
+            up, ds = f"n{i}", f"n{rng.randrange(max(0, i - 3), i)}"
+            conduits.append((up, ds, "weir" if rng.random() < 0.05 else "link"))
+            if rng.random() < 0.03:
+                conduits.append((f"n{rng.randrange(count)}", up))
+        monitors = [node_id for node_id in nodes if rng.random() < 0.05]
+        chains = ChainCollapse(model(nodes, conduits, monitors))
+
+        assertContiguous(chains)
+        hidden = np.concatenate([chains.nodes(c) for c in range(chains.chainCount)] or [np.zeros(0, np.int64)])
+        # every node is either kept or hidden in exactly one chain
+        assert sorted(np.concatenate([chains.keptNodes, hidden]).tolist()) == list(range(chains.model.nodeCount))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from LayoutCache import LayoutCache
+
+
+@pytest.fixture(autouse=True)
+def cacheDir(tmp_path, monkeypatch):
+    monkeypatch.setattr(LayoutCache, "CACHE_DIR", str(tmp_path))
+
+
+def test_key_tracks_nodes_edges_and_params():
+    ids = ["A", "B", "C"]
+    src, dst = np.array([0, 1]), np.array([1, 2])
+    params = {"engine": "layered", "scale": 1.5}
+    key = LayoutCache.key(ids, src, dst, params)
+
+    assert key == LayoutCache.key(list(ids), src.astype(np.int32), dst, dict(params))
+    assert key != LayoutCache.key(["A", "B", "D"], src, dst, params)
+    assert key != LayoutCache.key(ids, np.array([0, 0]), dst, params)
+    assert key != LayoutCache.key(ids, src, dst, {"engine": "graphviz", "scale": 1.5})
+
+
+def test_store_and_load_round_trip():
+    positions = np.array([[0.0, 1.5], [3.0, -2.0], [4.5, 0.0]])
+    LayoutCache.store("k", positions)
+
+    np.testing.assert_array_equal(LayoutCache.load("k", 3), positions)
+    # a different node count is a miss, not a wrong layout
+    assert LayoutCache.load("k", 4) is None
+    assert LayoutCache.load("missing", 3) is None
+
+
+def test_invalidate_removes_every_entry():
+    LayoutCache.store("a", np.zeros((2, 2)))
+    LayoutCache.store("b", np.zeros((2, 2)))
+    LayoutCache.invalidate()
+    assert LayoutCache.load("a", 2) is None
+    assert LayoutCache.load("b", 2) is None
+
+
+def test_failed_store_leaves_no_partial_file(tmp_path, monkeypatch):
+    def fullDisk(src, dst):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("LayoutCache.os.replace", fullDisk)
+    LayoutCache.store("k", np.zeros((3, 2)))
+
+    assert list(tmp_path.iterdir()) == []
+    assert LayoutCache.load("k", 3) is None
@@ -0,0 +1,157 @@
+import contextlib
+import io
+
+import numpy as np
+
+from NetworkDiff import NetworkDiff
+from NetworkDrawer import NetworkDrawer
+from NetworkModel import NetworkModelBuilder
+
+
+def model(nodes, conduits, monitors=(), tooltips=None):
+    """
+    nodes: { node_id: type }
+    conduits: [(link_id, upstream, downstream, type)]
+    """
+    builder = NetworkModelBuilder()
+    for node_id, node_type in nodes.items():
+        tooltip = (tooltips or {}).get(node_id)
+        builder.addNode(node_id, node_type, {"tooltip": tooltip} if tooltip else None)
+    builder.addMonitors(monitors)
+    for conduit in conduits:
+        builder.addConduit(*conduit)
+    return builder.build()
+
+
+NODES = {"A": "manhole", "B": "manhole", "C": "manhole", "D": "outfall"}
+CONDUITS = [("AB", "A", "B", "link"), ("BC", "B", "C", "link"), ("CD", "C", "D", "pump")]
+
+
+def test_same_network_is_empty():
+    diff = NetworkDiff.compare(model(NODES, CONDUITS), model(NODES, CONDUITS))
+    assert diff.isEmpty()
+    assert diff.touchedNodes.size == 0
+
+
+def test_added_and_removed_nodes_and_conduits():
+    previous = model(NODES, CONDUITS)
+    nodes = {k: v for k, v in NODES.items() if k != "A"}
+    nodes["E"] = "manhole"
+    current = model(nodes, [("BC", "B", "C", "link"), ("CD", "C", "D", "pump"), ("DE", "D", "E", "link")])
+    diff = NetworkDiff.compare(previous, current)
+
+    assert diff.addedNodes == ["E"]
+    assert diff.removedNodes == ["A"]
+    assert diff.addedEdges == ["DE"]
+    assert diff.removedEdges == ["AB"]
+    assert diff.restyledEdges == []
+    assert [current.edgeIds[e] for e in diff.addedEdgeIndices.tolist()] == ["DE"]
+    # B lost a conduit, D and E gained one; A is not in the new model
+    assert sorted(current.nodeIds[i] for i in diff.touchedNodes.tolist()) == ["B", "D", "E"]
+
+
+def test_node_map():
+    previous = model(NODES, CONDUITS)
+    current = model({"E": "manhole", **NODES}, CONDUITS + [("EA", "E", "A", "link")])
+    diff = NetworkDiff.compare(previous, current)
+
+    for i, node_id in enumerate(current.nodeIds):
+        expected = previous.nodeIndex.get(node_id, -1)
+        assert diff.nodeMap[i] == expected
+    assert diff.nodeMap[current.nodeIndex["E"]] == -1
+
+
+def test_changed_nodes():
+    previous = model(NODES, CONDUITS, tooltips={"C": "old"})
+    current = model({**NODES, "A": "outfall"}, CONDUITS, monitors=["B"], tooltips={"C": "new"})
+    diff = NetworkDiff.compare(previous, current)
+
+    # a new type, a manhole becoming a flow monitor, a new tooltip
+    assert diff.changedNodes == ["A", "B", "C"]
+    assert not diff.addedNodes and not diff.removedNodes
+    assert diff.touchedNodes.size == 0
+
+
+def test_restyled_and_rerouted_conduits():
+    previous = model(NODES, CONDUITS)
+    current = model(NODES, [("AB", "A", "B", "weir"), ("BC", "B", "D", "link"), ("CD", "C", "D", "pump")])
+    diff = NetworkDiff.compare(previous, current)
+
+    assert diff.restyledEdges == ["AB"]
+    assert [current.edgeIds[e] for e in diff.restyledEdgeIndices.tolist()] == ["AB"]
+    # a re-routed conduit is removed and added again
+    assert diff.addedEdges == ["BC"]
+    assert diff.removedEdges == ["BC"]
+    assert sorted(current.nodeIds[i] for i in diff.touchedNodes.tolist()) == ["B", "C", "D"]
+
+
+def test_conduits_to_undrawn_nodes_are_not_drawn():
+    previous = model(NODES, CONDUITS)
+    # X is not in the nodes table, so its conduit is laid out but not drawn
+    current = model(NODES, CONDUITS + [("DX", "D", "X", "link")])
+    diff = NetworkDiff.compare(previous, current)
+
+    assert diff.addedEdges == []
+    assert diff.addedNodes == []
+    assert sorted(current.nodeIds[i] for i in diff.touchedNodes.tolist()) == ["D", "X"]
+
+
+def catchments(count, length, extra=()):
+    """count separate chains of length manholes each, plus extra conduits."""
+    nodes = {}
+    conduits = []
+    for c in range(count):
+        ids = [f"C{c}N{i}" for i in range(length)]
+        nodes.update((node_id, "manhole") for node_id in ids)
+        conduits.extend((f"{up}-{ds}", up, ds, "link") for up, ds in zip(ids, ids[1:]))
+    for up, ds in extra:
+        nodes.setdefault(up, "manhole")
+        nodes.setdefault(ds, "manhole")
+        conduits.append((f"{up}-{ds}", up, ds, "link"))
+    return model(nodes, conduits)
+
+
+def layout(network):
+    # layoutNetwork prints graph diagnostics
+    with contextlib.redirect_stdout(io.StringIO()):
+        NetworkDrawer.layoutNetwork(network, useCache=False, workers=1)
+
+
+def test_layout_incremental_keeps_untouched_positions():
+    previous = catchments(4, 6)
+    layout(previous)
+    # a new branch off catchment 2
+    current = catchments(4, 6, extra=[("C2N3", "NEW")])
+    diff = NetworkDiff.compare(previous, current)
+
+    assert NetworkDrawer.layoutIncremental(current, previous, diff)
+
+    relaid = {current.nodeIds[i] for i in diff.relaidNodes.tolist()}
+    assert relaid == {f"C2N{i}" for i in range(6)} | {"NEW"}
+    for i, node_id in enumerate(current.nodeIds):
+        if node_id not in relaid:
+            np.testing.assert_array_equal(current.positions[i], previous.positions[previous.nodeIndex[node_id]])
+    assert np.isfinite(current.positions[current.nodeIndex["NEW"]]).all()
+
+
+def test_layout_incremental_without_structural_change_moves_nothing():
+    previous = catchments(3, 5)
+    layout(previous)
+    current = catchments(3, 5)
+    diff = NetworkDiff.compare(previous, current)
+
+    assert NetworkDrawer.layoutIncremental(current, previous, diff)
+    assert diff.relaidNodes.size == 0
+    np.testing.assert_array_equal(current.positions, previous.positions)
+
+
+def test_layout_incremental_falls_back_to_a_full_layout():
+    previous = catchments(2, 6)
+    layout(previous)
+    # joining both catchments touches the whole network
+    current = catchments(2, 6, extra=[("C0N5", "C1N0")])
+    diff = NetworkDiff.compare(previous, current)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert not NetworkDrawer.layoutIncremental(current, previous, diff)
+    assert diff.relaidNodes.size == current.nodeCount
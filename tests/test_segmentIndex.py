@@ -0,0 +1,64 @@
+import random
+
+from SegmentIndex import SegmentIndex
+
+
+def randomSegments(count, seed=0):
+    rng = random.Random(seed)
+    segments = {}
+    for key in range(count):
+        x, y = rng.uniform(-2000, 2000), rng.uniform(-2000, 2000)
+        segments[key] = (x, y, x + rng.uniform(-300, 300), y + rng.uniform(-300, 300))
+    return segments
+
+
+def cells(index):
+    """Every cell of index's grid as a set of keys."""
+    return {cell: set(index._bucket(cell)) for cell in list(index._cells)}
+
+
+def bruteNearest(segments, x, y, tolerance):
+    best, best_distance = None, tolerance
+    for key, segment in segments.items():
+        d = SegmentIndex.distance(x, y, *segment)
+        if d <= best_distance:
+            best, best_distance = key, d
+    return best
+
+
+def test_bulk_build_matches_incremental_cells():
+    segments = randomSegments(500)
+    bulk = SegmentIndex()
+    for key, segment in segments.items():
+        bulk.setSegment(key, *segment)
+    bulk.build()
+
+    incremental = SegmentIndex(bulk.cellSize)
+    incremental.build()
+    for key, segment in segments.items():
+        incremental.setSegment(key, *segment)
+    assert cells(bulk) == cells(incremental)
+
+
+def test_nearest_after_moves_and_removals():
+    segments = randomSegments(400, seed=1)
+    index = SegmentIndex()
+    for key, segment in segments.items():
+        index.setSegment(key, *segment)
+
+    rng = random.Random(2)
+    queries = [(rng.uniform(-2000, 2000), rng.uniform(-2000, 2000)) for _ in range(200)]
+    for x, y in queries:
+        assert index.nearest(x, y, 50.0) == bruteNearest(segments, x, y, 50.0)
+
+    # the grid is built now; update it in place
+    for key in range(0, 400, 3):
+        del segments[key]
+        index.remove(key)
+    for key in range(1, 400, 3):
+        x1, y1, x2, y2 = segments[key]
+        segments[key] = (x1 + 500.0, y1, x2 + 500.0, y2 - 200.0)
+        index.setSegment(key, *segments[key])
+    assert len(index) == len(segments)
+    for x, y in queries:
+        assert index.nearest(x, y, 50.0) == bruteNearest(segments, x, y, 50.0)
@@ -0,0 +1,68 @@
+import numpy as np
+
+from TimeSeriesStore import TimeSeriesStore
+
+
+def writeSeries(path, rows):
+    """rows: (node id, time, flow text)"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{TimeSeriesStore.ID_COLUMN},{TimeSeriesStore.TIME_COLUMN},Flow\n")
+        for node_id, stamp, flow in rows:
+            f.write(f"{node_id},{stamp},{flow}\n")
+
+
+def build(tmp_path, rows):
+    csv_path = tmp_path / "series.csv"
+    store_path = tmp_path / "series.fmseries"
+    writeSeries(csv_path, rows)
+    assert TimeSeriesStore.build(str(csv_path), str(store_path))
+    return TimeSeriesStore.open(str(store_path))
+
+
+def test_offset_loggers_hold_their_last_reading(tmp_path):
+    # two monitors logging every 2 minutes, 5 s apart
+    rows = []
+    for step in range(4):
+        rows.append(("A", f"2024-01-01 00:{2 * step:02d}:00", step))
+        rows.append(("B", f"2024-01-01 00:{2 * step:02d}:05", 10 * step))
+    store = build(tmp_path, rows)
+    assert store.rowCount == 8
+
+    flow = store.window("Flow", 0, 8)
+    a, b = store.monitorIndex["A"], store.monitorIndex["B"]
+    np.testing.assert_array_equal(flow[:, a], [0, 0, 1, 1, 2, 2, 3, 3])
+    # B has no reading before its first row
+    assert np.isnan(flow[0, b])
+    np.testing.assert_array_equal(flow[1:, b], [0, 0, 10, 10, 20, 20, 30])
+
+
+def test_window_carries_readings_from_before_its_start(tmp_path):
+    rows = [("A", "2024-01-01 00:00:00", 1), ("B", "2024-01-01 00:00:05", 2),
+            ("A", "2024-01-01 00:02:00", 3), ("B", "2024-01-01 00:02:05", 4)]
+    store = build(tmp_path, rows)
+    a, b = store.monitorIndex["A"], store.monitorIndex["B"]
+
+    flow = store.window("Flow", 2, 4, columns=np.array([b, a]))
+    np.testing.assert_array_equal(flow, [[2, 3], [4, 3]])
+
+
+def test_stale_readings_are_dropped(tmp_path):
+    rows = [("A", "2024-01-01 00:00:00", 1), ("B", "2024-01-01 00:00:00", 5),
+            ("B", "2024-01-01 01:00:00", 6)]
+    store = build(tmp_path, rows)
+    a = store.monitorIndex["A"]
+
+    flow = store.window("Flow", 0, 2)
+    assert flow[0, a] == 1
+    # an hour on, A's reading is older than HOLD_SECONDS
+    assert np.isnan(flow[1, a])
+
+
+def test_hold_zero_gives_raw_readings(tmp_path):
+    rows = [("A", "2024-01-01 00:00:00", 1), ("B", "2024-01-01 00:00:05", 2)]
+    store = build(tmp_path, rows)
+    a = store.monitorIndex["A"]
+
+    raw = store.window("Flow", 0, 2, hold=0)
+    assert raw[0, a] == 1
+    assert np.isnan(raw[1, a])